@@ -0,0 +1,59 @@
+"""CPU pinning for spawned servers and the load generator.
+
+Uses ``os.sched_setaffinity`` (Linux). On platforms without it the harness
+runs unpinned and records that in ``meta.cpu_topology``.
+"""
+import argparse
+import os
+
+
+def supported() -> bool:
+    return hasattr(os, "sched_setaffinity") and hasattr(os, "sched_getaffinity")
+
+
+def parse_cpu_list(spec: str) -> set[int]:
+    """Parse a taskset-style list such as ``0-3,6`` into a set of CPU ids."""
+    cpus: set[int] = set()
+    try:
+        for part in spec.split(","):
+            part = part.strip()
+            if not part:
+                continue
+            if "-" in part:
+                lo, hi = part.split("-", 1)
+                cpus.update(range(int(lo), int(hi) + 1))
+            else:
+                cpus.add(int(part))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid CPU list: {spec!r}")
+    if not cpus:
+        raise argparse.ArgumentTypeError(f"empty CPU list: {spec!r}")
+    return cpus
+
+
+def available_cpus() -> set[int] | None:
+    return set(os.sched_getaffinity(0)) if supported() else None
+
+
+def pin(pid: int, cpus: set[int] | None) -> bool:
+    """Pin ``pid`` (0 = this process) to ``cpus``; False when not applied."""
+    if not cpus or not supported():
+        return False
+    try:
+        os.sched_setaffinity(pid, cpus)
+        return True
+    except OSError as e:
+        print(f"Warning: could not pin pid {pid} to CPUs {sorted(cpus)}: {e}")
+        return False
+
+
+def topology(server_cpus: set[int] | None, client_cpus: set[int] | None, available: set[int] | None) -> dict:
+    overlap = sorted(server_cpus & client_cpus) if (server_cpus and client_cpus) else []
+    return {
+        "pinning_supported": supported(),
+        "cpu_count": os.cpu_count(),
+        "available_cpus": sorted(available) if available is not None else None,
+        "server_cpus": sorted(server_cpus) if server_cpus else None,
+        "client_cpus": sorted(client_cpus) if client_cpus else None,
+        "overlap": overlap,
+    }
@@ -0,0 +1,123 @@
+"""Retry wrapper and recovery metrics for ``--test-error-handling``.
+
+:class:`Retrying` drives a persistent client the way a careful caller
+would: every attempt is bounded by the client's deadline and a failed
+attempt is retried after an exponential backoff. Reconnecting is left to
+the clients (the MCP/ACP session clients rebuild a session whose stream
+dropped, see ``clients.reconnect``). It logs every call and attempt so that
+:func:`recovery` can read off, for a fault injected at time T:
+
+- time to detect: T to the end of the first failed attempt (None when the
+  client absorbed the fault without a failed attempt)
+- time to recover: T to the first successful attempt after that
+- retry amplification: attempts per logical call during the outage, as
+  seen by the server
+- latency of successful calls before the fault and after recovery
+"""
+import asyncio
+import contextlib
+import time
+from collections import Counter
+from typing import Awaitable, Callable
+
+import numpy as np
+
+
+def error_kind(e: BaseException) -> str:
+    """Exception type plus HTTP status where there is one; for an
+    exception group (anyio task groups), that of its first member."""
+    while getattr(e, "exceptions", None):
+        e = e.exceptions[0]
+    response = getattr(e, "response", None)
+    status = getattr(response, "status_code", None)
+    return f"{type(e).__name__} {status}" if status else type(e).__name__
+
+
+def latency(values: list[float]) -> dict:
+    if not values:
+        return {}
+    p50, p99 = np.percentile(values, [50, 99])
+    return {"count": len(values), "p50_ms": float(p50), "p99_ms": float(p99), "max_ms": float(max(values))}
+
+
+class WrongReply(Exception):
+    pass
+
+
+class Retrying:
+    """``start()`` returns a started persistent client."""
+
+    def __init__(self, start: Callable[[], Awaitable], retries: int = 3, backoff_s: float = 0.05) -> None:
+        self._start = start
+        self.retries = retries
+        self.backoff_s = backoff_s
+        self.client = None
+        # (start, end, ok) per logical call
+        self.calls: list[tuple[float, float, bool]] = []
+        # (start, end, error kind or None) per attempt
+        self.attempts: list[tuple[float, float, str | None]] = []
+
+    async def open(self) -> None:
+        self.client = await self._start()
+
+    async def close(self) -> None:
+        if self.client is not None:
+            with contextlib.suppress(Exception):
+                await self.client.close()
+            self.client = None
+
+    async def echo(self, message: str) -> bool:
+        """One logical call; False once every retry has failed."""
+        t_call = time.perf_counter()
+        for attempt in range(self.retries + 1):
+            if attempt:
+                await asyncio.sleep(self.backoff_s * 2 ** (attempt - 1))
+            t0 = time.perf_counter()
+            try:
+                *_, out = await self.client.echo(message)
+                if out != message:
+                    raise WrongReply(f"echo returned {len(out)} chars for {len(message)}")
+            except Exception as e:
+                self.attempts.append((t0, time.perf_counter(), error_kind(e)))
+                continue
+            t1 = time.perf_counter()
+            self.attempts.append((t0, t1, None))
+            self.calls.append((t_call, t1, True))
+            return True
+        self.calls.append((t_call, time.perf_counter(), False))
+        return False
+
+
+def recovery(client: Retrying, t_fault: float, t_ready: float | None = None) -> dict:
+    """Recovery metrics for a fault injected at ``t_fault`` (perf_counter);
+    ``t_ready`` is when the server accepted connections again, if it went
+    away."""
+    failed = [a for a in client.attempts if a[2] is not None and a[1] >= t_fault]
+    t_detect = min((a[1] for a in failed), default=None)
+    since = t_detect if t_detect is not None else t_fault
+    t_recover = min((a[1] for a in client.attempts if a[2] is None and a[0] >= since), default=None)
+    end = t_recover if t_recover is not None else float("inf")
+    window_calls = [c for c in client.calls if c[1] >= t_fault and c[0] <= end]
+    window_attempts = [a for a in client.attempts if a[1] >= t_fault and a[0] <= end]
+    before = [(c[1] - c[0]) * 1000 for c in client.calls if c[2] and c[1] < t_fault]
+    after = [(c[1] - c[0]) * 1000 for c in client.calls if c[2] and c[0] > end]
+    latency_before, latency_after = latency(before), latency(after)
+
+    def ms(t: float | None) -> float | None:
+        return (t - t_fault) * 1000 if t is not None else None
+
+    return {
+        "recovered": t_recover is not None,
+        "time_to_detect_ms": ms(t_detect),
+        "time_to_recover_ms": ms(t_recover),
+        "recover_after_server_ready_ms": (t_recover - t_ready) * 1000 if t_recover is not None and t_ready is not None else None,
+        "calls_during_outage": len(window_calls),
+        "failed_calls": sum(1 for c in client.calls if not c[2] and c[1] >= t_fault),
+        "failed_attempts": len(failed),
+        "retry_amplification": len(window_attempts) / len(window_calls) if window_calls else None,
+        "errors": dict(Counter(a[2] for a in failed).most_common(5)),
+        "latency_before": latency_before,
+        "latency_after": latency_after,
+        "p50_delta_ms": latency_after.get("p50_ms", 0.0) - latency_before.get("p50_ms", 0.0) if latency_after and latency_before else None,
+        "p99_delta_ms": latency_after.get("p99_ms", 0.0) - latency_before.get("p99_ms", 0.0) if latency_after and latency_before else None,
+    }
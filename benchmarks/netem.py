@@ -0,0 +1,262 @@
+"""In-process TCP proxy that impairs traffic between the harness and a server.
+
+An asyncio stand-in for ``tc netem`` that needs neither root nor Linux.
+``--netem`` takes a comma-separated spec:
+
+- ``delay=MS``: one-way delay added in each direction (RTT grows by 2x)
+- ``jitter=MS``: uniform +/- variation of that delay; TCP never reorders,
+  so a chunk is never delivered before the one read ahead of it
+- ``rate=N[kbit|mbit|gbit]``: bandwidth cap per direction and connection
+- ``loss=P``: chance that a chunk is held back one retransmission timeout
+  (``rto=MS``, default 200), as a lost segment would be. Bytes are never
+  dropped, because the proxy sits above TCP
+- ``reset=P``: chance per chunk that the connection is aborted (RST) in
+  both directions
+
+Example: ``--netem delay=20,jitter=2,rate=50mbit,loss=0.001``.
+"""
+import asyncio
+import random
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+CHUNK_BYTES = 16384
+# Chunks queued per direction before the proxy stops reading, standing in
+# for the sender's socket buffer on a slow link
+QUEUE_CHUNKS = 256
+_RATE_UNITS = {"bit": 1, "kbit": 1e3, "mbit": 1e6, "gbit": 1e9}
+
+
+def parse_rate(text: str) -> float:
+    """``50mbit`` -> bytes per second."""
+    for unit in sorted(_RATE_UNITS, key=len, reverse=True):
+        if text.endswith(unit):
+            return float(text[: -len(unit)]) * _RATE_UNITS[unit] / 8
+    return float(text) / 8
+
+
+@dataclass
+class Impairment:
+    delay_ms: float = 0.0
+    jitter_ms: float = 0.0
+    rate_bytes_per_s: float | None = None
+    loss: float = 0.0
+    rto_ms: float = 200.0
+    reset: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> "Impairment":
+        imp = cls()
+        for item in filter(None, (part.strip() for part in spec.split(","))):
+            key, sep, value = item.partition("=")
+            if not sep:
+                raise ValueError(f"netem option {item!r} needs key=value")
+            if key not in _OPTIONS:
+                raise ValueError(f"unknown netem option {key!r} (expected one of {', '.join(_OPTIONS)})")
+            attr, convert = _OPTIONS[key]
+            try:
+                setattr(imp, attr, convert(value))
+            except ValueError:
+                raise ValueError(f"invalid value for netem option {key!r}: {value!r}")
+        if not 0 <= imp.loss <= 1 or not 0 <= imp.reset <= 1:
+            raise ValueError("netem loss and reset are probabilities in [0, 1]")
+        if imp.rate_bytes_per_s is not None and imp.rate_bytes_per_s <= 0:
+            raise ValueError("netem rate must be positive")
+        return imp
+
+    def describe(self) -> dict:
+        return {
+            "delay_ms": self.delay_ms,
+            "jitter_ms": self.jitter_ms,
+            "rate_mbit": self.rate_bytes_per_s * 8 / 1e6 if self.rate_bytes_per_s else None,
+            "loss": self.loss,
+            "rto_ms": self.rto_ms,
+            "reset": self.reset,
+        }
+
+
+# spec key -> (Impairment attribute, converter)
+_OPTIONS = {
+    "delay": ("delay_ms", float),
+    "jitter": ("jitter_ms", float),
+    "rate": ("rate_bytes_per_s", parse_rate),
+    "loss": ("loss", float),
+    "rto": ("rto_ms", float),
+    "reset": ("reset", float),
+}
+
+
+@dataclass
+class ProxyStats:
+    connections: int = 0
+    bytes_up: int = 0
+    bytes_down: int = 0
+    chunks: int = 0
+    losses: int = 0
+    resets: int = 0
+    errors: list[str] = field(default_factory=list)
+
+    def as_dict(self) -> dict:
+        return {
+            "connections": self.connections,
+            "bytes_client_to_server": self.bytes_up,
+            "bytes_server_to_client": self.bytes_down,
+            "chunks": self.chunks,
+            "losses": self.losses,
+            "resets": self.resets,
+            "errors": self.errors[:5],
+        }
+
+
+class _Reset(Exception):
+    pass
+
+
+class NetemProxy:
+    """Listen on ``listen_port`` (0 picks a free port) and forward every
+    connection to ``target_host:target_port`` through :class:`Impairment`."""
+
+    def __init__(
+        self,
+        target_host: str,
+        target_port: int,
+        impairment: Impairment,
+        listen_host: str = "127.0.0.1",
+        listen_port: int = 0,
+        seed: int | None = None,
+    ) -> None:
+        self.target_host = target_host
+        self.target_port = target_port
+        self.impairment = impairment
+        self.listen_host = listen_host
+        self.port = listen_port
+        self.stats = ProxyStats()
+        self._rng = random.Random(seed)
+        self._server: asyncio.base_events.Server | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self._writers: set[asyncio.StreamWriter] = set()
+
+    async def start(self) -> "NetemProxy":
+        self._server = await asyncio.start_server(self._handle, self.listen_host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+        # Aborting the sockets ends the pipes; cancelling stream handler
+        # tasks would be logged as unhandled by asyncio
+        for w in list(self._writers):
+            w.transport.abort()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def reset_connections(self) -> int:
+        """Abort every open connection (RST both ways), as a middlebox
+        dropping its flows would; returns how many were open."""
+        dropped = len(self._tasks)
+        for w in list(self._writers):
+            w.transport.abort()
+        self.stats.resets += dropped
+        return dropped
+
+    def url(self, like: str) -> str:
+        """``like`` (a server base URL) with host and port pointing at the proxy."""
+        parts = urlsplit(like)
+        return parts._replace(netloc=f"{self.listen_host}:{self.port}").geturl()
+
+    async def _handle(self, client_reader: asyncio.StreamReader, client_writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._tasks.add(task)
+        self._writers.add(client_writer)
+        self.stats.connections += 1
+        writers = [client_writer]
+        try:
+            server_reader, server_writer = await asyncio.open_connection(self.target_host, self.target_port)
+            writers.append(server_writer)
+            self._writers.add(server_writer)
+            pipes = [
+                asyncio.create_task(self._pipe(client_reader, server_writer, up=True)),
+                asyncio.create_task(self._pipe(server_reader, client_writer, up=False)),
+            ]
+            done, _ = await asyncio.wait(pipes, return_when=asyncio.FIRST_EXCEPTION)
+            failed = [t.exception() for t in done if t.exception() is not None]
+            if failed:
+                # Either side failing takes the whole connection down, as an
+                # RST would; the other pipe then sees its socket close
+                for w in writers:
+                    w.transport.abort()
+                if isinstance(failed[0], _Reset):
+                    self.stats.resets += 1
+                elif len(self.stats.errors) < 5:
+                    self.stats.errors.append(repr(failed[0]))
+            await asyncio.gather(*pipes, return_exceptions=True)
+        except OSError as e:
+            if len(self.stats.errors) < 5:
+                self.stats.errors.append(repr(e))
+            client_writer.transport.abort()
+        finally:
+            for w in writers:
+                w.close()
+            self._writers.difference_update(writers)
+            self._tasks.discard(task)
+
+    async def _pipe(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, up: bool) -> None:
+        imp = self.impairment
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue[tuple[float, bytes] | None] = asyncio.Queue(QUEUE_CHUNKS)
+        link_free_at = 0.0
+        last_due = 0.0
+
+        async def deliver() -> None:
+            while (item := await queue.get()) is not None:
+                due, data = item
+                wait = due - loop.time()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                writer.write(data)
+                await writer.drain()
+            if writer.can_write_eof():
+                writer.write_eof()
+
+        delivery = asyncio.create_task(deliver())
+        try:
+            while data := await reader.read(CHUNK_BYTES):
+                if imp.reset and self._rng.random() < imp.reset:
+                    raise _Reset()
+                now = loop.time()
+                if imp.rate_bytes_per_s:
+                    # Serialization: the link sends one chunk at a time
+                    link_free_at = max(link_free_at, now) + len(data) / imp.rate_bytes_per_s
+                    sent = link_free_at
+                else:
+                    sent = now
+                delay_ms = imp.delay_ms
+                if imp.jitter_ms:
+                    delay_ms = max(0.0, delay_ms + self._rng.uniform(-imp.jitter_ms, imp.jitter_ms))
+                if imp.loss and self._rng.random() < imp.loss:
+                    self.stats.losses += 1
+                    delay_ms += imp.rto_ms
+                last_due = max(last_due, sent + delay_ms / 1000)
+                self.stats.chunks += 1
+                if up:
+                    self.stats.bytes_up += len(data)
+                else:
+                    self.stats.bytes_down += len(data)
+                await queue.put((last_due, data))
+            await queue.put(None)
+            await delivery
+        finally:
+            if not delivery.done():
+                delivery.cancel()
+                await asyncio.gather(delivery, return_exceptions=True)
+
+
+async def start_proxies(targets: dict[str, str], impairment: Impairment, seed: int | None = None) -> dict[str, NetemProxy]:
+    """One proxy per ``name -> base URL``; each gets its own seeded RNG."""
+    proxies = {}
+    for i, (name, base_url) in enumerate(targets.items()):
+        parts = urlsplit(base_url)
+        proxy = NetemProxy(parts.hostname or "127.0.0.1", parts.port or 80, impairment,
+                           seed=None if seed is None else seed + i)
+        proxies[name] = await proxy.start()
+    return proxies
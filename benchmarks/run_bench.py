@@ -1,4 +1,4 @@
-import asyncio, time, json, statistics, os, argparse, pathlib, subprocess, sys
+import asyncio, time, json, statistics, os, argparse, pathlib, shutil, signal, subprocess, sys, tempfile
 from scipy.stats import ttest_ind, mannwhitneyu
 import numpy as np
 import contextlib
@@ -6,21 +6,41 @@ import httpx
 
 HERE = pathlib.Path(__file__).resolve().parent
 ROOT = HERE.parent
+TRACE_DIR = HERE / "out" / "traces"
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-def start_servers(transport: str = "http", no_spawn_a2a: bool = False, no_spawn_anp: bool = False, include_acp: bool = False):
+from servers import metrics, tracing
+
+def start_servers(transport: str = "http", no_spawn_a2a: bool = False, no_spawn_anp: bool = False, include_acp: bool = False, server_cpus: set[int] | None = None, null_server: bool = False):
+    from benchmarks.affinity import pin
+
     procs = []
+
+    def spawn(module: str) -> None:
+        p = subprocess.Popen([sys.executable, "-m", module])
+        pin(p.pid, server_cpus)
+        procs.append(p)
+
+    # Raw TCP echo for the harness floor, on every transport
+    if null_server:
+        spawn("servers.null_echo_server")
+    if transport == "inproc":
+        # The apps run inside the harness (clients.inproc); only the null
+        # echo has to come up
+        if procs:
+            time.sleep(2.0)
+        return procs
     # Start SDK-based HTTP servers for A2A and ANP unless disabled
     if not no_spawn_a2a:
-        procs.append(subprocess.Popen([sys.executable, "-m", "servers.a2a_sdk_server"]))
+        spawn("servers.a2a_sdk_server")
     if not no_spawn_anp:
-        procs.append(subprocess.Popen([sys.executable, "-m", "servers.anp_sdk_server"]))
+        spawn("servers.anp_sdk_server")
     # Start MCP/ACP HTTP SSE servers if using http transport parity
     if transport == "http":
-        procs.append(subprocess.Popen([sys.executable, "-m", "servers.mcp_sse_server"]))
+        spawn("servers.mcp_sse_server")
         if include_acp:
-            procs.append(subprocess.Popen([sys.executable, "-m", "servers.acp_sse_server"]))
+            spawn("servers.acp_sse_server")
     time.sleep(2.0)  # increased boot wait for all servers
     return procs
 
@@ -34,10 +54,25 @@ async def run_client(
     transport: str = "http",
     a2a_base_url: str = "http://127.0.0.1:8201",
     anp_base_url: str = "http://127.0.0.1:8301",
+    mcp_base_url: str = "http://127.0.0.1:8001",
+    acp_base_url: str = "http://127.0.0.1:8101",
     enable_a2a_sse: bool = False,
     auth_mode: str = "none",
+    call_log: list | None = None,
+    sessions: int = 1,
+    session_log: dict | None = None,
+    trace: bool = False,
+    call_errors: dict | None = None,
+    deadline_s: float | None = None,
 ):
-    # returns lists of latencies (ms) and success count
+    # returns lists of latencies (ms) and success count; when call_log is
+    # given, each call's (start, end) perf_counter window is appended to it,
+    # and session_log maps session index -> that session's latencies; with
+    # trace, each call runs in a client span propagated to the server; with
+    # call_errors, a call that raises is counted there by exception type (or
+    # as "rejected" by admission control) as a failed call instead of ending
+    # the run, and deadline_s ends calls
+    # that take longer with a TimeoutError
     latencies_total = []
     latencies_rpc = []
     success = 0
@@ -51,117 +86,100 @@ async def run_client(
         except Exception:
             shared_client = None
 
-    # Optional persistent clients for reuse mode
-    mcp_persistent_client = None
-    acp_persistent_client = None
-    a2a_persistent_client = None
-    anp_persistent_client = None
+    # Persistent clients for reuse mode: ``sessions`` independent sessions
+    # (SSE streams, A2A clients, ANP clients), calls assigned round-robin
+    persistent_clients: list = []
     connect_init_timings: dict[str, float] = {}
     if reuse_client:
         try:
-            if proto == "mcp":
-                if transport == "http":
-                    from clients.mcp_sse_client import MCPHttpPersistent
-                    t0 = time.perf_counter()
-                    mcp_persistent_client = MCPHttpPersistent("http://127.0.0.1:8001")
-                    await mcp_persistent_client.start()
-                    connect_init_timings["connect_init_ms"] = (time.perf_counter() - t0) * 1000
-                else:
-                    from clients.mcp_client import MCPStdioPersistent
-                    t0 = time.perf_counter()
-                    mcp_persistent_client = MCPStdioPersistent()
-                    await mcp_persistent_client.start()
-                    connect_init_timings["connect_init_ms"] = (time.perf_counter() - t0) * 1000
-            elif proto == "acp" and transport == "http":
-                from clients.acp_sse_client import ACPHttpPersistent
+            for _ in range(max(1, sessions)):
                 t0 = time.perf_counter()
-                acp_persistent_client = ACPHttpPersistent("http://127.0.0.1:8101")
-                await acp_persistent_client.start()
-                connect_init_timings["connect_init_ms"] = (time.perf_counter() - t0) * 1000
-            elif proto == "a2a":
-                from clients.a2a_sdk_client import A2AClientPersistent
-                t0 = time.perf_counter()
-                a2a_persistent_client = A2AClientPersistent(a2a_base_url)
-                await a2a_persistent_client.start()
-                connect_init_timings["connect_init_ms"] = (time.perf_counter() - t0) * 1000
-            elif proto == "anp":
-                from clients.anp_sdk_client import ANPClientPersistent
-                t0 = time.perf_counter()
-                anp_persistent_client = ANPClientPersistent(anp_base_url)
-                await anp_persistent_client.start()
-                connect_init_timings["connect_init_ms"] = (time.perf_counter() - t0) * 1000
+                client = await start_persistent_client(proto, transport, a2a_base_url, anp_base_url, mcp_base_url, acp_base_url)
+                if client is None:
+                    break
+                persistent_clients.append(client)
+                connect_init_timings.setdefault("connect_init_ms", (time.perf_counter() - t0) * 1000)
         except Exception:
             pass
 
     async def one(i):
         nonlocal success
+        t_call0 = time.perf_counter()
         msg = "x"*payload
         # gRPC transport is only supported for A2A in this harness
         if transport == "grpc" and proto != "a2a":
             return
-        if proto=="mcp":
+        session = i % len(persistent_clients) if persistent_clients else 0
+        client = persistent_clients[session] if persistent_clients else None
+        if proto == "a2a" and transport == "grpc":
+            try:
+                from clients.a2a_grpc_client import once_echo as a2a_grpc_echo
+                lat_total, lat_rpc, out = await a2a_grpc_echo(a2a_base_url, msg)
+            except Exception:
+                lat_total, lat_rpc, out = 0.0, 0.0, ""
+        elif proto == "a2a" and enable_a2a_sse and transport == "http":
+            from clients.a2a_sse_client import once_stream_echo
+            token = os.environ.get("A2A_BEARER_TOKEN") if auth_mode == "all" else None
+            ttfb, total, out = await once_stream_echo(a2a_base_url, msg, 3, 5, token)
+            lat_total, lat_rpc = total, total
+        elif client is not None:
+            # Persistent echo returns (total, rpc, out); the stdio MCP client
+            # returns (latency, out)
+            res = await client.echo(msg)
+            lat_total, lat_rpc, out = res[0], res[-2], res[-1]
+        elif proto=="mcp":
             if transport == "http":
-                if mcp_persistent_client is not None:
-                    lat_rpc, lat_rpc2, out = await mcp_persistent_client.echo(msg)
-                    lat_total = lat_rpc
-                else:
-                    from clients.mcp_sse_client import once_echo
-                    lat_total, lat_rpc, out = await once_echo("http://127.0.0.1:8001", msg)
+                from clients.mcp_sse_client import once_echo
+                lat_total, lat_rpc, out = await once_echo(mcp_base_url, msg)
             else:
-                if mcp_persistent_client is not None:
-                    lat_rpc, lat_rpc2, out = await mcp_persistent_client.echo(msg)
-                    lat_total = lat_rpc
-                else:
-                    from clients.mcp_client import once_echo
-                    lat_total, out = await once_echo(msg)
-                    lat_rpc = lat_total
+                from clients.mcp_client import once_echo
+                lat_total, out = await once_echo(msg)
+                lat_rpc = lat_total
         elif proto=="acp":
             if transport == "http":
-                if acp_persistent_client is not None:
-                    lat_rpc, lat_rpc2, out = await acp_persistent_client.echo(msg)
-                    lat_total = lat_rpc
-                else:
-                    from clients.acp_sse_client import once_echo
-                    lat_total, lat_rpc, out = await once_echo("http://127.0.0.1:8101", msg)
+                from clients.acp_sse_client import once_echo
+                lat_total, lat_rpc, out = await once_echo(acp_base_url, msg)
             else:
                 from clients.acp_stdio_client import once_echo
                 lt, out = await once_echo(msg)
                 lat_total, lat_rpc = lt, lt
         elif proto=="a2a":
-            if transport == "grpc":
-                try:
-                    from clients.a2a_grpc_client import once_echo as a2a_grpc_echo
-                    lat_total, lat_rpc, out = await a2a_grpc_echo(a2a_base_url, msg)
-                except Exception:
-                    lat_total, lat_rpc, out = 0.0, 0.0, ""
-            else:
-                if enable_a2a_sse and transport == "http":
-                    from clients.a2a_sse_client import once_stream_echo
-                    token = os.environ.get("A2A_BEARER_TOKEN") if auth_mode == "all" else None
-                    ttfb, total, out = await once_stream_echo(a2a_base_url, msg, 3, 5, token)
-                    lat_total, lat_rpc = total, total
-                elif a2a_persistent_client is not None:
-                    lat_total, lat_rpc, out = await a2a_persistent_client.echo(msg)
-                else:
-                    from clients.a2a_sdk_client import once_echo
-                    lat_total, lat_rpc, out = await once_echo(a2a_base_url, msg)
+            from clients.a2a_sdk_client import once_echo
+            lat_total, lat_rpc, out = await once_echo(a2a_base_url, msg)
         elif proto=="anp":
-            if anp_persistent_client is not None:
-                lat_total, lat_rpc, out = await anp_persistent_client.echo(msg)
-            else:
-                from clients.anp_sdk_client import once_echo
-                lat_total, lat_rpc, out = await once_echo(anp_base_url, msg)
+            from clients.anp_sdk_client import once_echo
+            lat_total, lat_rpc, out = await once_echo(anp_base_url, msg)
+        elif proto=="null":
+            from clients.null_client import once_echo
+            lat_total, lat_rpc, out = await once_echo(NULL_BASE_URL, msg)
+        elif proto=="null_noio":
+            from clients.null_client import once_echo_noio
+            lat_total, lat_rpc, out = await once_echo_noio(msg)
         else:
             raise RuntimeError("unknown proto")
+        if session_log is not None:
+            session_log.setdefault(session, []).append(lat_total)
+        metrics.observe(proto, "echo", lat_total, out == msg)
         latencies_total.append(lat_total)
         latencies_rpc.append(lat_rpc)
         if out == msg:
             success += 1
+        if call_log is not None:
+            call_log.append((t_call0, time.perf_counter()))
 
     sem = asyncio.Semaphore(concurrency)
     async def guarded(i):
         async with sem:
-            await one(i)
+            t0 = time.perf_counter()
+            try:
+                with tracing.span(f"{proto} echo", "client", protocol=proto, phase="main") if trace else contextlib.nullcontext():
+                    await asyncio.wait_for(one(i), deadline_s)
+            except Exception as e:
+                if call_errors is None:
+                    raise
+                name = "rejected" if overload_outcome(e) == "rejected" else type(e).__name__
+                call_errors[name] = call_errors.get(name, 0) + 1
+                metrics.observe(proto, "echo", (time.perf_counter() - t0) * 1000, False)
 
     await asyncio.gather(*(guarded(i) for i in range(n)))
 
@@ -169,22 +187,14 @@ async def run_client(
     if shared_client is not None:
         with contextlib.suppress(Exception):
             await shared_client.aclose()
-    if mcp_persistent_client is not None:
-        with contextlib.suppress(Exception):
-            await mcp_persistent_client.close()
-    if acp_persistent_client is not None:
-        with contextlib.suppress(Exception):
-            await acp_persistent_client.close()
-    if a2a_persistent_client is not None:
-        with contextlib.suppress(Exception):
-            await a2a_persistent_client.close()
-    if anp_persistent_client is not None:
+    # SDK sessions hold anyio cancel scopes, which must exit in LIFO order
+    for client in reversed(persistent_clients):
         with contextlib.suppress(Exception):
-            await anp_persistent_client.close()
+            await client.close()
     return latencies_total, latencies_rpc, success, connect_init_timings
 
 
-async def validate_protocols(transport: str, a2a_base_url: str = "http://127.0.0.1:8201", anp_base_url: str = "http://127.0.0.1:8301", include_acp: bool = False) -> dict:
+async def validate_protocols(transport: str, a2a_base_url: str = "http://127.0.0.1:8201", anp_base_url: str = "http://127.0.0.1:8301", include_acp: bool = False, mcp_base_url: str = "http://127.0.0.1:8001", acp_base_url: str = "http://127.0.0.1:8101") -> dict:
     """Lightweight shape checks to avoid misleading runs."""
     results: dict[str, str] = {}
 
@@ -199,11 +209,26 @@ async def validate_protocols(transport: str, a2a_base_url: str = "http://127.0.0
             results["a2a"] = f"skipped: {e}"
         return results
 
+    # In-process apps: one echo through each persistent client
+    if transport == "inproc":
+        results = {"acp": "skipped"}
+        for proto in ["mcp", "a2a", "anp"] + (["acp"] if include_acp else []):
+            try:
+                client = await start_persistent_client(proto, transport, a2a_base_url, anp_base_url, mcp_base_url, acp_base_url)
+                try:
+                    *_, out = await client.echo("hi")
+                finally:
+                    await client.close()
+                results[proto] = "ok" if out == "hi" else "unexpected echo"
+            except Exception as e:
+                results[proto] = f"error: {e}"
+        return results
+
     # MCP: stdio or HTTP SSE
     try:
         if transport == "http":
             from clients.mcp_sse_client import once_echo as mcp_echo
-            _lt, _lr, out = await mcp_echo("http://127.0.0.1:8001", "ping")
+            _lt, _lr, out = await mcp_echo(mcp_base_url, "ping")
             results["mcp"] = "ok" if out == "ping" else "unexpected echo"
         else:
             from clients.mcp_client import once_add
@@ -217,7 +242,7 @@ async def validate_protocols(transport: str, a2a_base_url: str = "http://127.0.0
         try:
             if transport == "http":
                 from clients.acp_sse_client import once_echo as acp_echo
-                _lt, _lr, out = await acp_echo("http://127.0.0.1:8101", "hello")
+                _lt, _lr, out = await acp_echo(acp_base_url, "hello")
             else:
                 from clients.acp_stdio_client import once_echo as acp_echo
                 _lt, out = await acp_echo("hello")
@@ -286,6 +311,24 @@ def statistical_comparison(results):
 
     return comparisons
 
+def session_fairness(session_log: dict) -> dict:
+    """Per-session latency summaries plus Jain's fairness index over each
+    session's service rate (1 / mean latency); 1.0 means every session was
+    served equally fast."""
+    per_session = [
+        {"session": idx, "calls": len(lats), **summarize(lats)}
+        for idx, lats in sorted(session_log.items())
+    ]
+    rates = np.array([1.0 / s["avg_ms"] for s in per_session if s.get("avg_ms")])
+    jain = float(rates.sum() ** 2 / (rates.size * (rates ** 2).sum())) if rates.size else 0.0
+    p99s = [s["p99_ms"] for s in per_session if "p99_ms" in s]
+    return {
+        "sessions": len(per_session),
+        "jain_fairness": jain,
+        "p99_spread_ms": (max(p99s) - min(p99s)) if p99s else 0.0,
+        "per_session": per_session,
+    }
+
 def summarize(latencies):
     if not latencies:
         return {}
@@ -303,7 +346,1731 @@ def summarize(latencies):
         "std_dev_ms": float(arr.std(ddof=1)) if n > 1 else 0.0,
     }
 
+async def start_persistent_client(
+    proto: str,
+    transport: str = "http",
+    a2a_base_url: str = "http://127.0.0.1:8201",
+    anp_base_url: str = "http://127.0.0.1:8301",
+    mcp_base_url: str = "http://127.0.0.1:8001",
+    acp_base_url: str = "http://127.0.0.1:8101",
+    **options,
+):
+    """Start the persistent client reuse mode uses for ``proto`` (None if the
+    protocol/transport combination has none). ``options`` (``hedger``,
+    ``deadline_s``) go to the client's constructor."""
+    if transport == "inproc" and proto in ("a2a", "anp"):
+        from clients import inproc
+        options["http_transport"] = await inproc.http_transport(proto)
+    if proto == "mcp":
+        if transport == "http":
+            from clients.mcp_sse_client import MCPHttpPersistent
+            client = MCPHttpPersistent(mcp_base_url, **options)
+        elif transport == "inproc":
+            from clients.mcp_sse_client import MCPInprocPersistent
+            client = MCPInprocPersistent(**options)
+        else:
+            from clients.mcp_client import MCPStdioPersistent
+            client = MCPStdioPersistent(**options)
+    elif proto == "acp" and transport == "http":
+        from clients.acp_sse_client import ACPHttpPersistent
+        client = ACPHttpPersistent(acp_base_url, **options)
+    elif proto == "acp" and transport == "inproc":
+        from clients.acp_sse_client import ACPInprocPersistent
+        client = ACPInprocPersistent(**options)
+    elif proto == "a2a" and transport != "grpc":
+        from clients.a2a_sdk_client import A2AClientPersistent
+        client = A2AClientPersistent(a2a_base_url, **options)
+    elif proto == "anp":
+        from clients.anp_sdk_client import ANPClientPersistent
+        client = ANPClientPersistent(anp_base_url, **options)
+    elif proto == "null":
+        from clients.null_client import NullTCPPersistent
+        client = NullTCPPersistent(NULL_BASE_URL, **options)
+    elif proto == "null_noio":
+        from clients.null_client import NullPersistent
+        client = NullPersistent(**options)
+    else:
+        return None
+    try:
+        await client.start()
+    except Exception:
+        # Unwind whatever part of the SDK stack was entered
+        with contextlib.suppress(Exception):
+            await client.close()
+        raise
+    return client
+
+
+async def run_batch_test(proto: str, args) -> dict:
+    """Amortized per-message latency and throughput vs JSON-RPC batch size.
+
+    A2A posts each batch as one JSON-RPC array; MCP/ACP pipeline the batch as
+    outstanding requests on one session. ``args.concurrency`` batches are in
+    flight at a time, so batch size 1 matches the main run.
+    """
+    client = await start_persistent_client(proto, args.transport, args.a2a_base_url, args.anp_base_url, args.mcp_base_url, args.acp_base_url)
+    if client is None or not hasattr(client, "echo_batch"):
+        if client is not None:
+            await client.close()
+        return {"skipped": f"no batch/pipeline path for {proto} over {args.transport}"}
+    msg = "x" * args.payload_bytes
+    out: dict = {}
+    try:
+        for k in args.batch_sizes:
+            batch_lats: list[float] = []
+            ok = 0
+            n_batches = max(1, -(-args.messages // k))
+            sem = asyncio.Semaphore(args.concurrency)
+
+            async def one_batch():
+                nonlocal ok
+                async with sem:
+                    lat, outs = await client.echo_batch([msg] * k)
+                batch_lats.append(lat)
+                ok += sum(1 for o in outs if o == msg)
+
+            t0 = time.perf_counter()
+            await asyncio.gather(*(one_batch() for _ in range(n_batches)))
+            elapsed = time.perf_counter() - t0
+            out[f"batch_{k}"] = {
+                "batch_size": k,
+                "batches": n_batches,
+                "stats_batch": summarize(batch_lats),
+                "stats_amortized_per_msg": summarize([lat / k for lat in batch_lats]),
+                "success": ok,
+                "throughput_msgs_per_sec": float(n_batches * k / elapsed) if elapsed > 0 else 0.0,
+            }
+    finally:
+        with contextlib.suppress(Exception):
+            await client.close()
+    return out
+
+
+# servers.null_echo_server (NULL_PORT)
+NULL_BASE_URL = "tcp://127.0.0.1:8401"
+
+# Null protocol variants run for the harness floor
+HARNESS_FLOOR = {"no_io": "null_noio", "tcp": "null"}
+
+
+async def measure_harness_floor(args) -> dict:
+    """Per-call cost of the harness itself: the null protocol driven
+    through run_client with the main run's transport, connection mode,
+    messages, payload, concurrency, sessions and tracing. ``no_io`` is the
+    harness alone; ``tcp`` adds one raw loopback round trip to
+    servers.null_echo_server (a new connection per call in cold mode).
+    Latencies are timed inside the client like every protocol's;
+    ``harness_overhead`` is the rest of each call's time in run_client
+    (dispatch, bookkeeping, metrics)."""
+    if args.transport == "grpc":
+        # run_client sends only A2A over gRPC, through its own per-call path
+        return {name: {"skipped": "no null path over grpc"} for name in HARNESS_FLOOR}
+    reuse_client = args.connection_mode == "reuse"
+    floor: dict = {}
+    for name, proto in HARNESS_FLOOR.items():
+        call_log: list = []
+        try:
+            await run_client(proto, args.warmup, 8, 1, reuse_client=reuse_client, transport=args.transport)
+            t0 = time.perf_counter()
+            lats_total, _, ok, _ = await run_client(
+                proto,
+                args.messages,
+                args.payload_bytes,
+                args.concurrency,
+                reuse_client=reuse_client,
+                transport=args.transport,
+                call_log=call_log,
+                sessions=args.sessions_per_protocol,
+                trace=args.trace,
+            )
+            elapsed = time.perf_counter() - t0
+        except Exception as e:
+            floor[name] = {"error": f"{type(e).__name__}: {e}"}
+            continue
+        # run_client appends each call's latency and window together
+        walls = [(end - start) * 1000 for start, end in call_log]
+        floor[name] = {
+            "stats_total": summarize(lats_total),
+            "stats_call_wall": summarize(walls),
+            "harness_overhead": summarize([wall - lat for wall, lat in zip(walls, lats_total)]),
+            "success": ok,
+            "throughput_msgs_per_sec": args.messages / elapsed if elapsed > 0 else 0.0,
+        }
+    return floor
+
+
+def over_harness_floor(stats: dict, floor: dict) -> dict:
+    """``stats`` minus each harness floor, per statistic."""
+    out: dict = {}
+    for name, row in floor.items():
+        base = row.get("stats_total")
+        if base:
+            out[name] = {k: stats[k] - base[k] for k in ("avg_ms", "p50_ms", "p95_ms", "p99_ms") if k in stats and k in base}
+    return out
+
+
+SERVER_MODULES = {
+    "mcp": "servers.mcp_sse_server",
+    "acp": "servers.acp_sse_server",
+    "a2a": "servers.a2a_sdk_server",
+    "anp": "servers.anp_sdk_server",
+}
+
+
+async def start_profiling(proto: str, args, procs) -> dict:
+    """Attach sampling profilers to the harness and the server behind
+    ``proto`` for the duration of one protocol run."""
+    from servers import sampler
+
+    outdir = HERE / "out" / "profiles"
+    outdir.mkdir(parents=True, exist_ok=True)
+    base = server_base_url(proto, args)
+    pid = server_pid(procs, SERVER_MODULES[proto]) if base else None
+    state: dict = {"proto": proto, "outdir": outdir, "base": base, "pyspy": []}
+    if args.profiler == "py-spy":
+        targets = [("client", os.getpid())] + ([("server", pid)] if pid else [])
+        rate = str(max(1, int(1000 / args.profile_interval_ms)))
+        for role, target in targets:
+            out = outdir / f"{proto}_{role}.speedscope.json"
+            p = subprocess.Popen(
+                ["py-spy", "record", "--pid", str(target), "--format", "speedscope",
+                 "--output", str(out), "--rate", rate, "--nonblocking"],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            state["pyspy"].append((role, p, out))
+        return state
+    state["client"] = sampler.StackSampler(args.profile_interval_ms / 1000).start()
+    if base:
+        async with httpx.AsyncClient() as c:
+            (await c.post(f"{base}/_bench/profile/start")).raise_for_status()
+    return state
+
+
+async def stop_profiling(state: dict) -> dict:
+    proto, outdir = state["proto"], state["outdir"]
+    report: dict = {}
+    for role, p, out in state["pyspy"]:
+        # py-spy writes its output when interrupted
+        p.send_signal(signal.SIGINT)
+        try:
+            p.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            p.kill()
+        report[role] = {"profiler": "py-spy", "speedscope": str(out), "ok": out.exists()}
+    if "client" in state:
+        state["client"].stop()
+        report["client"] = {"profiler": "builtin", **state["client"].write(str(outdir / f"{proto}_client"), f"{proto} client")}
+        if state["base"]:
+            try:
+                async with httpx.AsyncClient() as c:
+                    r = await c.post(
+                        f"{state['base']}/_bench/profile/stop",
+                        params={"stem": str(outdir / f"{proto}_server"), "name": f"{proto} server"},
+                    )
+                    r.raise_for_status()
+                    report["server"] = {"profiler": "builtin", **r.json()}
+            except Exception as e:
+                report["server"] = {"error": str(e)}
+    if "server" not in report:
+        report["server"] = {"note": f"stdio server profiled for its lifetime into {outdir} (BENCH_PROFILE_DIR)"}
+    return report
+
+
+def server_base_url(proto: str, args) -> str | None:
+    """HTTP base URL of the server behind ``proto`` (None for stdio and
+    in-process servers)."""
+    if args.transport == "inproc" or (proto in ("mcp", "acp") and args.transport != "http"):
+        return None
+    return {
+        "mcp": args.mcp_base_url,
+        "acp": args.acp_base_url,
+        "a2a": args.a2a_base_url,
+        "anp": args.anp_base_url,
+    }.get(proto)
+
+
+async def run_gc_report(proto: str, args, call_log: list) -> dict:
+    """Correlate client and server GC pauses with latency outliers of the
+    main run, then run a separate allocation sampling pass."""
+    from servers import gcprof
+
+    if not call_log:
+        return {}
+    t_start = min(s for s, _ in call_log)
+    t_end = max(e for _, e in call_log)
+    client_pauses = gcprof.install().pauses_between(t_start, t_end)
+    report: dict = {
+        "client": {
+            "pauses": gcprof.summarize_pauses(client_pauses),
+            "correlation": gcprof.correlate(client_pauses, call_log),
+        }
+    }
+    base = server_base_url(proto, args)
+    if base:
+        try:
+            async with httpx.AsyncClient() as c:
+                r = await c.get(f"{base}/_bench/gc", params={"since": t_start, "until": t_end})
+                r.raise_for_status()
+                server_pauses = [tuple(p) for p in r.json()["pauses"]]
+            report["server"] = {
+                "pauses": gcprof.summarize_pauses(server_pauses),
+                "correlation": gcprof.correlate(server_pauses, call_log),
+            }
+            report["combined_correlation"] = gcprof.correlate(client_pauses + server_pauses, call_log)
+        except Exception as e:
+            report["server"] = {"error": str(e)}
+    else:
+        report["server"] = {"skipped": "stdio servers expose no /_bench endpoint"}
+
+    if args.alloc_samples > 0:
+        client = await start_persistent_client(proto, args.transport, args.a2a_base_url, args.anp_base_url, args.mcp_base_url, args.acp_base_url)
+        if client is None:
+            report["alloc"] = {"skipped": f"no persistent client for {proto} over {args.transport}"}
+            return report
+        msg = "x" * args.payload_bytes
+        try:
+            async with httpx.AsyncClient() as c:
+                if base:
+                    await c.post(f"{base}/_bench/alloc/start")
+                report["alloc_client"] = await gcprof.sample_call_allocations(lambda: client.echo(msg), args.alloc_samples)
+                if base:
+                    r = await c.post(f"{base}/_bench/alloc/stop", params={"calls": args.alloc_samples})
+                    report["alloc_server"] = r.json()
+        except Exception as e:
+            report["alloc_error"] = str(e)
+        finally:
+            with contextlib.suppress(Exception):
+                await client.close()
+    return report
+
+
+def server_pid(procs, module: str) -> int | None:
+    """PID of the spawned server running ``module`` (None when external or exited)."""
+    for p in procs:
+        if module in p.args and p.poll() is None:
+            return p.pid
+    return None
+
+
+async def run_slow_consumer_test(proto: str, args, procs) -> dict:
+    """Attach throttled SSE consumers and measure server memory, queue depth
+    and the latency seen by healthy clients of the same server."""
+    from benchmarks.procstats import rss_bytes
+    from clients.sse_slow_consumer import MCPSlowConsumer, A2ASlowConsumer
+
+    token = os.environ.get("A2A_BEARER_TOKEN") if args.auth_mode == "all" else None
+    if proto == "mcp":
+        base_url, module, stats_path = args.mcp_base_url, "servers.mcp_sse_server", "/mcp/debug/sse-stats"
+        consumers = [
+            MCPSlowConsumer(base_url, args.slow_consumer_calls, args.slow_consumer_payload_bytes, args.slow_consumer_read_delay_ms)
+            for _ in range(args.slow_consumers)
+        ]
+    else:
+        base_url, module, stats_path = args.a2a_base_url, "servers.a2a_sdk_server", "/a2a/debug/sse-stats"
+        # The A2A SSE route takes its message in the query string, so volume
+        # comes from replaying a bounded message rather than a large payload
+        message_bytes = min(args.slow_consumer_payload_bytes, 4096)
+        repeat = max(1, args.slow_consumer_calls * args.slow_consumer_payload_bytes // message_bytes)
+        consumers = [
+            A2ASlowConsumer(base_url, message_bytes, repeat, args.slow_consumer_read_delay_ms, token)
+            for _ in range(args.slow_consumers)
+        ]
+    pid = server_pid(procs, module)
+    client_kwargs = dict(
+        transport=args.transport,
+        a2a_base_url=args.a2a_base_url,
+        anp_base_url=args.anp_base_url,
+        mcp_base_url=args.mcp_base_url,
+        acp_base_url=args.acp_base_url,
+        enable_a2a_sse=args.enable_a2a_sse,
+        auth_mode=args.auth_mode,
+    )
+
+    baseline_total, _, baseline_ok, _ = await run_client(
+        proto, args.messages, args.payload_bytes, args.concurrency, **client_kwargs
+    )
+
+    t_start = time.perf_counter()
+    samples: list[dict] = []
+    sampling = True
+
+    async def sample_server():
+        async with httpx.AsyncClient() as c:
+            while sampling:
+                entry = {"t_s": time.perf_counter() - t_start, "rss_bytes": rss_bytes(pid) if pid else None}
+                with contextlib.suppress(Exception):
+                    entry.update((await c.get(f"{base_url}{stats_path}")).json())
+                samples.append(entry)
+                await asyncio.sleep(0.1)
+
+    rss_before = rss_bytes(pid) if pid else None
+    sampler = asyncio.create_task(sample_server())
+    tasks = [asyncio.create_task(c.run()) for c in consumers]
+    await asyncio.sleep(args.slow_consumer_settle_s)
+    slow_total, _, slow_ok, _ = await run_client(
+        proto, args.messages, args.payload_bytes, args.concurrency, **client_kwargs
+    )
+    for t in tasks:
+        t.cancel()
+    consumer_errors = [
+        repr(r) for r in await asyncio.gather(*tasks, return_exceptions=True)
+        if isinstance(r, Exception) and not isinstance(r, asyncio.CancelledError)
+    ]
+    # Keep sampling briefly to see whether the server releases queued memory
+    await asyncio.sleep(1.0)
+    sampling = False
+    await sampler
+
+    rss_values = [s["rss_bytes"] for s in samples if s.get("rss_bytes")]
+    baseline_stats = summarize(baseline_total)
+    slow_stats = summarize(slow_total)
+    return {
+        "slow_consumers": args.slow_consumers,
+        "read_delay_ms": args.slow_consumer_read_delay_ms,
+        "server_rss_before_bytes": rss_before,
+        "server_rss_peak_bytes": max(rss_values) if rss_values else None,
+        "server_rss_growth_bytes": (max(rss_values) - rss_before) if (rss_values and rss_before) else None,
+        "server_rss_after_bytes": rss_values[-1] if rss_values else None,
+        "max_queue_depth": max((s.get("max_pending_events", 0) for s in samples), default=0),
+        "max_send_wait_ms": max((s.get("max_send_wait_ms", 0.0) for s in samples), default=0.0),
+        "slow_events_read": sum(c.events_read for c in consumers),
+        "consumer_errors": consumer_errors,
+        "healthy_baseline": {"stats_total": baseline_stats, "success": baseline_ok},
+        "healthy_with_slow_consumers": {"stats_total": slow_stats, "success": slow_ok},
+        "healthy_p99_delta_ms": (slow_stats.get("p99_ms", 0.0) - baseline_stats.get("p99_ms", 0.0)),
+        "timeline": [
+            {k: s.get(k) for k in ("t_s", "rss_bytes", "pending_events", "active_streams")}
+            for s in samples
+        ],
+    }
+
+
+async def run_discovery_test(args) -> dict:
+    """Cost of fetching discovery documents cold, warm, revalidated (304) and
+    from the client-side cache."""
+    from clients.discovery_cache import DiscoveryCache
+
+    documents = {
+        "a2a_agent_card": f"{args.a2a_base_url.rstrip('/')}/.well-known/agent-card.json",
+        "anp_did_document": f"{args.anp_base_url.rstrip('/')}/.well-known/did.json",
+        "anp_agent_description": f"{args.anp_base_url.rstrip('/')}/anp/agent-description",
+    }
+    out = {}
+    for name, url in documents.items():
+        try:
+            cold, warm, conditional, cached = [], [], [], []
+            for _ in range(args.discovery_repeats):
+                t0 = time.perf_counter()
+                async with httpx.AsyncClient() as c:
+                    (await c.get(url)).raise_for_status()
+                cold.append((time.perf_counter() - t0) * 1000)
+            async with httpx.AsyncClient() as c:
+                first = await c.get(url)
+                first.raise_for_status()
+                for _ in range(args.discovery_repeats):
+                    t0 = time.perf_counter()
+                    (await c.get(url)).raise_for_status()
+                    warm.append((time.perf_counter() - t0) * 1000)
+                revalidating = DiscoveryCache(c, honor_max_age=False)
+                await revalidating.get(url)
+                for _ in range(args.discovery_repeats):
+                    t0 = time.perf_counter()
+                    await revalidating.get(url)
+                    conditional.append((time.perf_counter() - t0) * 1000)
+                cache = DiscoveryCache(c)
+                await cache.get(url)
+                for _ in range(args.discovery_repeats):
+                    t0 = time.perf_counter()
+                    await cache.get(url)
+                    cached.append((time.perf_counter() - t0) * 1000)
+            out[name] = {
+                "url": url,
+                "body_bytes": len(first.content),
+                "etag": first.headers.get("etag"),
+                "cache_control": first.headers.get("cache-control"),
+                "cold": summarize(cold),
+                "warm": summarize(warm),
+                "conditional_304": summarize(conditional),
+                "revalidations": revalidating.stats["revalidated"],
+                "cached": summarize(cached),
+                "cache_hits": cache.stats["cache"],
+            }
+        except Exception as e:
+            out[name] = {"url": url, "error": str(e)}
+    return out
+
+
+async def run_bootstrap_test(proto: str, args) -> dict:
+    """Time-to-first-useful-call, per bootstrap step, for fresh (cold) and
+    already-bootstrapped (warm) agents."""
+    from clients import bootstrap
+    from clients.discovery_cache import DiscoveryCache
+
+    token = os.environ.get("A2A_BEARER_TOKEN") if args.auth_mode == "all" else None
+    msg = "x" * args.payload_bytes
+    warm_state: dict = {}
+
+    async def once(warm: bool):
+        if proto == "a2a":
+            if warm:
+                return await bootstrap.a2a(args.a2a_base_url, msg, http=warm_state["http"], cache=warm_state["cache"], token=token)
+            return await bootstrap.a2a(args.a2a_base_url, msg, token=token)
+        if proto == "anp":
+            if warm:
+                return await bootstrap.anp(args.anp_base_url, msg, http=warm_state["http"], cache=warm_state["cache"], auth=warm_state["auth"])
+            return await bootstrap.anp(args.anp_base_url, msg)
+        tool_cache = warm_state.setdefault("tools", {}) if warm else None
+        session = warm_state["session"] if warm else None
+        if proto == "mcp":
+            return await bootstrap.mcp(args.transport, msg, tool_cache, base_url=args.mcp_base_url, session=session)
+        return await bootstrap.acp(msg, tool_cache, base_url=args.acp_base_url, session=session)
+
+    report = {}
+    # Holds what warm bootstraps share: the HTTP client, or the MCP/ACP session
+    async with contextlib.AsyncExitStack() as stack:
+        for mode in ("cold", "warm"):
+            if mode == "warm" and proto in ("a2a", "anp"):
+                http = await stack.enter_async_context(httpx.AsyncClient(headers={"Authorization": f"Bearer {token}"} if (token and proto == "a2a") else None))
+                warm_state["http"] = http
+                warm_state["cache"] = DiscoveryCache(http)
+                if proto == "anp":
+                    from agent_connect.authentication import DIDWbaAuthHeader
+                    from clients.anp_sdk_client import DID_PATH, PRIV_KEY_PATH
+
+                    warm_state["auth"] = DIDWbaAuthHeader(str(DID_PATH), str(PRIV_KEY_PATH))
+            elif mode == "warm":
+                if proto == "mcp":
+                    from mcp import ClientSession
+
+                    transport = bootstrap.mcp_transport(args.transport, args.mcp_base_url)
+                else:
+                    from acp.client.session import ClientSession
+
+                    transport = bootstrap.acp_transport(args.acp_base_url)
+                warm_state["session"] = await bootstrap.open_session(stack, transport(), ClientSession)
+            if mode == "warm":
+                # The first warm bootstrap fills the caches and is not counted
+                await once(True)
+            steps: dict[str, list[float]] = {}
+            totals: list[float] = []
+            success = 0
+            errors: list[str] = []
+            for _ in range(args.bootstrap_repeats):
+                try:
+                    timings, out = await once(mode == "warm")
+                except Exception as e:
+                    errors.append(repr(e))
+                    continue
+                for step, ms in timings.items():
+                    steps.setdefault(step, []).append(ms)
+                totals.append(sum(timings.values()))
+                success += out == msg
+            report[mode] = {
+                "time_to_first_call": summarize(totals),
+                "steps": {step: summarize(values) for step, values in steps.items()},
+                "success": success,
+                "errors": errors[:5],
+            }
+    return report
+
+
+async def wait_for_port(host: str, port: int, timeout_s: float = 10.0) -> bool:
+    deadline = time.perf_counter() + timeout_s
+    while time.perf_counter() < deadline:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return True
+        except OSError:
+            await asyncio.sleep(0.05)
+    return False
+
+
+TOOL_CATALOG_PORT = 8011
+
+
+async def run_tool_catalog_test(args) -> dict:
+    """``tools/list`` latency and payload size and ``tools/call`` dispatch
+    cost as the MCP tool catalog grows, with and without the server-side
+    cached tool list. Each configuration gets its own server process."""
+    from benchmarks.affinity import pin
+
+    env_keys = ("BENCH_MCP_SYNTH_TOOLS", "BENCH_MCP_TOOL_SCHEMA_BYTES", "BENCH_MCP_TOOL_LIST_CACHE", "MCP_PORT")
+    saved_env = {k: os.environ.get(k) for k in env_keys}
+    out: dict = {}
+    try:
+        for count in args.tool_counts:
+            entry = out.setdefault(f"{count}_synthetic_tools", {})
+            for cached in (False, True):
+                os.environ.update({
+                    "BENCH_MCP_SYNTH_TOOLS": str(count),
+                    "BENCH_MCP_TOOL_SCHEMA_BYTES": str(args.tool_schema_bytes),
+                    "BENCH_MCP_TOOL_LIST_CACHE": "true" if cached else "false",
+                    "MCP_PORT": str(TOOL_CATALOG_PORT),
+                })
+                proc = None
+                client = None
+                try:
+                    if args.transport == "http":
+                        from clients.mcp_sse_client import MCPHttpPersistent
+
+                        proc = subprocess.Popen([sys.executable, "-m", "servers.mcp_sse_server"])
+                        pin(proc.pid, args.server_cpus)
+                        if not await wait_for_port("127.0.0.1", TOOL_CATALOG_PORT):
+                            raise RuntimeError(f"MCP server did not start on port {TOOL_CATALOG_PORT}")
+                        client = MCPHttpPersistent(f"http://127.0.0.1:{TOOL_CATALOG_PORT}")
+                    else:
+                        from clients.mcp_client import MCPStdioPersistent
+
+                        client = MCPStdioPersistent()
+                    # start() lists tools once, so the server-side cache is warm
+                    await client.start()
+                    list_ms: list[float] = []
+                    for _ in range(args.tool_catalog_repeats):
+                        ms, listed = await client.list_tools()
+                        list_ms.append(ms)
+                    echo_ms = [(await client.call_tool("echo", {"message": "x"}))[0] for _ in range(args.tool_catalog_repeats)]
+                    result = {
+                        "tools": len(listed.tools),
+                        "list_tools_payload_bytes": len(listed.model_dump_json(by_alias=True, exclude_none=True)),
+                        "list_tools": summarize(list_ms),
+                        "call_echo": summarize(echo_ms),
+                    }
+                    if count:
+                        # The last synthetic tool carries a full-size schema to validate
+                        name = listed.tools[-1].name
+                        synth_ms = [(await client.call_tool(name, {"field_0": "x"}))[0] for _ in range(args.tool_catalog_repeats)]
+                        result["call_synthetic"] = summarize(synth_ms)
+                    entry["cached" if cached else "uncached"] = result
+                except Exception as e:
+                    entry["cached" if cached else "uncached"] = {"error": str(e)}
+                finally:
+                    if client is not None:
+                        with contextlib.suppress(Exception):
+                            await client.close()
+                    if proc is not None:
+                        proc.terminate()
+                        try:
+                            proc.wait(timeout=3)
+                        except Exception:
+                            proc.kill()
+    finally:
+        for k, v in saved_env.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+    return out
+
+
+async def run_scenario_test(proto: str, scenario, args) -> dict:
+    """Run a weighted operation mix on one persistent session per protocol and
+    break latency down per operation and by whether a large call was in flight."""
+    import random
+    from benchmarks.scenarios import pick, sample
+    from clients.a2a_sse_client import once_stream_echo
+
+    ops, think_spec, dropped = scenario.for_protocol(proto)
+    if not ops:
+        return {"skipped": f"no supported operations (dropped: {dropped})"}
+    client = await start_persistent_client(proto, args.transport, args.a2a_base_url, args.anp_base_url, args.mcp_base_url, args.acp_base_url)
+    if client is None:
+        return {"skipped": f"no persistent client for {proto} over {args.transport}"}
+    token = os.environ.get("A2A_BEARER_TOKEN") if args.auth_mode == "all" else None
+    stream_http = httpx.AsyncClient(timeout=None) if any(op.kind == "stream" for op in ops) else None
+    rng = random.Random(args.scenario_seed)
+    records: list[tuple[str, float, bool, int, bool]] = []
+    errors: list[str] = []
+    remaining = args.messages
+    large_in_flight = 0
+
+    async def call(op, size: int) -> bool:
+        if op.kind == "add":
+            a, b = rng.randint(0, 1_000_000), rng.randint(0, 1_000_000)
+            _, result = await client.add(a, b)
+            return result == a + b
+        msg = "x" * size
+        if op.kind == "stream":
+            _, _, out = await once_stream_echo(args.a2a_base_url, msg, 3, 0, token, client=stream_http)
+        else:
+            out = (await client.echo(msg))[-1]
+        return out == msg
+
+    async def worker():
+        nonlocal remaining, large_in_flight
+        while remaining > 0:
+            remaining -= 1
+            op = pick(ops, rng)
+            size = int(sample(op.payload_bytes, rng)) if op.kind != "add" else 0
+            large = size >= scenario.large_payload_bytes
+            overlapped = large_in_flight > 0
+            large_in_flight += large
+            t0 = time.perf_counter()
+            try:
+                ok = await call(op, size)
+            except Exception as e:
+                ok = False
+                if len(errors) < 5:
+                    errors.append(f"{op.name}: {e!r}")
+            finally:
+                large_in_flight -= large
+            records.append((op.name, (time.perf_counter() - t0) * 1000, ok, size, overlapped))
+            metrics.observe(proto, op.name, records[-1][1], ok)
+            think_ms = sample(think_spec, rng)
+            if think_ms:
+                await asyncio.sleep(think_ms / 1000)
+
+    t_start = time.perf_counter()
+    try:
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    finally:
+        wall_s = time.perf_counter() - t_start
+        if stream_http is not None:
+            await stream_http.aclose()
+        with contextlib.suppress(Exception):
+            await client.close()
+
+    per_op = {}
+    for op in ops:
+        mine = [r for r in records if r[0] == op.name]
+        sizes = [r[3] for r in mine]
+        per_op[op.name] = {
+            "kind": op.kind,
+            "count": len(mine),
+            "success": sum(r[2] for r in mine),
+            "stats": summarize([r[1] for r in mine]),
+            "stats_with_large_in_flight": summarize([r[1] for r in mine if r[4]]),
+            "stats_alone": summarize([r[1] for r in mine if not r[4]]),
+            "payload_bytes": {"avg": float(np.mean(sizes)) if sizes else 0.0, "max": max(sizes, default=0)},
+        }
+    return {
+        "operations": per_op,
+        "overall": summarize([r[1] for r in records]),
+        "success": sum(r[2] for r in records),
+        "throughput_ops_per_sec": len(records) / wall_s if wall_s > 0 else 0.0,
+        "dropped_operations": dropped,
+        "errors": errors,
+    }
+
+
+async def run_server_work_test(proto: str, args) -> dict:
+    """Whether a server keeps serving while handlers are busy: several sessions
+    issue echo calls with the configured server work while a separate session
+    probes with a request that never runs handler work."""
+    from servers import work
+
+    base_url = server_base_url(proto, args)
+    work_ms = work.parse(args.server_work).mean_ms()
+
+    async def probe_once(client, http) -> float:
+        # MCP/ACP ping is answered by the SDK session, never the tool handler;
+        # A2A/ANP discovery documents are served without handler work
+        if proto in ("mcp", "acp"):
+            return await client.ping()
+        path = "/.well-known/agent-card.json" if proto == "a2a" else "/.well-known/did.json"
+        t0 = time.perf_counter()
+        (await http.get(f"{base_url}{path}")).raise_for_status()
+        return (time.perf_counter() - t0) * 1000
+
+    prober = await start_persistent_client(proto, args.transport, args.a2a_base_url, args.anp_base_url, args.mcp_base_url, args.acp_base_url)
+    if prober is None:
+        return {"skipped": f"no persistent client for {proto} over {args.transport}"}
+    sessions = []
+    http = httpx.AsyncClient()
+    try:
+        idle = [await probe_once(prober, http) for _ in range(args.work_probes)]
+        sessions = [
+            await start_persistent_client(proto, args.transport, args.a2a_base_url, args.anp_base_url, args.mcp_base_url, args.acp_base_url)
+            for _ in range(args.concurrency)
+        ]
+        call_ms: list[float] = []
+        loaded: list[float] = []
+        done = False
+
+        async def session_calls(client):
+            for _ in range(args.work_calls_per_session):
+                t0 = time.perf_counter()
+                await client.echo("work")
+                call_ms.append((time.perf_counter() - t0) * 1000)
+                metrics.observe(proto, "work_echo", call_ms[-1], True)
+
+        async def probe_loop():
+            while not done:
+                loaded.append(await probe_once(prober, http))
+                await asyncio.sleep(0.02)
+
+        t_start = time.perf_counter()
+        probe_task = asyncio.create_task(probe_loop())
+        await asyncio.gather(*(session_calls(c) for c in sessions))
+        wall_s = time.perf_counter() - t_start
+        done = True
+        await probe_task
+    finally:
+        await http.aclose()
+        # SDK sessions hold anyio cancel scopes, which must exit in LIFO order
+        for c in reversed([prober, *sessions]):
+            with contextlib.suppress(Exception):
+                await c.close()
+    idle_stats, loaded_stats = summarize(idle), summarize(loaded)
+    return {
+        "sessions": args.concurrency,
+        "calls": len(call_ms),
+        "call": summarize(call_ms),
+        "work_ms_mean": work_ms,
+        # Handler work completed per second of wall time: close to the
+        # session count when the server overlaps handlers, close to 1 when
+        # it serializes them
+        "handler_overlap": len(call_ms) * work_ms / 1000 / wall_s if wall_s > 0 else 0.0,
+        "throughput_calls_per_sec": len(call_ms) / wall_s if wall_s > 0 else 0.0,
+        "probe_idle": idle_stats,
+        "probe_under_load": loaded_stats,
+        "probe_p99_delta_ms": loaded_stats.get("p99_ms", 0.0) - idle_stats.get("p99_ms", 0.0),
+    }
+
+
+async def run_soak_test(proto: str, args, procs) -> dict:
+    """Hold many mostly-idle persistent sessions open, drive a low background
+    rate through them and track server RSS, file descriptors, per-session
+    memory and latency drift."""
+    import random
+    from benchmarks.procstats import rss_bytes, open_fds, cpu_seconds
+
+    if args.transport != "http":
+        # stdio sessions are processes of their own, and inproc servers share
+        # the harness process, so there is no server to watch
+        return {"skipped": f"soak needs --transport http; {proto} runs over {args.transport}"}
+    pid = server_pid(procs, SERVER_MODULES[proto])
+
+    def server_sample() -> dict:
+        return {
+            "rss_bytes": rss_bytes(pid) if pid else None,
+            "open_fds": open_fds(pid) if pid else None,
+            "cpu_s": cpu_seconds(pid) if pid else None,
+        }
+
+    clients: list = []
+    open_errors: list[str] = []
+    release = asyncio.Event()
+    ramp = asyncio.Semaphore(args.soak_ramp_concurrency)
+
+    async def hold_session(opened: asyncio.Future):
+        # Each session lives in its own task so the SDK's cancel scopes are
+        # entered and exited by the same task
+        async with ramp:
+            client = None
+            try:
+                client = await start_persistent_client(proto, args.transport, args.a2a_base_url, args.anp_base_url, args.mcp_base_url, args.acp_base_url)
+                # One call so A2A/ANP sessions hold an open connection too
+                await client.echo("open")
+            except asyncio.CancelledError:
+                # Past the ramp deadline
+                if client is not None:
+                    with contextlib.suppress(Exception):
+                        await client.close()
+                raise
+            except Exception as e:
+                open_errors.append(repr(e))
+                opened.set_result(False)
+                return
+        clients.append(client)
+        opened.set_result(True)
+        try:
+            await release.wait()
+        finally:
+            with contextlib.suppress(Exception):
+                await client.close()
+
+    before = server_sample()
+    t_ramp = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    opened = [loop.create_future() for _ in range(args.soak_sessions)]
+    holders = [asyncio.create_task(hold_session(f)) for f in opened]
+    # A session that neither opens nor fails (a connect the server never
+    # answers) would otherwise hold the ramp forever
+    _, stalled = await asyncio.wait(opened, timeout=args.soak_ramp_timeout_s)
+    for f, holder in zip(opened, holders):
+        if not f.done():
+            holder.cancel()
+    open_errors += [f"TimeoutError('no session within the {args.soak_ramp_timeout_s:g} s ramp')"] * len(stalled)
+    ramp_s = time.perf_counter() - t_ramp
+    await asyncio.sleep(1.0)
+    after_ramp = server_sample()
+
+    calls: list[tuple[float, float, bool]] = []
+    timeline: list[dict] = []
+    running = True
+    t_start = time.perf_counter()
+
+    async def one_call(client):
+        t0 = time.perf_counter()
+        try:
+            ok = (await client.echo("soak"))[-1] == "soak"
+        except Exception:
+            ok = False
+        calls.append((t0 - t_start, (time.perf_counter() - t0) * 1000, ok))
+        metrics.observe(proto, "soak_echo", calls[-1][1], ok)
+
+    async def background():
+        rng = random.Random(0)
+        inflight: set = set()
+        while running and clients:
+            task = asyncio.create_task(one_call(rng.choice(clients)))
+            inflight.add(task)
+            task.add_done_callback(inflight.discard)
+            await asyncio.sleep(1.0 / args.soak_rate)
+        await asyncio.gather(*inflight)
+
+    async def sample_loop():
+        seen = 0
+        while running:
+            await asyncio.sleep(args.soak_sample_s)
+            window = calls[seen:]
+            seen = len(calls)
+            lats = [c[1] for c in window]
+            timeline.append({
+                "t_s": time.perf_counter() - t_start,
+                **server_sample(),
+                "calls": len(window),
+                "errors": sum(not c[2] for c in window),
+                "p50_ms": float(np.percentile(lats, 50)) if lats else None,
+                "p99_ms": float(np.percentile(lats, 99)) if lats else None,
+            })
+
+    bg = asyncio.create_task(background())
+    sampler = asyncio.create_task(sample_loop())
+    await asyncio.sleep(args.soak_duration_s)
+    running = False
+    await bg
+    sampler.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await sampler
+    release.set()
+    await asyncio.gather(*holders, return_exceptions=True)
+    await asyncio.sleep(1.0)
+    after_close = server_sample()
+
+    def slope_per_hour(key: str) -> float | None:
+        points = [(p["t_s"], p[key]) for p in timeline if p.get(key) is not None]
+        if len(points) < 2:
+            return None
+        t, v = np.array(points, dtype=float).T
+        return float(np.polyfit(t, v, 1)[0] * 3600)
+
+    opened = len(clients)
+
+    def per_session(key: str) -> float | None:
+        if not opened or before.get(key) is None or after_ramp.get(key) is None:
+            return None
+        return (after_ramp[key] - before[key]) / opened
+
+    windows = [p for p in timeline if p.get("p50_ms") is not None]
+    return {
+        "sessions_requested": args.soak_sessions,
+        "sessions_open": opened,
+        "open_errors": len(open_errors),
+        "open_ramp_timeouts": len(stalled),
+        "open_error_samples": open_errors[:5],
+        "ramp_s": ramp_s,
+        "keepalive_timeout_s": args.keepalive_timeout_s,
+        "server_before": before,
+        "server_after_ramp": after_ramp,
+        "server_after_close": after_close,
+        "per_session_rss_bytes": per_session("rss_bytes"),
+        "per_session_fds": per_session("open_fds"),
+        "calls": len(calls),
+        "success": sum(c[2] for c in calls),
+        "latency": summarize([c[1] for c in calls]),
+        "drift": {
+            "rss_bytes_per_hour": slope_per_hour("rss_bytes"),
+            "open_fds_per_hour": slope_per_hour("open_fds"),
+            "p50_ms_per_hour": slope_per_hour("p50_ms"),
+            "first_window_p99_ms": windows[0]["p99_ms"] if windows else None,
+            "last_window_p99_ms": windows[-1]["p99_ms"] if windows else None,
+        },
+        "timeline": timeline,
+    }
+
+
+async def run_wire_bytes_test(proto: str, args) -> dict:
+    """Bytes on the wire per call, both directions, headers and framing
+    included, for echo calls of each payload size and for ``add``."""
+    from benchmarks import netem, wire
+
+    base_url = server_base_url(proto, args)
+    proxy = None
+    if base_url is None:
+        if args.transport == "inproc":
+            return {"skipped": "nothing goes over a wire under --transport inproc"}
+        if proto != "mcp":
+            return {"skipped": f"no persistent client for {proto} over {args.transport}"}
+        from clients.mcp_client import MCPStdioPersistent
+
+        tap = wire.StdioTap()
+        client = MCPStdioPersistent(tap=tap)
+        await client.start()
+        counts = tap.counts
+    else:
+        # A pass-through proxy counts every byte of this client's connections
+        proxy = (await netem.start_proxies({proto: base_url}, netem.Impairment()))[proto]
+        urls = {f"{p}_base_url": getattr(args, f"{p}_base_url") for p in ("a2a", "anp", "mcp", "acp")}
+        urls[f"{proto}_base_url"] = proxy.url(base_url)
+        client = await start_persistent_client(proto, args.transport, **urls)
+        if client is None:
+            await proxy.close()
+            return {"skipped": f"no persistent client for {proto} over {args.transport}"}
+
+        def counts() -> tuple[int, int]:
+            return proxy.stats.bytes_up, proxy.stats.bytes_down
+
+    async def measure(call) -> tuple[int, int]:
+        up0, down0 = counts()
+        await call()
+        up1, down1 = counts()
+        return up1 - up0, down1 - down0
+
+    try:
+        setup_up, setup_down = counts()
+        # A2A/ANP connect lazily, so the first call carries connection setup
+        first_up, first_down = await measure(lambda: client.echo("x"))
+        echo = {}
+        for size in args.wire_payload_sizes:
+            msg = "x" * size
+            samples = [await measure(lambda: client.echo(msg)) for _ in range(args.wire_calls)]
+            echo[str(size)] = wire.per_call(samples, size)
+        add = [await measure(lambda: client.add(2, 3)) for _ in range(args.wire_calls)] if hasattr(client, "add") else []
+    finally:
+        with contextlib.suppress(Exception):
+            await client.close()
+        if proxy is not None:
+            await proxy.close()
+    return {
+        "counted_at": "stdio messages" if proxy is None else "tcp",
+        "session_setup_bytes": {"up": setup_up, "down": setup_down},
+        "first_call_bytes": {"up": first_up, "down": first_down},
+        "echo": echo,
+        "add": wire.per_call(add, 0) if add else None,
+    }
+
+
+def trace_summary(spans: list[dict], proto: str, phase: str) -> dict:
+    """Join ``proto``'s client spans from ``phase`` with the server spans
+    they propagated to."""
+
+    def duration_ms(span: dict) -> float:
+        return (span["endTimeUnixNano"] - span["startTimeUnixNano"]) / 1e6
+
+    mine = [
+        s for s in spans
+        if s["kind"] == "client" and s["attributes"].get("protocol") == proto and s["attributes"].get("phase") == phase
+    ]
+    server_spans = {s["traceId"]: s for s in spans if s["kind"] == "server"}
+    server_ms, outside_ms = [], []
+    for span in mine:
+        server = server_spans.get(span["traceId"])
+        if server is not None:
+            server_ms.append(duration_ms(server))
+            outside_ms.append(duration_ms(span) - duration_ms(server))
+    return {
+        "client_spans": len(mine),
+        "propagated": len(server_ms) / len(mine) if mine else 0.0,
+        "client_span_ms": summarize([duration_ms(s) for s in mine]),
+        "server_span_ms": summarize(server_ms),
+        # Client span minus server span: transport, SDK framing and the parts
+        # of server request handling outside the server span
+        "outside_server_ms": summarize(outside_ms),
+    }
+
+
+async def run_tracing_test(proto: str, args, procs) -> dict:
+    """Cost of trace propagation: alternate untraced and traced blocks of
+    sequential echo calls on one persistent session and compare latency and
+    client/server CPU per call."""
+    from benchmarks.procstats import cpu_seconds
+
+    pid = server_pid(procs, SERVER_MODULES[proto])
+    client = await start_persistent_client(proto, args.transport, args.a2a_base_url, args.anp_base_url, args.mcp_base_url, args.acp_base_url)
+    if client is None:
+        return {"skipped": f"no persistent client for {proto} over {args.transport}"}
+    latencies: dict[str, list[float]] = {"off": [], "on": []}
+    client_cpu = {"off": 0.0, "on": 0.0}
+    server_cpu = {"off": 0.0, "on": 0.0}
+    try:
+        for _ in range(args.tracing_rounds):
+            # Alternating blocks spread drift (warming caches, GC) evenly
+            for mode in ("off", "on"):
+                c0, s0 = time.process_time(), cpu_seconds(pid) if pid else None
+                for _ in range(args.tracing_calls):
+                    t0 = time.perf_counter()
+                    if mode == "on":
+                        with tracing.span(f"{proto} echo", "client", protocol=proto, phase="tracing_test"):
+                            await client.echo("trace")
+                    else:
+                        await client.echo("trace")
+                    latencies[mode].append((time.perf_counter() - t0) * 1000)
+                client_cpu[mode] += time.process_time() - c0
+                if s0 is not None:
+                    server_cpu[mode] += cpu_seconds(pid) - s0
+    finally:
+        with contextlib.suppress(Exception):
+            await client.close()
+    calls = args.tracing_rounds * args.tracing_calls
+    off, on = summarize(latencies["off"]), summarize(latencies["on"])
+    return {
+        "calls_per_mode": calls,
+        "latency_off": off,
+        "latency_on": on,
+        "p50_delta_ms": on.get("p50_ms", 0.0) - off.get("p50_ms", 0.0),
+        "p99_delta_ms": on.get("p99_ms", 0.0) - off.get("p99_ms", 0.0),
+        "client_cpu_us_per_call": {m: v / calls * 1e6 for m, v in client_cpu.items()},
+        # Spawned HTTP servers only; stdio servers are children of the SDK client
+        "server_cpu_us_per_call": {m: v / calls * 1e6 for m, v in server_cpu.items()} if pid else None,
+        "spans": trace_summary(tracing.load_spans(TRACE_DIR), proto, "tracing_test"),
+    }
+
+
+async def run_compression_test(proto: str, args, procs) -> dict:
+    """Latency, CPU and wire bytes of sequential large echo calls for each
+    compression config (``identity`` or ``ENC:LEVEL``) and payload size.
+
+    The server is switched through ``/_bench/compression``; requests are
+    compressed with the same codec where the client allows it. Bytes are
+    counted by a pass-through proxy (behind ``--netem`` when given).
+    """
+    import httpx
+    from benchmarks import netem
+    from servers import compression
+    from benchmarks.procstats import cpu_seconds
+
+    base_url = server_base_url(proto, args)
+    if base_url is None:
+        return {"skipped": f"compression applies to HTTP servers; {proto} runs over {args.transport}"}
+    pid = server_pid(procs, SERVER_MODULES[proto])
+    # ACP's SDK SSE client does not accept a custom httpx client
+    compress_requests = proto != "acp"
+    client_env = ("BENCH_REQUEST_COMPRESSION", "BENCH_COMPRESSION_LEVEL", "BENCH_COMPRESSION_MIN_BYTES")
+    saved_env = {k: os.environ.get(k) for k in client_env}
+    proxy = (await netem.start_proxies({proto: base_url}, netem.Impairment()))[proto]
+    urls = {f"{p}_base_url": getattr(args, f"{p}_base_url") for p in ("a2a", "anp", "mcp", "acp")}
+    urls[f"{proto}_base_url"] = proxy.url(base_url)
+    out: dict = {"request_compression": compress_requests, "configs": {}}
+    try:
+        for config in args.compression_configs:
+            encoding, _, level = config.partition(":")
+            encoding = "" if encoding == "identity" else encoding
+            async with httpx.AsyncClient() as http:
+                r = await http.post(
+                    f"{base_url}/_bench/compression",
+                    params={"encodings": encoding or "identity", "level": level, "min_bytes": args.compression_min_bytes},
+                )
+            if r.status_code != 200:
+                out["configs"][config] = {"skipped": f"server did not accept compression config {config!r} (HTTP {r.status_code}); spawned servers need --compression or --test-compression"}
+                continue
+            # Clients read these when they are created and on each request
+            for k in client_env:
+                os.environ.pop(k, None)
+            if encoding and compress_requests:
+                os.environ["BENCH_REQUEST_COMPRESSION"] = encoding
+                os.environ["BENCH_COMPRESSION_MIN_BYTES"] = str(args.compression_min_bytes)
+                if level:
+                    os.environ["BENCH_COMPRESSION_LEVEL"] = level
+            client = await start_persistent_client(proto, args.transport, **urls)
+            if client is None:
+                out["configs"][config] = {"skipped": f"no persistent client for {proto} over {args.transport}"}
+                continue
+            sizes = {}
+            try:
+                for size in args.compression_payload_sizes:
+                    # A new text per call: MCP/ACP compress their SSE stream
+                    # with one compressor per session, and a repeated echo
+                    # would be a back-reference to the previous event
+                    msgs = [compression.sample_text(size, seed=f"{size}:{i}") for i in range(2 + args.compression_calls)]
+                    for msg in msgs[:2]:
+                        await client.echo(msg)
+                    latencies = []
+                    up0, down0 = proxy.stats.bytes_up, proxy.stats.bytes_down
+                    c0, s0 = time.process_time(), cpu_seconds(pid) if pid else None
+                    for msg in msgs[2:]:
+                        t0 = time.perf_counter()
+                        await client.echo(msg)
+                        latencies.append((time.perf_counter() - t0) * 1000)
+                    n = args.compression_calls
+                    sizes[str(size)] = {
+                        "latency": summarize(latencies),
+                        "client_cpu_us_per_call": (time.process_time() - c0) / n * 1e6,
+                        "server_cpu_us_per_call": (cpu_seconds(pid) - s0) / n * 1e6 if s0 is not None else None,
+                        "request_bytes": (proxy.stats.bytes_up - up0) / n,
+                        "response_bytes": (proxy.stats.bytes_down - down0) / n,
+                    }
+            finally:
+                with contextlib.suppress(Exception):
+                    await client.close()
+            out["configs"][config] = sizes
+    finally:
+        await proxy.close()
+        for k, v in saved_env.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+    # Wire bytes relative to the uncompressed config, per direction
+    baseline = out["configs"].get("identity", {})
+    if "skipped" in baseline or not baseline:
+        out["skipped"] = "identity was not measured, so there is nothing to compare the configs with"
+        return out
+    for sizes in out["configs"].values():
+        if "skipped" in sizes:
+            continue
+        for size, row in sizes.items():
+            base = baseline.get(size)
+            if base:
+                row["request_ratio"] = row["request_bytes"] / base["request_bytes"] if base["request_bytes"] else None
+                row["response_ratio"] = row["response_bytes"] / base["response_bytes"] if base["response_bytes"] else None
+    return out
+
+
+def overload_outcome(e: BaseException) -> str:
+    """Classify a failed overload-test call: rejected by admission control
+    (503 or JSON-RPC "overloaded"), past its deadline, or another error."""
+    if isinstance(e, asyncio.TimeoutError):
+        return "timeout"
+    text = str(e).lower()
+    if "overloaded" in text or "503" in text:
+        return "rejected"
+    return "error"
+
+
+def overload_capacity(args) -> float | None:
+    """Calls/s one server can complete: --max-inflight slots each busy for
+    the mean --server-work time (None without both)."""
+    from servers import work
+
+    w = work.parse(args.server_work) if args.server_work else None
+    if not (w and args.max_inflight):
+        return None
+    mean_ms = w.mean_ms()
+    return args.max_inflight / (mean_ms / 1000) if mean_ms > 0 else None
+
+
+async def run_overload_test(proto: str, args, procs) -> dict:
+    """Offer open-loop (Poisson) load at each rate, past saturation, and
+    report goodput, rejections, deadline misses and accepted-call latency."""
+    import random
+    from benchmarks.procstats import cpu_seconds
+
+    base_url = server_base_url(proto, args)
+    pid = server_pid(procs, SERVER_MODULES[proto])
+    deadline_s = args.overload_deadline_ms / 1000
+    msg = "x" * args.payload_bytes
+    clients = []
+    try:
+        for _ in range(args.overload_sessions):
+            client = await start_persistent_client(proto, args.transport, args.a2a_base_url, args.anp_base_url, args.mcp_base_url, args.acp_base_url)
+            if client is None:
+                return {"skipped": f"no persistent client for {proto} over {args.transport}"}
+            clients.append(client)
+            await client.echo("open")
+        steps = []
+        async with httpx.AsyncClient() as http:
+            for rate in args.overload_rates:
+                if base_url:
+                    with contextlib.suppress(httpx.HTTPError):
+                        await http.post(f"{base_url}/_bench/admission/reset")
+                outcomes: list[tuple[str, float]] = []
+                late: set = set()
+
+                async def one(client) -> None:
+                    t0 = time.perf_counter()
+                    # Calls past the deadline are abandoned, not cancelled:
+                    # cancelling an MCP/ACP SDK call as its response arrives
+                    # can break the whole session
+                    call = asyncio.ensure_future(client.echo(msg))
+                    done, _ = await asyncio.wait({call}, timeout=deadline_s)
+                    if not done:
+                        late.add(call)
+                        outcome = "timeout"
+                    elif call.exception() is not None:
+                        outcome = overload_outcome(call.exception())
+                    else:
+                        outcome = "ok"
+                    outcomes.append((outcome, (time.perf_counter() - t0) * 1000))
+
+                rng = random.Random(args.scenario_seed)
+                inflight: set = set()
+                c0, s0 = time.process_time(), cpu_seconds(pid) if pid else None
+                t_start = time.perf_counter()
+                next_at = t_start
+                i = 0
+                # How late each call left against its Poisson arrival time:
+                # past saturation the client's own event loop falls behind
+                # and the load it really offers drops below the step's rate
+                lags_ms: list[float] = []
+                while next_at - t_start < args.overload_duration_s:
+                    delay = next_at - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    lags_ms.append(max(0.0, time.perf_counter() - next_at) * 1000)
+                    task = asyncio.create_task(one(clients[i % len(clients)]))
+                    inflight.add(task)
+                    task.add_done_callback(inflight.discard)
+                    i += 1
+                    next_at += rng.expovariate(rate)
+                send_span = max(time.perf_counter() - t_start, args.overload_duration_s)
+                # Calls still running finish or hit their deadline
+                await asyncio.gather(*inflight)
+                elapsed = time.perf_counter() - t_start
+                # Drain abandoned calls so they do not load the next rate
+                await asyncio.gather(*late, return_exceptions=True)
+                server_cpu = cpu_seconds(pid) - s0 if s0 is not None else None
+                server = None
+                if base_url:
+                    with contextlib.suppress(httpx.HTTPError, ValueError):
+                        r = await http.get(f"{base_url}/_bench/admission")
+                        server = r.json() if r.status_code == 200 else None
+                by = {k: [ms for o, ms in outcomes if o == k] for k in ("ok", "rejected", "timeout", "error")}
+                n = len(outcomes)
+                # A rejection that reaches a lagging client after the deadline
+                # is seen there as a timeout: the server's count is the truth
+                rejected, timeouts = len(by["rejected"]), len(by["timeout"])
+                if server and server.get("rejected") is not None:
+                    late_rejections = max(0, server["rejected"] - rejected)
+                    rejected, timeouts = server["rejected"], max(0, timeouts - late_rejections)
+                steps.append({
+                    "offered_per_s": rate,
+                    "sent": n,
+                    "achieved_offered_per_s": n / send_span,
+                    "schedule_lag_ms": summarize(lags_ms),
+                    "goodput_per_s": len(by["ok"]) / elapsed,
+                    "ok": len(by["ok"]),
+                    "rejected": rejected,
+                    "rejected_source": "server" if server and server.get("rejected") is not None else "client",
+                    "client_rejected": len(by["rejected"]),
+                    "timeouts": timeouts,
+                    "client_timeouts": len(by["timeout"]),
+                    "errors": len(by["error"]),
+                    "rejection_rate": rejected / n if n else 0.0,
+                    "timeout_rate": timeouts / n if n else 0.0,
+                    "accepted_latency": summarize(by["ok"]),
+                    "rejection_latency": summarize(by["rejected"]),
+                    "client_cpu_s": time.process_time() - c0,
+                    "server_cpu_s": server_cpu,
+                    "server_admission": server,
+                })
+    finally:
+        # LIFO: the SDK sessions' cancel scopes are nested in this task
+        for client in reversed(clients):
+            with contextlib.suppress(Exception):
+                await client.close()
+    return {
+        "sessions": args.overload_sessions,
+        "deadline_ms": args.overload_deadline_ms,
+        "capacity_estimate_per_s": overload_capacity(args),
+        "steps": steps,
+    }
+
+
+# How each protocol's client stops a losing or expired attempt
+HEDGE_STOP = {
+    "a2a": "connection close (echo replies are Messages, so no tasks/cancel); server handler runs to completion",
+    "anp": "connection close; server handler runs to completion",
+    "mcp": "notifications/cancelled with the request id; server cancels the handler",
+    "acp": "notifications/cancelled with the request id; server cancels the handler",
+}
+
+
+async def run_hedging_test(proto: str, args, procs) -> dict:
+    """Tail latency with and without hedged requests: alternate blocks of
+    sequential echo calls on a plain client and a hedging client, both under
+    ``--call-deadline-ms`` if set, and compare latency, deadline misses and
+    the extra attempts (and server CPU) hedging costs."""
+    from benchmarks.procstats import cpu_seconds
+    from clients import hedging
+
+    pid = server_pid(procs, SERVER_MODULES[proto])
+    deadline_s = args.call_deadline_ms / 1000 if args.call_deadline_ms else None
+    hedger = hedging.Hedger(args.hedge_quantile, args.hedge_delay_ms)
+    urls = (args.transport, args.a2a_base_url, args.anp_base_url, args.mcp_base_url, args.acp_base_url)
+    clients = {}
+    try:
+        for mode, options in (("off", {}), ("on", {"hedger": hedger})):
+            client = await start_persistent_client(proto, *urls, deadline_s=deadline_s, **options)
+            if client is None:
+                return {"skipped": f"no persistent client for {proto} over {args.transport}"}
+            clients[mode] = client
+        # Fill the hedger's latency window before it is allowed to hedge
+        for _ in range(hedger.min_samples):
+            with contextlib.suppress(hedging.DeadlineExceeded):
+                await clients["on"].echo("warm")
+        hedger.reset()
+        latencies: dict[str, list[float]] = {"off": [], "on": []}
+        missed = {"off": 0, "on": 0}
+        errors = {"off": 0, "on": 0}
+        client_cpu = {"off": 0.0, "on": 0.0}
+        server_cpu = {"off": 0.0, "on": 0.0}
+        for _ in range(args.hedging_rounds):
+            for mode in ("off", "on"):
+                c0, s0 = time.process_time(), cpu_seconds(pid) if pid else None
+                for _ in range(args.hedging_calls):
+                    t0 = time.perf_counter()
+                    try:
+                        await clients[mode].echo("hedge")
+                    except hedging.DeadlineExceeded:
+                        missed[mode] += 1
+                        continue
+                    except Exception:
+                        errors[mode] += 1
+                        continue
+                    latencies[mode].append((time.perf_counter() - t0) * 1000)
+                client_cpu[mode] += time.process_time() - c0
+                if s0 is not None:
+                    server_cpu[mode] += cpu_seconds(pid) - s0
+    finally:
+        # LIFO: the SDK sessions' cancel scopes are nested in this task
+        for client in reversed(list(clients.values())):
+            with contextlib.suppress(Exception):
+                await client.close()
+    calls = args.hedging_rounds * args.hedging_calls
+    off, on = summarize(latencies["off"]), summarize(latencies["on"])
+    stats = hedger.snapshot()
+    return {
+        "calls_per_mode": calls,
+        "deadline_ms": args.call_deadline_ms,
+        "hedge_quantile": None if args.hedge_delay_ms is not None else args.hedge_quantile,
+        "latency_off": off,
+        "latency_on": on,
+        "p50_delta_ms": on.get("p50_ms", 0.0) - off.get("p50_ms", 0.0),
+        "p99_delta_ms": on.get("p99_ms", 0.0) - off.get("p99_ms", 0.0),
+        # summarize() stops at p99; hedging targets the far tail too
+        "p999_ms": {m: float(np.percentile(v, 99.9)) if v else None for m, v in latencies.items()},
+        "deadline_exceeded": missed,
+        "errors": errors,
+        "hedging": stats,
+        "extra_attempts_per_call": stats["hedged"] / stats["calls"] if stats["calls"] else 0.0,
+        "stop_method": HEDGE_STOP.get(proto),
+        "client_cpu_us_per_call": {m: v / calls * 1e6 for m, v in client_cpu.items()},
+        # Spawned HTTP servers only; stdio servers are children of the SDK client
+        "server_cpu_us_per_call": {m: v / calls * 1e6 for m, v in server_cpu.items()} if pid else None,
+    }
+
+
+# Deadline for one oversized echo: large payloads are slow, not faulty
+OVERSIZE_DEADLINE_S = 60.0
+
+
+async def run_oversized(proto: str, args, urls: dict) -> dict:
+    """Echo each --fault-oversize-bytes payload once, then a small message
+    to see whether the connection or session survived the big one."""
+    from benchmarks.faults import error_kind
+
+    client = await start_persistent_client(proto, args.transport, **urls, deadline_s=OVERSIZE_DEADLINE_S)
+    if client is None:
+        return {"skipped": f"no persistent client for {proto} over {args.transport}"}
+    out = {}
+    try:
+        for size in args.fault_oversize_bytes:
+            msg = "x" * size
+            row: dict = {}
+            t0 = time.perf_counter()
+            try:
+                *_, reply = await client.echo(msg)
+                row["ok"] = reply == msg
+                if reply != msg:
+                    row["error"] = f"echo returned {len(reply)} chars"
+            except Exception as e:
+                row["ok"] = False
+                row["error"] = f"{error_kind(e)}: {str(e)[:200]}"
+            row["latency_ms"] = (time.perf_counter() - t0) * 1000
+            try:
+                *_, reply = await client.echo("after")
+                row["next_call_ok"] = reply == "after"
+            except Exception:
+                row["next_call_ok"] = False
+            if not row["next_call_ok"]:
+                # Carry on with the next size on a fresh client
+                with contextlib.suppress(Exception):
+                    await client.close()
+                client = await start_persistent_client(proto, args.transport, **urls, deadline_s=OVERSIZE_DEADLINE_S)
+            out[str(size)] = row
+    finally:
+        with contextlib.suppress(Exception):
+            await client.close()
+    return out
+
+
+async def restart_server(proto: str, args, procs):
+    """SIGKILL ``proto``'s spawned server; returns the coroutine that keeps
+    it down --fault-downtime-ms, respawns it in its slot in ``procs`` and
+    returns once it accepts connections again."""
+    from urllib.parse import urlsplit
+    from benchmarks.affinity import pin
+
+    module = SERVER_MODULES[proto]
+    i = next(i for i, p in enumerate(procs) if module in p.args and p.poll() is None)
+    procs[i].kill()
+    await asyncio.to_thread(procs[i].wait)
+
+    async def respawn() -> float:
+        await asyncio.sleep(args.fault_downtime_ms / 1000)
+        p = subprocess.Popen([sys.executable, "-m", module])
+        pin(p.pid, args.server_cpus)
+        procs[i] = p
+        parts = urlsplit(server_base_url(proto, args))
+        if not await wait_for_port(parts.hostname, parts.port, timeout_s=args.fault_recovery_timeout_s):
+            raise RuntimeError(f"{module} did not come back on port {parts.port}")
+        return time.perf_counter()
+
+    return respawn()
+
+
+async def run_fault(proto: str, args, urls: dict, inject) -> dict:
+    """Probe ``proto`` with sequential echo calls through a
+    :class:`benchmarks.faults.Retrying` client, inject a fault mid-way and
+    measure recovery. ``inject()`` returns once the fault is in effect,
+    with None or, for a server that went away, a coroutine that returns
+    when it accepts connections again."""
+    from benchmarks import faults
+
+    async def start():
+        return await start_persistent_client(proto, args.transport, **urls, deadline_s=args.fault_call_timeout_ms / 1000)
+
+    client = faults.Retrying(start, retries=args.fault_retries, backoff_s=args.fault_backoff_ms / 1000)
+    interval = args.fault_probe_interval_ms / 1000
+    await client.open()
+    try:
+        # Connection setup and first-call auth are not part of the baseline
+        await client.echo("warm")
+        client.calls.clear()
+        client.attempts.clear()
+        for _ in range(args.fault_calls):
+            await client.echo("probe")
+            await asyncio.sleep(interval)
+        ready = await inject()
+        t_fault = time.perf_counter()
+        ready = asyncio.ensure_future(ready) if ready is not None else None
+        stop_at = t_fault + args.fault_recovery_timeout_s
+        healthy = 0
+        while healthy < args.fault_calls and time.perf_counter() < stop_at:
+            ok = await client.echo("probe")
+            healthy = healthy + 1 if ok and (ready is None or ready.done()) else 0
+            await asyncio.sleep(interval)
+        t_ready = await ready if ready is not None else None
+    finally:
+        # ANP signs a new DID header when its token is rejected; MCP/ACP
+        # rebuild sessions whose stream dropped
+        reauths = getattr(client.client, "reauths", None)
+        sessions = client.client.reconnect_stats() if hasattr(client.client, "reconnect_stats") else None
+        await client.close()
+    report = faults.recovery(client, t_fault, t_ready)
+    if reauths is not None:
+        report["reauths"] = reauths
+    if sessions is not None:
+        report["session_reconnects"] = sessions
+    return report
+
+
+async def run_error_handling_test(proto: str, args, procs) -> dict:
+    """Fault suite for one protocol: oversized messages, dropped
+    connections, a server killed and restarted, and revoked credentials.
+    Oversized messages go over a plain client, every other fault gets a
+    fresh retrying one."""
+    import httpx
+    from benchmarks import netem
+
+    urls = {f"{p}_base_url": getattr(args, f"{p}_base_url") for p in ("a2a", "anp", "mcp", "acp")}
+    base_url = server_base_url(proto, args)
+    out: dict = {
+        "policy": {
+            "call_timeout_ms": args.fault_call_timeout_ms,
+            "retries": args.fault_retries,
+            "backoff_ms": args.fault_backoff_ms,
+        },
+        "oversized": await run_oversized(proto, args, urls),
+    }
+
+    async def fault(name: str, fault_urls: dict, inject) -> None:
+        try:
+            out[name] = await run_fault(proto, args, fault_urls, inject)
+        except Exception as e:
+            out[name] = {"error": f"{type(e).__name__}: {e}"}
+
+    if base_url is None:
+        out["connection_drop"] = {"skipped": f"{proto} runs over {args.transport}; no connection to drop"}
+    else:
+        proxy = (await netem.start_proxies({proto: base_url}, netem.Impairment()))[proto]
+        dropped = []
+
+        async def drop():
+            dropped.append(proxy.reset_connections())
+
+        try:
+            await fault("connection_drop", {**urls, f"{proto}_base_url": proxy.url(base_url)}, drop)
+        finally:
+            await proxy.close()
+        out["connection_drop"]["connections_dropped"] = dropped[0] if dropped else None
+
+    if base_url is None:
+        out["server_restart"] = {"skipped": f"the {args.transport} server is a child of the SDK client"}
+    elif server_pid(procs, SERVER_MODULES[proto]) is None:
+        out["server_restart"] = {"skipped": "server not spawned by the harness"}
+    else:
+        await fault("server_restart", urls, lambda: restart_server(proto, args, procs))
+        out["server_restart"]["downtime_ms"] = args.fault_downtime_ms
+
+    if proto != "anp":
+        out["auth_expiry"] = {"skipped": "no expiring credentials: MCP/ACP servers are unauthenticated and the A2A bearer token is static"}
+    elif os.environ.get("ANP_DISABLE_AUTH", "false").lower() in ("1", "true", "yes"):
+        out["auth_expiry"] = {"skipped": "ANP auth is disabled (--auth-mode none)"}
+    else:
+        async def revoke():
+            # Every issued token stops verifying, as on expiry
+            async with httpx.AsyncClient() as http:
+                (await http.post(f"{base_url}/_bench/auth/rotate")).raise_for_status()
+
+        await fault("auth_expiry", urls, revoke)
+    return out
+
+
+async def run_reconnect_test(proto: str, args) -> dict:
+    """Closed-loop echo calls from --concurrency workers on one persistent
+    client for --reconnect-duration-s, first steady, then with a
+    pass-through proxy aborting every connection each
+    --stream-drop-interval-s, as a load balancer cutting long-lived
+    streams would. Reports the throughput penalty, calls lost and retried,
+    and how long MCP/ACP took to rebuild their session."""
+    from collections import Counter
+    from benchmarks import netem
+    from benchmarks.faults import error_kind
+    from clients import hedging
+
+    base_url = server_base_url(proto, args)
+    if base_url is None:
+        return {"skipped": f"{proto} runs over {args.transport}; no stream to drop"}
+    deadline_s = args.call_deadline_ms / 1000 if args.call_deadline_ms else None
+    proxy = (await netem.start_proxies({proto: base_url}, netem.Impairment()))[proto]
+    urls = {f"{p}_base_url": getattr(args, f"{p}_base_url") for p in ("a2a", "anp", "mcp", "acp")}
+    urls[f"{proto}_base_url"] = proxy.url(base_url)
+    out: dict = {"drop_interval_s": args.stream_drop_interval_s, "concurrency": args.concurrency, "deadline_ms": args.call_deadline_ms}
+    try:
+        for mode in ("steady", "drops"):
+            client = await start_persistent_client(proto, args.transport, **urls, deadline_s=deadline_s)
+            if client is None:
+                return {"skipped": f"no persistent client for {proto} over {args.transport}"}
+            latencies: list[float] = []
+            errors: Counter = Counter()
+            drops = 0
+            stop_at = time.perf_counter() + args.reconnect_duration_s
+
+            async def worker() -> None:
+                while time.perf_counter() < stop_at:
+                    t0 = time.perf_counter()
+                    try:
+                        await client.echo("reconnect")
+                    except Exception as e:
+                        errors[error_kind(e)] += 1
+                        continue
+                    latencies.append((time.perf_counter() - t0) * 1000)
+
+            async def dropper() -> None:
+                nonlocal drops
+                while True:
+                    await asyncio.sleep(args.stream_drop_interval_s)
+                    proxy.reset_connections()
+                    drops += 1
+
+            dropping = asyncio.ensure_future(dropper()) if mode == "drops" else None
+            t0 = time.perf_counter()
+            try:
+                await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+            finally:
+                elapsed = time.perf_counter() - t0
+                if dropping is not None:
+                    await hedging.cancel_task(dropping)
+                sessions = client.reconnect_stats() if hasattr(client, "reconnect_stats") else None
+                with contextlib.suppress(Exception):
+                    await client.close()
+            row = {
+                "drops": drops,
+                "calls_ok": len(latencies),
+                "calls_failed": sum(errors.values()),
+                "errors": dict(errors.most_common(5)),
+                "throughput_per_s": len(latencies) / elapsed,
+                "latency": summarize(latencies),
+            }
+            if sessions is not None:
+                row["calls_retried"] = sessions["calls_retried"]
+                row["streams_lost"] = sessions["streams_lost"]
+                row["reconnects"] = sessions["reconnects"]
+                row["failed_reconnects"] = sessions["failed_reconnects"]
+                row["reconnect_latency"] = summarize(sessions["reconnect_ms"])
+            out[mode] = row
+    finally:
+        await proxy.close()
+    steady, dropped = out["steady"], out["drops"]
+    out["throughput_penalty"] = 1 - dropped["throughput_per_s"] / steady["throughput_per_s"] if steady["throughput_per_s"] else None
+    out["p99_delta_ms"] = dropped["latency"].get("p99_ms", 0.0) - steady["latency"].get("p99_ms", 0.0) if dropped["latency"] and steady["latency"] else None
+    return out
+
+
+def compression_encodings(spec: str) -> str:
+    from servers import compression
+
+    try:
+        compression.parse_encodings(spec)
+    except (ValueError, RuntimeError) as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return spec
+
+
+def compression_configs(spec: str) -> list[str]:
+    from servers import compression
+
+    configs = [c.strip() for c in spec.split(",") if c.strip()]
+    for config in configs:
+        encoding, _, level = config.partition(":")
+        if encoding == "identity":
+            continue
+        try:
+            compression.codec(encoding)
+            if level:
+                int(level)
+        except (ValueError, RuntimeError) as e:
+            raise argparse.ArgumentTypeError(f"{config}: {e}")
+    return configs
+
+
+def default_compression_configs() -> list[str]:
+    from servers import compression
+
+    levels = {"gzip": (1, 6, 9), "br": (1, 5, 9), "zstd": (1, 3, 9)}
+    return ["identity"] + [f"{name}:{level}" for name in compression.available() for level in levels[name]]
+
+
+# Per-call deadline of the warmup and main run under --netem
+NETEM_CALL_DEADLINE_MS = 10_000.0
+
+
+def netem_spec(spec: str):
+    from benchmarks import netem
+
+    try:
+        return netem.Impairment.parse(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def work_spec(spec: str) -> str:
+    from servers import work
+
+    try:
+        work.parse(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return spec
+
+
 async def main():
+    from benchmarks import affinity
+
     ap = argparse.ArgumentParser()
     ap.add_argument("--messages", type=int, default=200)  # increased from 50
     ap.add_argument("--concurrency", type=int, default=4)
@@ -311,22 +2078,126 @@ async def main():
     ap.add_argument("--warmup", type=int, default=10)  # increased from 3
     ap.add_argument("--test-payload-variations", action="store_true", help="Test different payload sizes")
     ap.add_argument("--test-concurrency-variations", action="store_true", help="Test different concurrency levels")
-    ap.add_argument("--test-error-handling", action="store_true", help="Test error handling and retry behavior")
+    ap.add_argument("--test-error-handling", action="store_true", help="Fault suite per protocol: oversized messages, dropped connections, server kill+restart, revoked ANP tokens; reports time to detect/recover, retry amplification and latency impact")
     ap.add_argument("--test-auth", action="store_true", help="Test authentication mechanisms")
     ap.add_argument("--connection-mode", choices=["reuse","cold"], default="reuse", help="Reuse one client/session per protocol or open new per call")
-    ap.add_argument("--transport", choices=["http","stdio","grpc"], default="http", help="Transport parity mode: use HTTP/SSE, stdio (MCP only), or gRPC (A2A only)")
+    ap.add_argument("--transport", choices=["http","stdio","grpc","inproc"], default="http", help="Transport parity mode: use HTTP/SSE, stdio (MCP only), gRPC (A2A only), or inproc (the server apps in the harness process: ASGI for A2A/ANP, in-memory streams for MCP/ACP)")
     ap.add_argument("--auth-mode", choices=["none","default","all"], default="none", help="Authentication symmetry: none disables ANP; default enables ANP DID-WBA; all enables ANP + A2A bearer")
     ap.add_argument("--validate", action="store_true", help="Run conformance sanity checks before benchmarking")
+    ap.add_argument("--no-harness-floor", action="store_true", help="Skip the null-protocol calibration run (no-I/O and raw TCP echo through the same client path) and the per-protocol over_harness_floor figures")
     ap.add_argument("--enable-a2a-sse", action="store_true", help="Enable A2A SSE streaming endpoints and client path")
     ap.add_argument("--test-streaming", action="store_true", help="Run streaming TTFB tests where supported")
     ap.add_argument("--include-acp", action="store_true", help="Include ACP variant as an MCP-compatible SDK codepath in benchmarks")
+    ap.add_argument("--sessions-per-protocol", type=int, default=1, help="Open N independent persistent sessions per protocol in reuse mode and spread calls round-robin across them")
+    ap.add_argument("--loop", choices=["asyncio", "uvloop"], default=os.environ.get("BENCH_LOOP", "asyncio"), help="Event loop for the harness and every spawned server (exported as BENCH_LOOP)")
+    ap.add_argument("--server-cpus", type=affinity.parse_cpu_list, default=None, help="Pin spawned servers to these CPUs (e.g. 0-3)")
+    ap.add_argument("--client-cpus", type=affinity.parse_cpu_list, default=None, help="Pin the load generator to these CPUs (e.g. 4-7)")
+    ap.add_argument("--gc-profile", action="store_true", help="Record GC pauses in harness and servers, correlate them with latency outliers, and sample per-call allocations")
+    ap.add_argument("--alloc-samples", type=int, default=50, help="Sequential calls traced with tracemalloc per protocol under --gc-profile (0 disables)")
+    ap.add_argument("--profile", action="store_true", help="Sample CPU stacks of the harness and each protocol's server during its main run; writes flame graph inputs to benchmarks/out/profiles/")
+    ap.add_argument("--profiler", choices=["auto", "builtin", "py-spy"], default="auto", help="Sampling profiler for --profile (auto prefers py-spy when on PATH)")
+    ap.add_argument("--profile-interval-ms", type=float, default=5.0, help="Sampling interval for --profile")
+    ap.add_argument("--test-batching", action="store_true", help="Measure JSON-RPC batching (A2A) and request pipelining (MCP/ACP) vs batch size")
+    ap.add_argument("--batch-sizes", type=lambda v: [int(x) for x in v.split(",") if x], default=[1, 4, 16, 64], help="Comma-separated batch sizes for --test-batching")
+    ap.add_argument("--test-slow-consumers", action="store_true", help="Run the SSE slow-consumer/backpressure scenario (MCP SSE, A2A SSE)")
+    ap.add_argument("--slow-consumers", type=int, default=4, help="Number of throttled SSE consumers per protocol")
+    ap.add_argument("--slow-consumer-read-delay-ms", type=float, default=50.0, help="Delay between events read by each slow consumer")
+    ap.add_argument("--slow-consumer-calls", type=int, default=200, help="Echo calls queued per slow MCP consumer (A2A replays an equivalent volume)")
+    ap.add_argument("--slow-consumer-payload-bytes", type=int, default=65536, help="Payload per queued slow-consumer event")
+    ap.add_argument("--slow-consumer-settle-s", type=float, default=2.0, help="Time for slow consumers to build up a queue before healthy clients run")
+    ap.add_argument("--test-discovery", action="store_true", help="Measure agent card / DID document / agent description fetches: cold, warm, conditional (304) and client-cached")
+    ap.add_argument("--discovery-repeats", type=int, default=50, help="Fetches per document and mode for --test-discovery")
+    ap.add_argument("--test-bootstrap", action="store_true", help="Time discovery, connect/initialize and the first call per protocol, cold and warm")
+    ap.add_argument("--bootstrap-repeats", type=int, default=20, help="Bootstraps per protocol and mode for --test-bootstrap")
+    ap.add_argument("--test-tool-catalog", action="store_true", help="Measure MCP tools/list and tools/call cost as the tool catalog grows, with and without the server-side cached list")
+    ap.add_argument("--tool-counts", type=lambda v: [int(x) for x in v.split(",") if x], default=[0, 100, 500, 1000], help="Comma-separated synthetic tool counts for --test-tool-catalog")
+    ap.add_argument("--tool-schema-bytes", type=int, default=2048, help="Approximate input schema size per synthetic tool")
+    ap.add_argument("--tool-catalog-repeats", type=int, default=30, help="list_tools/call_tool repetitions per configuration")
+    ap.add_argument("--scenario", default=None, help="Run the named mixed workload from benchmarks/scenarios.yaml on each protocol (uses --messages and --concurrency)")
+    ap.add_argument("--scenario-file", default=None, help="Scenario definitions (default benchmarks/scenarios.yaml)")
+    ap.add_argument("--scenario-seed", type=int, default=1234, help="Random seed for operation picks, payload sizes and think times")
+    ap.add_argument("--server-work", type=work_spec, default=None, help="Simulated handler work in every server, <mode>:<ms distribution>; modes sleep|cpu|cpu_thread|cpu_process, e.g. sleep:200, cpu:exp:20, cpu_thread:uniform:5:50")
+    ap.add_argument("--server-work-workers", type=int, default=4, help="Thread/process pool size for cpu_thread/cpu_process work")
+    ap.add_argument("--test-server-work", action="store_true", help="Measure handler overlap and probe latency while sessions run calls with --server-work")
+    ap.add_argument("--work-calls-per-session", type=int, default=20, help="Echo calls per session for --test-server-work")
+    ap.add_argument("--work-probes", type=int, default=20, help="Idle probe requests before loading for --test-server-work")
+    ap.add_argument("--soak", action="store_true", help="Soak test: hold many idle persistent sessions per protocol with a low background call rate and track server RSS, fds and latency drift")
+    ap.add_argument("--soak-sessions", type=int, default=1000, help="Persistent sessions held open per protocol under --soak")
+    ap.add_argument("--soak-duration-s", type=float, default=600.0, help="Background-load duration per protocol under --soak")
+    ap.add_argument("--soak-rate", type=float, default=20.0, help="Background calls per second across all soak sessions")
+    ap.add_argument("--soak-sample-s", type=float, default=5.0, help="Server resource / latency sampling interval under --soak")
+    ap.add_argument("--soak-ramp-concurrency", type=int, default=50, help="Sessions opened concurrently while ramping up")
+    ap.add_argument("--soak-ramp-timeout-s", type=float, default=300.0, help="Deadline for opening all soak sessions; sessions still opening then count as open errors")
+    ap.add_argument("--keepalive-timeout-s", type=int, default=None, help="Idle HTTP keep-alive timeout for spawned servers (uvicorn default 5 s), exported as BENCH_KEEPALIVE_S")
+    ap.add_argument("--test-wire-bytes", action="store_true", help="Count request/response bytes on the wire per call (TCP via a pass-through proxy; stdio pipe messages) and report overhead vs raw payload")
+    ap.add_argument("--wire-payload-sizes", type=lambda v: [int(x) for x in v.split(",") if x], default=[32, 1024, 16384], help="Comma-separated echo payload sizes for --test-wire-bytes")
+    ap.add_argument("--wire-calls", type=int, default=20, help="Sequential calls per payload size for --test-wire-bytes")
+    ap.add_argument("--netem", type=netem_spec, default=None, help="Route client traffic through an in-process impairment proxy per HTTP server, e.g. delay=20,jitter=2,rate=50mbit,loss=0.001,reset=0 (delay is one-way)")
+    ap.add_argument("--netem-seed", type=int, default=1, help="Random seed for netem jitter, loss and resets")
+    ap.add_argument("--trace", action="store_true", help="Run each main-run call in a client span and propagate it to the server (traceparent header for A2A/ANP, _meta for MCP/ACP); spans go to benchmarks/out/traces/")
+    ap.add_argument("--test-tracing", action="store_true", help="Measure latency and CPU overhead of trace propagation per protocol (alternating untraced/traced blocks)")
+    ap.add_argument("--tracing-calls", type=int, default=100, help="Sequential calls per block for --test-tracing")
+    ap.add_argument("--tracing-rounds", type=int, default=5, help="Untraced/traced block pairs for --test-tracing")
+    ap.add_argument("--metrics-port", type=int, default=None, help="Serve live per-protocol/operation call counters and latency histograms in Prometheus text format at http://127.0.0.1:PORT/metrics")
+    ap.add_argument("--metrics-window-s", type=float, default=60.0, help="Rolling window for the live latency quantiles")
+    ap.add_argument("--server-metrics", action="store_true", help="Have HTTP servers count and time requests, served at /_bench/metrics (exported as BENCH_METRICS)")
+    ap.add_argument("--compression", type=compression_encodings, default=None, help="Compress HTTP server responses with the first of these encodings the client accepts, e.g. gzip or zstd,br,gzip (exported as BENCH_COMPRESSION; br/zstd need brotli/zstandard)")
+    ap.add_argument("--compression-level", type=int, default=None, help="Codec level for --compression and --request-compression (default gzip 6, br 4, zstd 3)")
+    ap.add_argument("--compression-min-bytes", type=int, default=1024, help="Smallest body that is compressed")
+    ap.add_argument("--request-compression", type=compression_encodings, default=None, help="Compress A2A/ANP/MCP HTTP request bodies with this encoding (ACP's SDK client cannot)")
+    ap.add_argument("--test-compression", action="store_true", help="Measure latency, CPU and wire bytes of large echo calls per compression config and payload size")
+    ap.add_argument("--compression-configs", type=compression_configs, default=None, help="Comma-separated identity or ENC:LEVEL configs for --test-compression (default identity plus levels 1/mid/9 of every available codec)")
+    ap.add_argument("--compression-payload-sizes", type=lambda v: [int(x) for x in v.split(",") if x], default=[16384, 65536, 262144, 786432], help="Comma-separated echo payload sizes for --test-compression")
+    ap.add_argument("--compression-calls", type=int, default=20, help="Sequential calls per config and payload size for --test-compression")
+    ap.add_argument("--tls", action="store_true", help="Serve every HTTP/SSE server over TLS with a throwaway CA the clients trust, and report full vs resumed handshake cost per server")
+    ap.add_argument("--tls-key-type", choices=["ec", "rsa"], default="ec", help="Key type of the throwaway CA and server certificate (P-256 or RSA 2048)")
+    ap.add_argument("--tls-handshakes", type=int, default=50, help="Full and resumed handshakes per server for the --tls probe")
+    ap.add_argument("--max-inflight", type=int, default=None, help="Per-server admission limit: requests (A2A/ANP) or tool calls (MCP/ACP) worked on at once; excess is rejected fast with 503 / JSON-RPC overloaded (exported as BENCH_MAX_INFLIGHT)")
+    ap.add_argument("--max-queue", type=int, default=0, help="Requests allowed to wait for an admission slot before rejection")
+    ap.add_argument("--queue-timeout-ms", type=float, default=None, help="Longest an admission waiter queues before it is rejected")
+    ap.add_argument("--test-overload", action="store_true", help="Drive open-loop load past saturation per protocol and report goodput, rejection rate, deadline misses and accepted-call latency")
+    ap.add_argument("--overload-rates", type=lambda v: [float(x) for x in v.split(",") if x], default=None, help="Comma-separated offered rates (calls/s) for --test-overload (default 0.5x-4x the capacity implied by --max-inflight and --server-work, else 50,100,200,400,800)")
+    ap.add_argument("--overload-duration-s", type=float, default=5.0, help="Seconds of offered load per rate")
+    ap.add_argument("--overload-sessions", type=int, default=8, help="Persistent sessions the offered load is spread over")
+    ap.add_argument("--overload-deadline-ms", type=float, default=1000.0, help="Client deadline per call; later calls count as timeouts, not goodput")
+    ap.add_argument("--call-deadline-ms", type=float, default=None, help="Per-call deadline for --test-hedging; later calls raise DeadlineExceeded and their attempts are stopped. Under --netem it also bounds warmup and main-run calls (default 10000 there)")
+    ap.add_argument("--test-hedging", action="store_true", help="Compare tail latency of plain vs hedged echo calls per protocol (alternating blocks); pair with e.g. --server-work sleep:lognormal:5:1 for a tail")
+    ap.add_argument("--hedging-calls", type=int, default=100, help="Sequential calls per block for --test-hedging")
+    ap.add_argument("--hedging-rounds", type=int, default=5, help="Plain/hedged block pairs for --test-hedging")
+    ap.add_argument("--hedge-quantile", type=float, default=0.95, help="Hedge once an attempt outlives this quantile of recent attempts")
+    ap.add_argument("--hedge-delay-ms", type=float, default=None, help="Fixed hedge delay instead of --hedge-quantile")
+    ap.add_argument("--fault-calls", type=int, default=50, help="Healthy calls probed before each --test-error-handling fault, and after recovery")
+    ap.add_argument("--fault-probe-interval-ms", type=float, default=20.0, help="Pause between probe calls for --test-error-handling")
+    ap.add_argument("--fault-call-timeout-ms", type=float, default=2000.0, help="Deadline per attempt for --test-error-handling")
+    ap.add_argument("--fault-retries", type=int, default=3, help="Retries per call for --test-error-handling")
+    ap.add_argument("--fault-backoff-ms", type=float, default=50.0, help="First retry backoff for --test-error-handling; doubles per retry")
+    ap.add_argument("--fault-downtime-ms", type=float, default=500.0, help="How long a killed server stays down for --test-error-handling")
+    ap.add_argument("--fault-recovery-timeout-s", type=float, default=30.0, help="Give up on recovery after this long for --test-error-handling")
+    ap.add_argument("--fault-oversize-bytes", type=lambda v: [int(x) for x in v.split(",") if x], default=[1 << 20, 8 << 20, 32 << 20], help="Comma-separated oversized echo payloads for --test-error-handling")
+    ap.add_argument("--test-reconnect", action="store_true", help="Drop every client connection at a fixed interval under closed-loop load and report the throughput penalty, lost/retried calls and MCP/ACP session reconnect latency")
+    ap.add_argument("--reconnect-duration-s", type=float, default=10.0, help="Length of each steady/drops phase for --test-reconnect")
+    ap.add_argument("--stream-drop-interval-s", type=float, default=1.0, help="Seconds between connection drops for --test-reconnect")
     # Real SDK modes only
     ap.add_argument("--mcp-persistent", choices=["auto","on","off"], default="auto", help="Use persistent MCP stdio session (auto honors reuse mode)")
     ap.add_argument("--no-spawn-a2a", action="store_true", help="Do not spawn the A2A SDK server (use external)")
     ap.add_argument("--no-spawn-anp", action="store_true", help="Do not spawn the ANP SDK server (use external)")
     ap.add_argument("--a2a-base-url", default="http://127.0.0.1:8201", help="Base URL for A2A server")
     ap.add_argument("--anp-base-url", default="http://127.0.0.1:8301", help="Base URL for ANP server")
+    ap.add_argument("--mcp-base-url", default="http://127.0.0.1:8001", help="Base URL for the MCP SSE server")
+    ap.add_argument("--acp-base-url", default="http://127.0.0.1:8101", help="Base URL for the ACP SSE server")
     args = ap.parse_args()
+    if args.test_server_work and not args.server_work:
+        ap.error("--test-server-work needs --server-work")
+    if args.transport == "inproc" and args.connection_mode == "cold":
+        ap.error("--transport inproc has no cold path; use --connection-mode reuse")
+    scenario = None
+    if args.scenario:
+        from benchmarks import scenarios
+
+        try:
+            scenario = scenarios.load(args.scenario, args.scenario_file)
+        except (OSError, ValueError) as e:
+            ap.error(str(e))
 
     if args.auth_mode == "none":
         os.environ["ANP_DISABLE_AUTH"] = "true"
@@ -334,12 +2205,158 @@ async def main():
     elif args.auth_mode == "all":
         os.environ["ANP_DISABLE_AUTH"] = "false"
         os.environ.setdefault("A2A_BEARER_TOKEN", "bench-secret-token")
-    procs = start_servers(args.transport, args.no_spawn_a2a, args.no_spawn_anp, include_acp=args.include_acp)
+    if args.gc_profile:
+        from servers import gcprof
+
+        os.environ["BENCH_GC_PROFILE"] = "true"
+        gcprof.install()
+    if args.profile:
+        from servers import sampler
+
+        if args.profiler == "auto":
+            args.profiler = "py-spy" if shutil.which("py-spy") else "builtin"
+        if args.profiler == "builtin" and not sampler.available():
+            print("Warning: builtin sampler needs SIGPROF (POSIX); install py-spy or drop --profile")
+            args.profile = False
+        elif args.profiler == "builtin":
+            os.environ["BENCH_PROFILE"] = "true"
+            os.environ["BENCH_PROFILE_INTERVAL_S"] = str(args.profile_interval_ms / 1000)
+            os.environ["BENCH_PROFILE_DIR"] = str(HERE / "out" / "profiles")
+    if args.keepalive_timeout_s is not None:
+        os.environ["BENCH_KEEPALIVE_S"] = str(args.keepalive_timeout_s)
+    if args.soak:
+        from benchmarks.procstats import raise_fd_limit
+
+        # Thousands of sessions need more descriptors than the usual soft
+        # limit, in the harness and in the servers it spawns
+        raise_fd_limit()
+    if args.server_work:
+        os.environ["BENCH_WORK"] = args.server_work
+        os.environ["BENCH_WORK_WORKERS"] = str(args.server_work_workers)
+    else:
+        os.environ.pop("BENCH_WORK", None)
+    if args.trace or args.test_tracing:
+        # Fresh span files per run; servers (including stdio servers spawned
+        # by the clients) export to the same directory
+        shutil.rmtree(TRACE_DIR, ignore_errors=True)
+        os.environ["BENCH_TRACE_DIR"] = str(TRACE_DIR)
+        tracing.install(TRACE_DIR)
+    else:
+        os.environ.pop("BENCH_TRACE_DIR", None)
+    if args.server_metrics:
+        os.environ["BENCH_METRICS"] = "true"
+        os.environ["BENCH_METRICS_WINDOW_S"] = str(args.metrics_window_s)
+    else:
+        os.environ.pop("BENCH_METRICS", None)
+    if args.compression or args.request_compression or args.test_compression:
+        # "identity" installs the middleware (request decoding, runtime
+        # reconfiguration) without compressing responses
+        os.environ["BENCH_COMPRESSION"] = args.compression or "identity"
+        os.environ["BENCH_COMPRESSION_MIN_BYTES"] = str(args.compression_min_bytes)
+        if args.compression_level is not None:
+            os.environ["BENCH_COMPRESSION_LEVEL"] = str(args.compression_level)
+    else:
+        os.environ.pop("BENCH_COMPRESSION", None)
+    if args.request_compression:
+        os.environ["BENCH_REQUEST_COMPRESSION"] = args.request_compression
+    else:
+        os.environ.pop("BENCH_REQUEST_COMPRESSION", None)
+    if args.test_compression and args.compression_configs is None:
+        args.compression_configs = default_compression_configs()
+    if args.test_slow_consumers:
+        # Servers only install SSE queue accounting when asked to
+        os.environ["BENCH_SSE_STATS"] = "true"
+    if args.test_error_handling:
+        # Servers only expose fault endpoints (ANP key rotation) when asked to
+        os.environ["BENCH_FAULTS"] = "true"
+    if args.max_inflight:
+        os.environ["BENCH_MAX_INFLIGHT"] = str(args.max_inflight)
+        os.environ["BENCH_MAX_QUEUE"] = str(args.max_queue)
+        if args.queue_timeout_ms is not None:
+            os.environ["BENCH_QUEUE_TIMEOUT_MS"] = str(args.queue_timeout_ms)
+        else:
+            os.environ.pop("BENCH_QUEUE_TIMEOUT_MS", None)
+    else:
+        os.environ.pop("BENCH_MAX_INFLIGHT", None)
+    if args.test_overload and args.overload_rates is None:
+        capacity = overload_capacity(args)
+        args.overload_rates = [round(capacity * m, 1) for m in (0.5, 1, 1.5, 2, 4)] if capacity else [50, 100, 200, 400, 800]
+    tls_dir = None
+    if args.tls:
+        from benchmarks import tls
+
+        # Throwaway PKI, removed when the run ends; SSL_CERT_FILE makes every
+        # httpx client (harness and SDKs) trust this CA only
+        tls_dir = pathlib.Path(tempfile.mkdtemp(prefix="bench-tls-"))
+        ca, cert, key = tls.make_certs(tls_dir, args.tls_key_type)
+        os.environ["BENCH_TLS_CERT"] = str(cert)
+        os.environ["BENCH_TLS_KEY"] = str(key)
+        os.environ["SSL_CERT_FILE"] = str(ca)
+        for name in ("a2a", "anp", "mcp", "acp"):
+            url = getattr(args, f"{name}_base_url")
+            if url.startswith("http://"):
+                setattr(args, f"{name}_base_url", "https://" + url[len("http://"):])
+    else:
+        os.environ.pop("BENCH_TLS_CERT", None)
+        os.environ.pop("BENCH_TLS_KEY", None)
+    available_cpus = affinity.available_cpus()
+    if (args.server_cpus or args.client_cpus) and not affinity.supported():
+        print("Warning: CPU pinning is not supported on this platform; running unpinned")
+    for label, cpus in (("server", args.server_cpus), ("client", args.client_cpus)):
+        if cpus and available_cpus is not None and not cpus <= available_cpus:
+            print(f"Warning: --{label}-cpus includes CPUs outside the available set {sorted(available_cpus)}")
+    if args.server_cpus and args.client_cpus and args.server_cpus & args.client_cpus:
+        print(f"Warning: server and client CPU sets overlap on {sorted(args.server_cpus & args.client_cpus)}; expect cross-interference")
+    if args.server_cpus and args.transport == "stdio":
+        print("Warning: stdio servers are spawned by the client and run on --client-cpus")
+    # Servers are spawned before the harness pins itself so they never
+    # inherit the client CPU set
+    procs = start_servers(
+        args.transport,
+        args.no_spawn_a2a,
+        args.no_spawn_anp,
+        include_acp=args.include_acp,
+        server_cpus=args.server_cpus,
+        null_server=not args.no_harness_floor,
+    )
+    affinity.pin(0, args.client_cpus)
+    metrics_server = None
+    proxies = {}
     try:
+        if args.netem and args.transport == "inproc":
+            print("Warning: --netem has no network to impair under --transport inproc")
+        elif args.netem:
+            from benchmarks import netem
+
+            # Servers keep their ports; clients are pointed at the proxies
+            targets = {"a2a": args.a2a_base_url, "anp": args.anp_base_url}
+            if args.transport == "http":
+                targets.update(mcp=args.mcp_base_url, acp=args.acp_base_url)
+            else:
+                print("Warning: --netem leaves stdio servers unimpaired")
+            proxies = await netem.start_proxies(targets, args.netem, args.netem_seed)
+            for name, proxy in proxies.items():
+                setattr(args, f"{name}_base_url", proxy.url(getattr(args, f"{name}_base_url")))
+            print(f"Network impairment {args.netem.describe()} via proxies on ports {[p.port for p in proxies.values()]}")
+        if args.metrics_port:
+            metrics_server = await metrics.start_server(metrics.install(args.metrics_window_s), port=args.metrics_port)
+            print(f"Live metrics at http://127.0.0.1:{args.metrics_port}/metrics")
+        if args.server_metrics:
+            print("Server metrics at <server base URL>/_bench/metrics (HTTP transports)")
         if args.validate:
             print("Validating protocol endpoints...")
-            v = await validate_protocols(args.transport, args.a2a_base_url, args.anp_base_url, include_acp=args.include_acp)
+            v = await validate_protocols(
+                args.transport,
+                args.a2a_base_url,
+                args.anp_base_url,
+                include_acp=args.include_acp,
+                mcp_base_url=args.mcp_base_url,
+                acp_base_url=args.acp_base_url,
+            )
             print(json.dumps({"validation": v}, indent=2))
+        # A reset can lose a request for good (the MCP SDK only logs a failed
+        # POST), so under --netem every call gets a deadline
+        netem_deadline_s = (args.call_deadline_ms or NETEM_CALL_DEADLINE_MS) / 1000 if args.netem else None
         # Warmup all protocols equally for fair comparison
         print("Warming up all protocols...")
         protos = ["mcp","a2a","anp"] + (["acp"] if args.include_acp else [])
@@ -356,14 +2373,29 @@ async def main():
                 transport=args.transport,
                 a2a_base_url=args.a2a_base_url,
                 anp_base_url=args.anp_base_url,
+                mcp_base_url=args.mcp_base_url,
+                acp_base_url=args.acp_base_url,
                 enable_a2a_sse=args.enable_a2a_sse,
                 auth_mode=args.auth_mode,
+                call_errors={} if (args.netem or args.max_inflight) else None,
+                deadline_s=netem_deadline_s,
             )
 
+        harness_floor = None
+        if not args.no_harness_floor:
+            print("Measuring the harness floor (null protocol)...")
+            harness_floor = await measure_harness_floor(args)
+
         results = {}
         print("Running main benchmarks...")
         for proto in protos:
             print(f"Testing {proto}...")
+            call_log = [] if args.gc_profile else None
+            session_log = {} if args.sessions_per_protocol > 1 else None
+            # Injected resets (--netem reset=P) and admission control
+            # (--max-inflight) fail calls; count them
+            call_errors = {} if (args.netem or args.max_inflight) else None
+            profiling = await start_profiling(proto, args, procs) if args.profile else None
             t0 = time.perf_counter()
             lats_total, lats_rpc, ok, connect_init = await run_client(
                 proto,
@@ -377,10 +2409,19 @@ async def main():
                 transport=args.transport,
                 a2a_base_url=args.a2a_base_url,
                 anp_base_url=args.anp_base_url,
+                mcp_base_url=args.mcp_base_url,
+                acp_base_url=args.acp_base_url,
                 enable_a2a_sse=args.enable_a2a_sse,
                 auth_mode=args.auth_mode,
+                call_log=call_log,
+                sessions=args.sessions_per_protocol,
+                session_log=session_log,
+                trace=args.trace,
+                call_errors=call_errors,
+                deadline_s=netem_deadline_s,
             )
             elapsed = time.perf_counter() - t0
+            profile_report = await stop_profiling(profiling) if profiling else None
             throughput = (args.messages / elapsed) if elapsed > 0 else 0.0
             results[proto] = {
                 "stats_total": summarize(lats_total),
@@ -391,17 +2432,55 @@ async def main():
                 "latencies_rpc": lats_rpc,
                 "connect_init_ms": connect_init.get("connect_init_ms", 0.0),
             }
+            if call_errors is not None:
+                results[proto]["call_errors"] = call_errors
+            # A2A over SSE streams each call on its own client, a path the
+            # null protocol does not take
+            if harness_floor and not (proto == "a2a" and args.enable_a2a_sse and args.transport == "http"):
+                results[proto]["over_harness_floor"] = over_harness_floor(results[proto]["stats_total"], harness_floor)
+            if session_log:
+                results[proto]["sessions"] = session_fairness(session_log)
+            if profile_report is not None:
+                results[proto]["profile"] = profile_report
+            if args.gc_profile:
+                results[proto]["gc_profile"] = await run_gc_report(proto, args, call_log)
+            if args.trace:
+                results[proto]["trace"] = trace_summary(tracing.load_spans(TRACE_DIR), proto, "main")
 
         # Add statistical comparisons
         print("Performing statistical analysis...")
         results_for_stats = {k: {"latencies": v["latencies_total"]} for k, v in results.items() if k in protos}
         results["statistical_comparisons"] = statistical_comparison(results_for_stats)
+        if harness_floor is not None:
+            results["harness_floor"] = harness_floor
         results["meta"] = {
             "transport": args.transport,
             "connection_mode": args.connection_mode,
             "auth_mode": args.auth_mode,
             "protocols": protos,
             "include_acp": bool(args.include_acp),
+            "profiler": args.profiler if args.profile else None,
+            "loop": args.loop,
+            "loop_impl": f"{type(asyncio.get_running_loop()).__module__}.{type(asyncio.get_running_loop()).__name__}",
+            "cpu_topology": affinity.topology(args.server_cpus, args.client_cpus, available_cpus),
+            "server_work": args.server_work,
+            "sessions_per_protocol": args.sessions_per_protocol,
+            "metrics_port": args.metrics_port,
+            "server_metrics": bool(args.server_metrics),
+            "trace": bool(args.trace),
+            "netem": args.netem.describe() if args.netem else None,
+            "compression": {
+                "encodings": args.compression,
+                "level": args.compression_level,
+                "min_bytes": args.compression_min_bytes,
+                "request": args.request_compression,
+            } if args.compression or args.request_compression else None,
+            "tls": {"key_type": args.tls_key_type} if args.tls else None,
+            "admission": {
+                "max_inflight": args.max_inflight,
+                "max_queue": args.max_queue,
+                "queue_timeout_ms": args.queue_timeout_ms,
+            } if args.max_inflight else None,
         }
 
         # Test payload variations if requested
@@ -420,6 +2499,8 @@ async def main():
                         transport=args.transport,
                         a2a_base_url=args.a2a_base_url,
                         anp_base_url=args.anp_base_url,
+                        mcp_base_url=args.mcp_base_url,
+                        acp_base_url=args.acp_base_url,
                     )
                     size_results[proto] = {"stats_total": summarize(lts), "stats_rpc": summarize(lrs), "success": ok}
                 results["payload_variations"][f"{payload_size}_bytes"] = size_results
@@ -440,6 +2521,8 @@ async def main():
                         transport=args.transport,
                         a2a_base_url=args.a2a_base_url,
                         anp_base_url=args.anp_base_url,
+                        mcp_base_url=args.mcp_base_url,
+                        acp_base_url=args.acp_base_url,
                     )
                     conc_results[proto] = {"stats_total": summarize(lts), "stats_rpc": summarize(lrs), "success": ok}
                 results["concurrency_variations"][f"concurrency_{concurrency}"] = conc_results
@@ -456,39 +2539,145 @@ async def main():
                 "ok": bool(out == "streaming-hello"),
             }
 
-        # Test error handling removed until clients implemented
-        if args.test_error_handling:
-            print("Skipping error handling tests (not implemented)")
+        # JSON-RPC batching / pipelining
+        if args.test_batching:
+            print("Testing batching and pipelining...")
+            results["batching"] = {}
+            for proto in protos:
+                if proto == "anp":
+                    results["batching"][proto] = {"skipped": "ANP messages are not JSON-RPC; no batch envelope"}
+                    continue
+                results["batching"][proto] = await run_batch_test(proto, args)
 
-            # Test with invalid message (should fail gracefully)
-            error_results = {}
-            for proto in ("mcp","acp","a2a","anp"):
-                try:
-                    # Send very large message to trigger potential errors
-                    large_msg = "x" * 10000
-                    if proto=="mcp":
-                        from clients.mcp_http_client import once_echo
-                        lat, out = await once_echo("http://127.0.0.1:8001/mcp", large_msg)
-                    elif proto=="acp":
-                        from clients.acp_client import once_echo
-                        lat, out = await once_echo("http://127.0.0.1:8101", large_msg)
-                    elif proto=="a2a":
-                        from clients.a2a_client import once_echo
-                        lat, out = await once_echo("http://127.0.0.1:8201", large_msg)
-                    elif proto=="anp":
-                        from clients.anp_client import once_echo
-                        lat, out = await once_echo("http://127.0.0.1:8301", large_msg)
-
-                    error_results[proto] = {
-                        "large_message_handled": out == large_msg,
-                        "latency_ms": lat
-                    }
-                except Exception as e:
-                    error_results[proto] = {
-                        "large_message_handled": False,
-                        "error": str(e)
-                    }
-            results["error_handling"]["large_messages"] = error_results
+        # SSE backpressure: throttled consumers vs healthy clients
+        if args.test_slow_consumers:
+            print("Testing slow SSE consumers...")
+            results["slow_consumer"] = {}
+            for proto in ("mcp", "a2a"):
+                if proto == "mcp" and args.transport != "http":
+                    results["slow_consumer"][proto] = {"skipped": "MCP SSE requires --transport http"}
+                    continue
+                if proto == "a2a" and args.transport == "grpc":
+                    results["slow_consumer"][proto] = {"skipped": "A2A SSE requires HTTP"}
+                    continue
+                print(f"Slow consumers against {proto}...")
+                results["slow_consumer"][proto] = await run_slow_consumer_test(proto, args, procs)
+
+        # Discovery documents: cold vs warm vs revalidated vs cached
+        if args.test_discovery:
+            print("Testing discovery document fetches...")
+            results["discovery"] = await run_discovery_test(args)
+
+        # Full agent bootstrap: discovery -> connect/initialize -> first call
+        if args.test_bootstrap:
+            print("Testing agent bootstrap...")
+            results["bootstrap"] = {}
+            for proto in protos:
+                if args.transport == "grpc" and proto != "a2a":
+                    results["bootstrap"][proto] = {"skipped": "gRPC transport is A2A only"}
+                    continue
+                if args.transport == "grpc" or (proto == "acp" and args.transport != "http"):
+                    results["bootstrap"][proto] = {"skipped": f"no {args.transport} bootstrap path"}
+                    continue
+                results["bootstrap"][proto] = await run_bootstrap_test(proto, args)
+
+        # MCP tool catalog scaling
+        if args.test_tool_catalog:
+            print("Testing MCP tool catalog scaling...")
+            if args.transport == "grpc":
+                results["tool_catalog"] = {"skipped": "MCP has no gRPC transport"}
+            else:
+                results["tool_catalog"] = await run_tool_catalog_test(args)
+
+        # Mixed workload
+        if scenario is not None:
+            print(f"Running scenario {scenario.name}...")
+            results["scenario"] = {"name": scenario.name, "description": scenario.description, "seed": args.scenario_seed}
+            for proto in protos:
+                results["scenario"][proto] = await run_scenario_test(proto, scenario, args)
+
+        # Handler overlap under simulated server work
+        if args.test_server_work:
+            print(f"Testing server work isolation ({args.server_work})...")
+            results["server_work"] = {"spec": args.server_work}
+            for proto in protos:
+                results["server_work"][proto] = await run_server_work_test(proto, args)
+
+        # Idle-session soak
+        if args.soak:
+            print(f"Soak test: {args.soak_sessions} sessions per protocol for {args.soak_duration_s:.0f}s...")
+            results["soak"] = {}
+            for proto in protos:
+                print(f"Soaking {proto}...")
+                results["soak"][proto] = await run_soak_test(proto, args, procs)
+
+        if args.test_wire_bytes:
+            print("Counting wire bytes per call...")
+            results["wire_bytes"] = {}
+            for proto in protos:
+                results["wire_bytes"][proto] = await run_wire_bytes_test(proto, args)
+
+        if args.test_tracing:
+            print("Measuring trace propagation overhead...")
+            results["tracing"] = {}
+            for proto in protos:
+                print(f"Tracing {proto}...")
+                results["tracing"][proto] = await run_tracing_test(proto, args, procs)
+
+        if args.tls:
+            from benchmarks import tls
+
+            print("Probing TLS handshakes...")
+            results["tls"] = {}
+            for proto in protos:
+                base_url = server_base_url(proto, args)
+                if base_url is None:
+                    results["tls"][proto] = {"skipped": f"{proto} runs over {args.transport}"}
+                    continue
+                probe = await asyncio.to_thread(tls.probe, base_url, args.tls_handshakes, os.environ["SSL_CERT_FILE"])
+                # Cold mode opens a connection, and so pays a full handshake,
+                # per call; reuse mode pays it once per session
+                p50 = results.get(proto, {}).get("stats_total", {}).get("p50_ms")
+                if p50:
+                    probe["handshake_share_of_p50"] = probe["full_handshake_ms"].get("p50", 0.0) / p50
+                results["tls"][proto] = probe
+
+        if args.test_compression:
+            print("Measuring compression cost per config and payload size...")
+            results["compression"] = {}
+            for proto in protos:
+                print(f"Compression {proto}...")
+                results["compression"][proto] = await run_compression_test(proto, args, procs)
+
+        if args.test_overload:
+            print(f"Overload test at {args.overload_rates} calls/s...")
+            if not args.max_inflight:
+                print("Warning: --test-overload without --max-inflight measures servers that never shed load")
+            results["overload"] = {}
+            for proto in protos:
+                print(f"Overloading {proto}...")
+                results["overload"][proto] = await run_overload_test(proto, args, procs)
+
+        if args.test_hedging:
+            print("Measuring hedged requests...")
+            results["hedging"] = {}
+            for proto in protos:
+                print(f"Hedging {proto}...")
+                results["hedging"][proto] = await run_hedging_test(proto, args, procs)
+
+        if args.test_reconnect:
+            print(f"Dropping connections every {args.stream_drop_interval_s} s...")
+            results["reconnect"] = {}
+            for proto in protos:
+                print(f"Reconnect {proto}...")
+                results["reconnect"][proto] = await run_reconnect_test(proto, args)
+
+        if args.test_error_handling:
+            print("Injecting faults...")
+            results["error_handling"] = {}
+            for proto in protos:
+                print(f"Faults {proto}...")
+                results["error_handling"][proto] = await run_error_handling_test(proto, args, procs)
 
         # Test authentication if requested
         if args.test_auth:
@@ -501,6 +2690,9 @@ async def main():
                 "anp": "Supports DID-based authentication with signatures"
             }
 
+        if proxies:
+            results["netem"] = {name: proxy.stats.as_dict() for name, proxy in proxies.items()}
+
         # Remove raw latency data before saving (too large)
         for proto in protos:
             for key in ("latencies_total","latencies_rpc"):
@@ -514,12 +2706,29 @@ async def main():
         print(json.dumps(results, indent=2))
 
     finally:
+        if metrics_server is not None:
+            metrics_server.close()
+        for proxy in proxies.values():
+            await proxy.close()
+        if args.transport == "inproc":
+            from clients import inproc
+
+            await inproc.close()
         for p in procs:
             p.terminate()
             try:
                 p.wait(timeout=3)
             except Exception:
                 p.kill()
+        if tls_dir is not None:
+            shutil.rmtree(tls_dir, ignore_errors=True)
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    from servers import runtime
+
+    # The loop must be chosen before main() runs, so --loop is read up front
+    # and exported for every server the harness (or an SDK client) spawns
+    loop_ap = argparse.ArgumentParser(add_help=False)
+    loop_ap.add_argument("--loop", choices=runtime.LOOPS, default=os.environ.get("BENCH_LOOP", "asyncio"))
+    os.environ["BENCH_LOOP"] = loop_ap.parse_known_args()[0].loop
+    runtime.run(main)
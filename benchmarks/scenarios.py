@@ -0,0 +1,85 @@
+"""Mixed-workload scenarios (weighted operation mixes) for ``--scenario``.
+
+Definitions live in ``benchmarks/scenarios.yaml``; see the header there for
+the format. Sampling takes an explicit ``random.Random`` so a seed
+reproduces the same mix.
+"""
+import pathlib
+import random
+from dataclasses import dataclass, field
+
+# The distribution sampler lives with the server work that also draws from it
+from servers.work import sample
+
+KINDS = ("echo", "add", "stream")
+# Operation kinds each protocol's persistent client can issue
+SUPPORTED_KINDS = {
+    "mcp": {"echo", "add"},
+    "acp": {"echo", "add"},
+    "a2a": {"echo", "add", "stream"},
+    "anp": {"echo", "add"},
+}
+DEFAULT_FILE = pathlib.Path(__file__).resolve().parent / "scenarios.yaml"
+
+
+@dataclass
+class Operation:
+    name: str
+    kind: str
+    weight: float
+    payload_bytes: dict | None = None
+
+
+@dataclass
+class Scenario:
+    name: str
+    description: str
+    operations: list[Operation]
+    think_time_ms: dict | None = None
+    large_payload_bytes: int = 65536
+    protocols: dict = field(default_factory=dict)
+
+    def for_protocol(self, proto: str) -> tuple[list[Operation], dict | None, list[str]]:
+        """Operations, think-time spec and dropped operation names for ``proto``."""
+        overrides = self.protocols.get(proto) or {}
+        weights = overrides.get("weights") or {}
+        ops: list[Operation] = []
+        dropped: list[str] = []
+        for op in self.operations:
+            weight = float(weights.get(op.name, op.weight))
+            if op.kind not in SUPPORTED_KINDS.get(proto, set()) or weight <= 0:
+                dropped.append(op.name)
+                continue
+            ops.append(Operation(op.name, op.kind, weight, op.payload_bytes))
+        return ops, overrides.get("think_time_ms", self.think_time_ms), dropped
+
+
+def load(name: str, path: str | pathlib.Path | None = None) -> Scenario:
+    import yaml
+
+    path = pathlib.Path(path or DEFAULT_FILE)
+    with open(path) as f:
+        scenarios = (yaml.safe_load(f) or {}).get("scenarios") or {}
+    if name not in scenarios:
+        raise ValueError(f"scenario {name!r} not found in {path} (available: {', '.join(sorted(scenarios))})")
+    spec = scenarios[name]
+    operations = []
+    for op_name, op in (spec.get("operations") or {}).items():
+        kind = op.get("kind", "echo")
+        if kind not in KINDS:
+            raise ValueError(f"scenario {name!r}: operation {op_name!r} has unknown kind {kind!r}")
+        operations.append(Operation(op_name, kind, float(op.get("weight", 1)), op.get("payload_bytes")))
+    if not operations:
+        raise ValueError(f"scenario {name!r} defines no operations")
+    return Scenario(
+        name=name,
+        description=spec.get("description", ""),
+        operations=operations,
+        think_time_ms=spec.get("think_time_ms"),
+        large_payload_bytes=int(spec.get("large_payload_bytes", 65536)),
+        protocols=spec.get("protocols") or {},
+    )
+
+
+def pick(ops: list[Operation], rng: random.Random) -> Operation:
+    return rng.choices(ops, weights=[op.weight for op in ops])[0]
@@ -0,0 +1,175 @@
+"""Throwaway PKI and handshake probe for ``--tls``.
+
+:func:`make_certs` writes a CA and a server certificate for the loopback
+names into a directory. The harness exports the server pair as
+``BENCH_TLS_CERT``/``BENCH_TLS_KEY`` (read by ``servers.runtime.serve``)
+and the CA as ``SSL_CERT_FILE``, which every httpx client in the harness
+and SDKs trusts in place of certifi.
+
+:func:`probe` times TCP connect, full TLS handshakes and resumed handshakes
+(the session from the previous connection offered back) against one server
+with blocking sockets, so no HTTP stack sits inside the timing.
+"""
+import ipaddress
+import socket
+import ssl
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+HOSTS = ("127.0.0.1", "localhost", "::1")
+
+
+def _private_key(key_type: str):
+    from cryptography.hazmat.primitives.asymmetric import ec, rsa
+
+    if key_type == "rsa":
+        return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return ec.generate_private_key(ec.SECP256R1())
+
+
+def make_certs(directory: Path, key_type: str = "ec", hosts: tuple[str, ...] = HOSTS) -> tuple[Path, Path, Path]:
+    """Write ``ca.crt``, ``server.crt`` and ``server.key``; returns their paths.
+
+    ``key_type`` is ``ec`` (P-256) or ``rsa`` (2048 bit) for both keys; the
+    server key type decides the handshake signature cost.
+    """
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.x509.oid import ExtendedKeyUsageOID, NameOID
+
+    directory.mkdir(parents=True, exist_ok=True)
+    now = datetime.now(timezone.utc)
+    ca_key = _private_key(key_type)
+    ca_name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "bench throwaway CA")])
+    ca_cert = (
+        x509.CertificateBuilder()
+        .subject_name(ca_name)
+        .issuer_name(ca_name)
+        .public_key(ca_key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(minutes=5))
+        .not_valid_after(now + timedelta(days=1))
+        .add_extension(x509.BasicConstraints(ca=True, path_length=0), critical=True)
+        .add_extension(
+            x509.KeyUsage(
+                digital_signature=False, content_commitment=False, key_encipherment=False,
+                data_encipherment=False, key_agreement=False, key_cert_sign=True,
+                crl_sign=True, encipher_only=False, decipher_only=False,
+            ),
+            critical=True,
+        )
+        .sign(ca_key, hashes.SHA256())
+    )
+
+    key = _private_key(key_type)
+    names = []
+    for host in hosts:
+        try:
+            names.append(x509.IPAddress(ipaddress.ip_address(host)))
+        except ValueError:
+            names.append(x509.DNSName(host))
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, hosts[0])]))
+        .issuer_name(ca_name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(minutes=5))
+        .not_valid_after(now + timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName(names), critical=False)
+        .add_extension(x509.ExtendedKeyUsage([ExtendedKeyUsageOID.SERVER_AUTH]), critical=False)
+        .sign(ca_key, hashes.SHA256())
+    )
+
+    ca_path = directory / "ca.crt"
+    cert_path = directory / "server.crt"
+    key_path = directory / "server.key"
+    ca_path.write_bytes(ca_cert.public_bytes(serialization.Encoding.PEM))
+    cert_path.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_path.write_bytes(
+        key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption(),
+        )
+    )
+    key_path.chmod(0o600)
+    return ca_path, cert_path, key_path
+
+
+def _summary(values: list[float]) -> dict:
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+    return {
+        "count": len(values),
+        "avg": statistics.fmean(values),
+        "p50": ordered[len(ordered) // 2],
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "min": ordered[0],
+        "max": ordered[-1],
+    }
+
+
+def _connection(host: str, port: int, context: ssl.SSLContext, session: ssl.SSLSession | None):
+    """One connection: returns (tcp_ms, handshake_ms, handshake_cpu_us, socket)."""
+    t0 = time.perf_counter()
+    sock = socket.create_connection((host, port), timeout=10)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    t1 = time.perf_counter()
+    c0 = time.process_time()
+    tls = context.wrap_socket(sock, server_hostname=host, session=session, do_handshake_on_connect=False)
+    tls.do_handshake()
+    cpu_us = (time.process_time() - c0) * 1e6
+    t2 = time.perf_counter()
+    return (t1 - t0) * 1000, (t2 - t1) * 1000, cpu_us, tls
+
+
+def _exchange(tls: ssl.SSLSocket, host: str) -> None:
+    # TLS 1.3 tickets arrive after the handshake; one request/response
+    # round trip makes sure the client has them before the session is taken
+    tls.sendall(f"GET / HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode())
+    while tls.recv(65536):
+        pass
+
+
+def probe(base_url: str, count: int, ca_file: str | None = None) -> dict:
+    """``count`` full and ``count`` resumed handshakes against ``base_url``.
+
+    Runs in the calling thread; use ``asyncio.to_thread`` from the harness.
+    """
+    from urllib.parse import urlsplit
+
+    parts = urlsplit(base_url)
+    host, port = parts.hostname or "127.0.0.1", parts.port or 443
+    context = ssl.create_default_context(cafile=ca_file)
+    tcp, full, full_cpu, resumed, resumed_cpu = [], [], [], [], []
+    reused = 0
+    version = cipher = None
+    for _ in range(count):
+        tcp_ms, hs_ms, cpu_us, tls = _connection(host, port, context, None)
+        version, cipher = tls.version(), (tls.cipher() or (None,))[0]
+        _exchange(tls, host)
+        session = tls.session
+        tls.close()
+        tcp.append(tcp_ms)
+        full.append(hs_ms)
+        full_cpu.append(cpu_us)
+
+        _, hs_ms, cpu_us, tls = _connection(host, port, context, session)
+        reused += tls.session_reused
+        _exchange(tls, host)
+        tls.close()
+        resumed.append(hs_ms)
+        resumed_cpu.append(cpu_us)
+    return {
+        "version": version,
+        "cipher": cipher,
+        "tcp_connect_ms": _summary(tcp),
+        "full_handshake_ms": _summary(full),
+        "resumed_handshake_ms": _summary(resumed),
+        "resumption_rate": reused / count if count else 0.0,
+        "client_cpu_us": {"full": _summary(full_cpu), "resumed": _summary(resumed_cpu)},
+    }
@@ -0,0 +1,108 @@
+"""Wire-byte accounting for ``--test-wire-bytes``.
+
+HTTP traffic is counted at the TCP level by a pass-through
+:class:`benchmarks.netem.NetemProxy`, so request lines, headers, chunked
+encoding and SSE event framing are all included. stdio has no socket:
+:class:`StdioTap` wraps the client session's message streams and counts
+each message as the SDK frames it on the pipe (compact JSON plus newline).
+"""
+
+
+def stdio_frame_bytes(item) -> int:
+    """Bytes the MCP stdio transport writes for one ``SessionMessage``."""
+    message = getattr(item, "message", None)
+    if message is None:
+        # Transport errors are delivered in-band and never hit the pipe
+        return 0
+    return len(message.model_dump_json(by_alias=True, exclude_none=True).encode()) + 1
+
+
+class _CountingReceiveStream:
+    def __init__(self, inner, tap: "StdioTap") -> None:
+        self._inner = inner
+        self._tap = tap
+
+    async def receive(self):
+        item = await self._inner.receive()
+        self._tap.bytes_down += stdio_frame_bytes(item)
+        return item
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        item = await self._inner.__anext__()
+        self._tap.bytes_down += stdio_frame_bytes(item)
+        return item
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+    def close(self) -> None:
+        self._inner.close()
+
+    async def __aenter__(self):
+        await self._inner.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc):
+        return await self._inner.__aexit__(*exc)
+
+
+class _CountingSendStream:
+    def __init__(self, inner, tap: "StdioTap") -> None:
+        self._inner = inner
+        self._tap = tap
+
+    async def send(self, item) -> None:
+        self._tap.bytes_up += stdio_frame_bytes(item)
+        await self._inner.send(item)
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+    def close(self) -> None:
+        self._inner.close()
+
+    async def __aenter__(self):
+        await self._inner.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc):
+        return await self._inner.__aexit__(*exc)
+
+
+class StdioTap:
+    """Counts client-to-server (up) and server-to-client (down) stdio bytes."""
+
+    def __init__(self) -> None:
+        self.bytes_up = 0
+        self.bytes_down = 0
+
+    def wrap(self, streams):
+        read_stream, write_stream = streams
+        return _CountingReceiveStream(read_stream, self), _CountingSendStream(write_stream, self)
+
+    def counts(self) -> tuple[int, int]:
+        return self.bytes_up, self.bytes_down
+
+
+def per_call(samples: list[tuple[int, int]], payload_bytes: int) -> dict:
+    """Summarize per-call ``(up, down)`` byte counts for an echo of
+    ``payload_bytes`` (carried once each way)."""
+    if not samples:
+        return {"calls": 0}
+    totals = [up + down for up, down in samples]
+    n = len(samples)
+    avg_total = sum(totals) / n
+    raw = 2 * payload_bytes
+    return {
+        "calls": n,
+        "request_bytes": sum(up for up, _ in samples) / n,
+        "response_bytes": sum(down for _, down in samples) / n,
+        "bytes_per_call": avg_total,
+        "min_bytes": min(totals),
+        "max_bytes": max(totals),
+        "overhead_bytes_per_call": avg_total - raw,
+        "overhead_ratio": avg_total / raw if raw else None,
+    }
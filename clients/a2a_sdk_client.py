@@ -1,40 +1,106 @@
 import asyncio
+import os
 import time
 import json
 import argparse
+import httpx
+from servers import compression, tracing
+from clients import hedging
 from a2a.client.client_factory import ClientFactory, ClientConfig, minimal_agent_card
 from a2a.client.helpers import create_text_message_object
-from a2a.types import Role
+from a2a.types import MessageSendParams, Role, SendMessageRequest
+
+
+def bearer_headers() -> dict[str, str]:
+    """Authorization for the server's bearer check (A2A_BEARER_TOKEN, set
+    by the harness under --auth-mode all)."""
+    token = os.environ.get("A2A_BEARER_TOKEN")
+    return {"Authorization": f"Bearer {token}"} if token else {}
 
 
 class A2AClientPersistent:
-    def __init__(self, base_url: str) -> None:
+    def __init__(self, base_url: str, hedger: hedging.Hedger | None = None, deadline_s: float | None = None, http_transport: httpx.AsyncBaseTransport | None = None) -> None:
         self._base_url = base_url.rstrip("/")
+        # An ASGI transport into the app under --transport inproc
+        self._http_transport = http_transport
         self._client = None
+        self._http: httpx.AsyncClient | None = None
+        self._hedger = hedger
+        self._deadline_s = deadline_s
 
     async def start(self) -> None:
-        config = ClientConfig(streaming=False)
+        # Share one connection pool, and the bearer token, between the SDK
+        # client and the batch path
+        self._http = httpx.AsyncClient(transport=self._http_transport, headers=bearer_headers(), event_hooks=compression.httpx_event_hooks(tracing.httpx_event_hooks()))
+        config = ClientConfig(streaming=False, httpx_client=self._http)
         factory = ClientFactory(config)
         card = minimal_agent_card(url=f"{self._base_url}/a2a/jsonrpc", transports=["JSONRPC"])
         self._client = factory.create(card)
         # No explicit initialize method; client initializes on first call
 
+    async def _send_text(self, text: str) -> str | None:
+        """First text part of the reply; one attempt, each with its own messageId."""
+        async for result in self._client.send_message(create_text_message_object(Role.user, text)):
+            if hasattr(result, "parts"):
+                for p in result.parts:
+                    if hasattr(p.root, "text"):
+                        return p.root.text or ""
+        return None
+
+    async def _call(self, text: str) -> str | None:
+        # Echo/add replies are Messages, not tasks, so there is no tasks/cancel
+        # to send: a stopped attempt only drops its connection
+        return await hedging.run(lambda: self._send_text(text), self._hedger, self._deadline_s)
+
     async def echo(self, message: str) -> tuple[float, float, str]:
         if not self._client:
             raise RuntimeError("client not started")
-        req_msg = create_text_message_object(Role.user, message)
         t_rpc0 = time.perf_counter()
-        async for result in self._client.send_message(req_msg):
-            if hasattr(result, "parts"):
-                for p in result.parts:
-                    if hasattr(p.root, "text"):
-                        t_rpc1 = time.perf_counter()
-                        return (t_rpc1 - t_rpc0) * 1000, (t_rpc1 - t_rpc0) * 1000, p.root.text or ""
-        return 0.0, 0.0, ""
+        out = await self._call(message)
+        t_rpc1 = time.perf_counter()
+        if out is None:
+            return 0.0, 0.0, ""
+        return (t_rpc1 - t_rpc0) * 1000, (t_rpc1 - t_rpc0) * 1000, out
+
+    async def add(self, a: int, b: int) -> tuple[float, int]:
+        if not self._client:
+            raise RuntimeError("client not started")
+        t_rpc0 = time.perf_counter()
+        out = await self._call(f"ADD {a} {b}")
+        t_rpc1 = time.perf_counter()
+        if out is None:
+            return 0.0, 0
+        try:
+            return (t_rpc1 - t_rpc0) * 1000, int(out or "0")
+        except ValueError:
+            return (t_rpc1 - t_rpc0) * 1000, 0
+
+    async def echo_batch(self, messages: list[str]) -> tuple[float, list[str]]:
+        """Send all messages as one JSON-RPC batch; returns (batch_ms, echoes)."""
+        if not self._http:
+            raise RuntimeError("client not started")
+        body = [
+            SendMessageRequest(
+                id=i, params=MessageSendParams(message=create_text_message_object(Role.user, m))
+            ).model_dump(mode="json", exclude_none=True, by_alias=True)
+            for i, m in enumerate(messages)
+        ]
+        t_rpc0 = time.perf_counter()
+        r = await self._http.post(f"{self._base_url}/a2a/jsonrpc/batch", json=body)
+        r.raise_for_status()
+        t_rpc1 = time.perf_counter()
+        by_id = {item.get("id"): item for item in r.json()}
+        outs = []
+        for i in range(len(messages)):
+            parts = (by_id.get(i, {}).get("result") or {}).get("parts") or []
+            outs.append(next((p.get("text") or "" for p in parts if p.get("kind") == "text"), ""))
+        return (t_rpc1 - t_rpc0) * 1000, outs
 
     async def close(self) -> None:
-        # Underlying SDK manages HTTP session; no explicit close exposed here
         self._client = None
+        if self._http:
+            await self._http.aclose()
+            self._http = None
 
 
 async def once_echo(base_url: str, message: str) -> tuple[float, float, str]:
@@ -1,30 +1,37 @@
 import time
 import argparse
 import json
+import contextlib
 from typing import Tuple
+import httpx
 from httpx_sse import aconnect_sse
 
 
-async def once_stream_echo(base_url: str, message: str, chunks: int = 3, delay_ms: int = 10, token: str | None = None) -> tuple[float, float, str]:
+async def once_stream_echo(base_url: str, message: str, chunks: int = 3, delay_ms: int = 10, token: str | None = None, client: httpx.AsyncClient | None = None) -> tuple[float, float, str]:
     """Connects to A2A SSE echo endpoint and measures TTFB and total time.
 
+    Pass ``client`` to reuse a connection pool; otherwise one is opened per call.
     Returns (ttfb_ms, total_ms, concatenated_output)
     """
-    url = f"{base_url.rstrip('/')}/a2a/sse/echo?message={message}&chunks={chunks}&delay_ms={delay_ms}"
+    url = f"{base_url.rstrip('/')}/a2a/sse/echo"
+    params = {"message": message, "chunks": chunks, "delay_ms": delay_ms}
     headers = {"Accept": "text/event-stream"}
     if token:
         headers["Authorization"] = f"Bearer {token}"
-    t0 = time.perf_counter()
-    out_parts = []
-    ttfb_ms = 0.0
-    async with aconnect_sse(url, method="GET", headers=headers) as event_source:
-        # First event arrival marks TTFB
-        async for sse in event_source.aiter_sse():
-            if ttfb_ms == 0.0:
-                ttfb_ms = (time.perf_counter() - t0) * 1000
-            if sse.data:
-                out_parts.append(sse.data)
-    total_ms = (time.perf_counter() - t0) * 1000
+    async with contextlib.AsyncExitStack() as stack:
+        if client is None:
+            client = await stack.enter_async_context(httpx.AsyncClient(timeout=None))
+        t0 = time.perf_counter()
+        out_parts = []
+        ttfb_ms = 0.0
+        async with aconnect_sse(client, "GET", url, params=params, headers=headers) as event_source:
+            # First event arrival marks TTFB
+            async for sse in event_source.aiter_sse():
+                if ttfb_ms == 0.0:
+                    ttfb_ms = (time.perf_counter() - t0) * 1000
+                if sse.data:
+                    out_parts.append(sse.data)
+        total_ms = (time.perf_counter() - t0) * 1000
     return ttfb_ms, total_ms, "".join(out_parts)
 
 
@@ -2,14 +2,15 @@ import anyio
 import time
 import json
 import argparse
-from acp.client.stdio import stdio_client, StdioServerParameters
+from acp.client.stdio import stdio_client, StdioServerParameters, get_default_environment
 from acp.client.session import ClientSession
+from servers import runtime
 
 
 async def once_echo(message: str) -> tuple[float, str]:
     try:
         server_params = StdioServerParameters(
-            command="python", args=["-m", "servers.acp_stdio_server"]
+            command="python", args=["-m", "servers.acp_stdio_server"], env=runtime.stdio_server_env(get_default_environment())
         )
         async with stdio_client(server_params) as streams:
             async with ClientSession(*streams) as session:
@@ -29,7 +30,7 @@ async def once_echo(message: str) -> tuple[float, str]:
 
 async def once_add(a: int, b: int) -> int:
     server_params = StdioServerParameters(
-        command="python", args=["-m", "servers.acp_stdio_server"]
+        command="python", args=["-m", "servers.acp_stdio_server"], env=runtime.stdio_server_env(get_default_environment())
     )
     async with stdio_client(server_params) as streams:
         async with ClientSession(*streams) as session:
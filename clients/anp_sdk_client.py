@@ -5,6 +5,8 @@ import json
 import argparse
 from pathlib import Path
 from agent_connect.authentication import DIDWbaAuthHeader
+from servers import compression, tracing
+from clients import hedging
 
 
 BASE = Path(__file__).resolve().parent.parent
@@ -12,43 +14,90 @@ DID_PATH = BASE / "config" / "anp_did" / "client" / "did.json"
 PRIV_KEY_PATH = BASE / "config" / "anp_did" / "client" / "key-1_private.pem"
 
 
+def echo_payload(sender_did: str, receiver_did: str, message: str) -> dict:
+    return {
+        "@context": [
+            "https://schema.org/",
+            "https://agentnetworkprotocol.com/context/v1",
+        ],
+        "@type": "anp:Message",
+        "@id": "urn:uuid:bench-echo",
+        "anp:sender": sender_did,
+        "anp:receiver": receiver_did,
+        "schema:text": {"@type": "anp:EchoRequest", "anp:message": message},
+        "schema:dateCreated": time.time(),
+    }
+
+
 class ANPClientPersistent:
-    def __init__(self, base_url: str) -> None:
+    def __init__(self, base_url: str, hedger: hedging.Hedger | None = None, deadline_s: float | None = None, http_transport: httpx.AsyncBaseTransport | None = None) -> None:
         self._base_url = base_url.rstrip("/")
+        # An ASGI transport into the app under --transport inproc
+        self._http_transport = http_transport
         self._client: httpx.AsyncClient | None = None
         self._auth: DIDWbaAuthHeader | None = None
         self._sender_did: str | None = None
+        self._hedger = hedger
+        self._deadline_s = deadline_s
+        # DID headers signed again after a 401 on a cached header or token
+        self.reauths = 0
 
     async def start(self) -> None:
-        self._client = httpx.AsyncClient()
+        self._client = httpx.AsyncClient(transport=self._http_transport, event_hooks=compression.httpx_event_hooks(tracing.httpx_event_hooks()))
         self._auth = DIDWbaAuthHeader(str(DID_PATH), str(PRIV_KEY_PATH))
         self._sender_did = json.loads(DID_PATH.read_text())["id"]
 
+    def _headers(self) -> dict:
+        headers = self._auth.get_auth_header(self._base_url)
+        if not headers.get("Authorization", "").startswith("Bearer "):
+            # No token yet: the SDK caches one DID header per domain, but the
+            # server accepts each nonce once, so concurrent calls sign their own
+            headers = self._auth.get_auth_header(self._base_url, force_new=True)
+        return headers
+
+    async def _post(self, payload: dict, headers: dict) -> httpx.Response:
+        # A stopped attempt drops its connection; the server is not told
+        async def attempt() -> httpx.Response:
+            url = f"{self._base_url}/anp/messages"
+            r = await self._client.post(url, json=payload, headers=headers)
+            if r.status_code == 401:
+                # Expired or revoked token, or a replayed DID nonce: sign a
+                # fresh DID header once; the server answers with a new token
+                self._auth.clear_token(self._base_url)
+                self.reauths += 1
+                r = await self._client.post(url, json=payload, headers=self._auth.get_auth_header(self._base_url, force_new=True))
+            r.raise_for_status()
+            self._auth.update_token(self._base_url, r.headers)
+            return r
+
+        return await hedging.run(attempt, self._hedger, self._deadline_s)
+
     async def echo(self, message: str) -> tuple[float, float, str]:
         if not (self._client and self._auth and self._sender_did):
             raise RuntimeError("client not started")
-        headers = self._auth.get_auth_header(self._base_url)
-        payload = {
-            "@context": [
-                "https://schema.org/",
-                "https://agentnetworkprotocol.com/context/v1",
-            ],
-            "@type": "anp:Message",
-            "@id": "urn:uuid:bench-echo",
-            "anp:sender": self._sender_did,
-            "anp:receiver": "did:wba:localhost:anp-server",
-            "schema:text": {"@type": "anp:EchoRequest", "anp:message": message},
-            "schema:dateCreated": time.time(),
-        }
+        headers = self._headers()
+        payload = echo_payload(self._sender_did, "did:wba:localhost:anp-server", message)
         t_rpc0 = time.perf_counter()
-        r = await self._client.post(f"{self._base_url}/anp/messages", json=payload, headers=headers)
-        r.raise_for_status()
+        r = await self._post(payload, headers)
         t_rpc1 = time.perf_counter()
         data = r.json()
         content = data.get("schema:text", {})
         out = content.get("anp:originalMessage", "") if isinstance(content, dict) else ""
         return (t_rpc1 - t_rpc0) * 1000, (t_rpc1 - t_rpc0) * 1000, out
 
+    async def add(self, a: int, b: int) -> tuple[float, int]:
+        if not (self._client and self._auth and self._sender_did):
+            raise RuntimeError("client not started")
+        headers = self._headers()
+        payload = echo_payload(self._sender_did, "did:wba:localhost:anp-server", "")
+        payload["@id"] = "urn:uuid:bench-add"
+        payload["schema:text"] = {"@type": "anp:ArithmeticRequest", "anp:a": a, "anp:b": b}
+        t_rpc0 = time.perf_counter()
+        r = await self._post(payload, headers)
+        t_rpc1 = time.perf_counter()
+        data = r.json().get("schema:text", {})
+        return (t_rpc1 - t_rpc0) * 1000, int(data.get("anp:result", 0)) if isinstance(data, dict) else 0
+
     async def close(self) -> None:
         if self._client:
             await self._client.aclose()
@@ -61,18 +110,7 @@ async def once_echo(base_url: str, message: str) -> tuple[float, float, str]:
     try:
         auth = DIDWbaAuthHeader(str(DID_PATH), str(PRIV_KEY_PATH))
         headers = auth.get_auth_header(base_url)
-        payload = {
-            "@context": [
-                "https://schema.org/",
-                "https://agentnetworkprotocol.com/context/v1",
-            ],
-            "@type": "anp:Message",
-            "@id": "urn:uuid:bench-echo",
-            "anp:sender": json.load(open(DID_PATH, "r"))["id"],
-            "anp:receiver": "did:wba:localhost:anp-server",
-            "schema:text": {"@type": "anp:EchoRequest", "anp:message": message},
-            "schema:dateCreated": time.time(),
-        }
+        payload = echo_payload(json.load(open(DID_PATH, "r"))["id"], "did:wba:localhost:anp-server", message)
         async with httpx.AsyncClient() as c:
             t0 = time.perf_counter()
             r = await c.post(f"{base_url}/anp/messages", json=payload, headers=headers)
@@ -0,0 +1,196 @@
+"""Timed agent bootstrap: discovery, connect/initialize and the first call.
+
+Each function returns ``(steps, echo)`` where ``steps`` maps step name to
+milliseconds in the order the steps ran. Passing the optional shared state
+(HTTP client, discovery cache, auth, MCP/ACP session, tool catalog) gives
+the warm path of a process that already bootstrapped once; leaving it out is
+what a fresh, short-lived agent pays. ``connect`` includes creating the HTTP
+client for every protocol: the MCP/ACP SSE transports build theirs inside
+``sse_client``.
+"""
+import contextlib
+import json
+import sys
+import time
+import httpx
+from clients.discovery_cache import DiscoveryCache
+
+
+def _ms_since(t0: float) -> float:
+    return (time.perf_counter() - t0) * 1000
+
+
+async def a2a(
+    base_url: str,
+    message: str,
+    http: httpx.AsyncClient | None = None,
+    cache: DiscoveryCache | None = None,
+    token: str | None = None,
+) -> tuple[dict[str, float], str]:
+    """Fetch the agent card from its well-known path, build a client from it
+    and send the first message."""
+    from a2a.client.client_factory import ClientFactory, ClientConfig
+    from a2a.client.helpers import create_text_message_object
+    from a2a.types import AgentCard, Role
+
+    steps: dict[str, float] = {}
+    own_http = http is None
+    if own_http:
+        # A fresh process pays for the client (TLS context, pool) too; its
+        # TCP connection opens with the agent card fetch
+        t0 = time.perf_counter()
+        http = httpx.AsyncClient(headers={"Authorization": f"Bearer {token}"} if token else None)
+        steps["connect"] = _ms_since(t0)
+    cache = cache or DiscoveryCache(http)
+    try:
+        t0 = time.perf_counter()
+        document, _ = await cache.get(f"{base_url.rstrip('/')}/.well-known/agent-card.json")
+        card = AgentCard.model_validate(document)
+        steps["agent_card"] = _ms_since(t0)
+
+        t0 = time.perf_counter()
+        client = ClientFactory(ClientConfig(streaming=False, httpx_client=http)).create(card)
+        steps["client_create"] = _ms_since(t0)
+
+        t0 = time.perf_counter()
+        out = ""
+        async for result in client.send_message(create_text_message_object(Role.user, message)):
+            if hasattr(result, "parts"):
+                out = next((p.root.text or "" for p in result.parts if hasattr(p.root, "text")), "")
+                break
+        steps["first_call"] = _ms_since(t0)
+        return steps, out
+    finally:
+        if own_http:
+            await http.aclose()
+
+
+async def anp(
+    base_url: str,
+    message: str,
+    http: httpx.AsyncClient | None = None,
+    cache: DiscoveryCache | None = None,
+    auth=None,
+) -> tuple[dict[str, float], str]:
+    """Resolve the DID document and agent description, sign the DID-WBA
+    header and send the first message to the advertised endpoint."""
+    from agent_connect.authentication import DIDWbaAuthHeader
+    from clients.anp_sdk_client import DID_PATH, PRIV_KEY_PATH, echo_payload
+
+    base_url = base_url.rstrip("/")
+    steps: dict[str, float] = {}
+    own_http = http is None
+    if own_http:
+        t0 = time.perf_counter()
+        http = httpx.AsyncClient()
+        steps["connect"] = _ms_since(t0)
+    cache = cache or DiscoveryCache(http)
+    try:
+        t0 = time.perf_counter()
+        did_document, _ = await cache.get(f"{base_url}/.well-known/did.json")
+        steps["did_document"] = _ms_since(t0)
+
+        t0 = time.perf_counter()
+        description, _ = await cache.get(f"{base_url}/anp/agent-description")
+        endpoint = description.get("anp:endpoints", {}).get("messages", "/anp/messages")
+        steps["agent_description"] = _ms_since(t0)
+
+        t0 = time.perf_counter()
+        if auth is None:
+            auth = DIDWbaAuthHeader(str(DID_PATH), str(PRIV_KEY_PATH))
+        headers = auth.get_auth_header(base_url)
+        sender_did = json.loads(DID_PATH.read_text())["id"]
+        steps["auth_header"] = _ms_since(t0)
+
+        t0 = time.perf_counter()
+        r = await http.post(
+            f"{base_url}{endpoint}",
+            json=echo_payload(sender_did, did_document.get("id", "did:wba:localhost:anp-server"), message),
+            headers=headers,
+        )
+        r.raise_for_status()
+        content = r.json().get("schema:text", {})
+        out = content.get("anp:originalMessage", "") if isinstance(content, dict) else ""
+        steps["first_call"] = _ms_since(t0)
+        return steps, out
+    finally:
+        if own_http:
+            await http.aclose()
+
+
+async def open_session(stack: contextlib.AsyncExitStack, transport, session_cls, steps: dict[str, float] | None = None):
+    """Enter ``transport`` (an SSE or stdio client context) and initialize a
+    ``session_cls`` session on it, both on ``stack``.
+
+    ``session_cls`` is the SDK ``ClientSession`` (MCP or the ACP fork).
+    ``connect`` and ``initialize`` are recorded in ``steps`` when given.
+    """
+    steps = {} if steps is None else steps
+    t0 = time.perf_counter()
+    streams = await stack.enter_async_context(transport)
+    steps["connect"] = _ms_since(t0)
+    t0 = time.perf_counter()
+    session = await stack.enter_async_context(session_cls(*streams))
+    await session.initialize()
+    steps["initialize"] = _ms_since(t0)
+    return session
+
+
+async def mcp_session(transport, session_cls, message: str, tool_cache: dict | None = None, session=None) -> tuple[dict[str, float], str]:
+    """Open a session over ``transport()`` with :func:`open_session`, list
+    tools and call ``echo``.
+
+    An already initialized ``session`` is used as is, without connecting. With
+    a populated ``tool_cache`` the catalog is taken from it and ``list_tools``
+    is skipped, as a client that persisted the catalog would.
+    """
+    steps: dict[str, float] = {}
+    async with contextlib.AsyncExitStack() as stack:
+        if session is None:
+            session = await open_session(stack, transport(), session_cls, steps)
+        if tool_cache is not None and "tools" in tool_cache:
+            tools = tool_cache["tools"]
+        else:
+            t0 = time.perf_counter()
+            tools = [t.name for t in (await session.list_tools()).tools]
+            steps["list_tools"] = _ms_since(t0)
+            if tool_cache is not None:
+                tool_cache["tools"] = tools
+        if "echo" not in tools:
+            raise RuntimeError("echo tool not found")
+        t0 = time.perf_counter()
+        res = await session.call_tool("echo", {"message": message})
+        steps["first_call"] = _ms_since(t0)
+        return steps, res.content[0].text if res.content else ""
+
+
+def mcp_transport(transport: str, base_url: str = "http://127.0.0.1:8001"):
+    """Zero-argument factory for the MCP client transport context."""
+    if transport == "http":
+        from mcp.client.sse import sse_client
+
+        return lambda: sse_client(f"{base_url.rstrip('/')}/mcp/sse")
+    from mcp.client.stdio import stdio_client, StdioServerParameters, get_default_environment
+    from servers.runtime import stdio_server_env
+
+    params = StdioServerParameters(command=sys.executable, args=["-m", "servers.mcp_echo_server"], env=stdio_server_env(get_default_environment()))
+    return lambda: stdio_client(params)
+
+
+def acp_transport(base_url: str = "http://127.0.0.1:8101"):
+    """Zero-argument factory for the ACP client transport context."""
+    from acp.client.sse import sse_client
+
+    return lambda: sse_client(f"{base_url.rstrip('/')}/acp/sse")
+
+
+async def mcp(transport: str, message: str, tool_cache: dict | None = None, base_url: str = "http://127.0.0.1:8001", session=None) -> tuple[dict[str, float], str]:
+    from mcp import ClientSession
+
+    return await mcp_session(mcp_transport(transport, base_url), ClientSession, message, tool_cache, session)
+
+
+async def acp(message: str, tool_cache: dict | None = None, base_url: str = "http://127.0.0.1:8101", session=None) -> tuple[dict[str, float], str]:
+    from acp.client.session import ClientSession
+
+    return await mcp_session(acp_transport(base_url), ClientSession, message, tool_cache, session)
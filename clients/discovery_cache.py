@@ -0,0 +1,68 @@
+"""Client-side cache for discovery documents (agent cards, DID documents).
+
+Fresh entries (within ``Cache-Control: max-age``) are answered from memory;
+stale ones are revalidated with ``If-None-Match`` so an unchanged document
+costs a 304 without a body.
+"""
+import re
+import time
+from dataclasses import dataclass
+import httpx
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+@dataclass
+class _Entry:
+    document: dict
+    etag: str | None
+    expires: float
+    size: int
+
+
+def _max_age(headers) -> float:
+    cache_control = headers.get("cache-control", "")
+    if "no-cache" in cache_control or "no-store" in cache_control:
+        return 0.0
+    m = _MAX_AGE.search(cache_control)
+    return float(m.group(1)) if m else 0.0
+
+
+class DiscoveryCache:
+    """Caches JSON documents by URL. ``get`` returns (document, source) with
+    source one of ``"cache"``, ``"revalidated"`` or ``"fetched"``.
+
+    ``honor_max_age=False`` revalidates on every lookup, which is how the
+    benchmark isolates the cost of a conditional GET.
+    """
+
+    def __init__(self, client: httpx.AsyncClient, honor_max_age: bool = True) -> None:
+        self._client = client
+        self._honor_max_age = honor_max_age
+        self._entries: dict[str, _Entry] = {}
+        self.stats = {"cache": 0, "revalidated": 0, "fetched": 0, "bytes_received": 0}
+
+    async def get(self, url: str) -> tuple[dict, str]:
+        entry = self._entries.get(url)
+        now = time.monotonic()
+        if entry is not None and self._honor_max_age and now < entry.expires:
+            self.stats["cache"] += 1
+            return entry.document, "cache"
+        headers = {"If-None-Match": entry.etag} if entry is not None and entry.etag else {}
+        r = await self._client.get(url, headers=headers)
+        if r.status_code == 304 and entry is not None:
+            entry.expires = now + _max_age(r.headers)
+            self.stats["revalidated"] += 1
+            return entry.document, "revalidated"
+        r.raise_for_status()
+        document = r.json()
+        self._entries[url] = _Entry(document, r.headers.get("etag"), now + _max_age(r.headers), len(r.content))
+        self.stats["fetched"] += 1
+        self.stats["bytes_received"] += len(r.content)
+        return document, "fetched"
+
+    def invalidate(self, url: str | None = None) -> None:
+        if url is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(url, None)
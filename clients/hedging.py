@@ -0,0 +1,196 @@
+"""Per-call deadlines and hedged requests for the persistent clients.
+
+:func:`run` executes one logical call. With a :class:`Hedger`, the first
+attempt gets a head start of the hedge delay (by default the p95 of recent
+attempts); if it is still running then, a duplicate is sent and the first
+successful response wins. With a deadline, the call raises
+:class:`DeadlineExceeded` once it passes. Only idempotent calls (echo, add)
+are hedged.
+
+Attempts that lose or run out of time are stopped per protocol:
+
+- A2A/ANP (plain HTTP): the attempt's task is cancelled and httpx drops
+  that connection. The server is not told and finishes the work anyway
+- MCP/ACP sessions (:class:`SessionCalls`): the server is sent
+  ``notifications/cancelled``, which cancels the handler, and the attempt
+  is left to complete with the server's error. Cancelling an SDK request
+  task as its response arrives can break the whole session, and the
+  bench servers need ``servers.cancellation`` to survive the cancels
+"""
+import asyncio
+import importlib
+from collections import deque
+from typing import Awaitable, Callable
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    pass
+
+
+class Hedger:
+    """Hedge policy plus the latency window and counters it keeps.
+
+    ``delay_ms`` fixes the hedge delay; otherwise it is the ``quantile`` of
+    the last ``window`` successful attempts, and nothing is hedged until
+    ``min_samples`` have been seen.
+    """
+
+    def __init__(
+        self,
+        quantile: float = 0.95,
+        delay_ms: float | None = None,
+        window: int = 256,
+        min_samples: int = 20,
+    ) -> None:
+        self.quantile = quantile
+        self.fixed_delay_ms = delay_ms
+        self.min_samples = min_samples
+        self._latencies: deque[float] = deque(maxlen=window)
+        self.reset()
+
+    def reset(self) -> None:
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.deadline_exceeded = 0
+        self.stopped = 0
+
+    def delay_s(self) -> float | None:
+        if self.fixed_delay_ms is not None:
+            return self.fixed_delay_ms / 1000
+        if len(self._latencies) < self.min_samples:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * self.quantile))]
+
+    def record(self, seconds: float) -> None:
+        self._latencies.append(seconds)
+
+    def snapshot(self) -> dict:
+        delay = self.delay_s()
+        return {
+            "calls": self.calls,
+            "hedged": self.hedged,
+            "hedge_rate": self.hedged / self.calls if self.calls else 0.0,
+            "hedge_wins": self.hedge_wins,
+            "deadline_exceeded": self.deadline_exceeded,
+            "attempts_stopped": self.stopped,
+            "hedge_delay_ms": delay * 1000 if delay is not None else None,
+        }
+
+
+async def cancel_task(task: asyncio.Task) -> None:
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+def _consume(task: asyncio.Task) -> None:
+    if not task.cancelled():
+        task.exception()
+
+
+async def run(
+    attempt: Callable[[], Awaitable],
+    hedger: Hedger | None = None,
+    deadline_s: float | None = None,
+    stop: Callable[[asyncio.Task], Awaitable[None]] = cancel_task,
+):
+    """Run ``attempt()`` under ``hedger`` and ``deadline_s``; ``stop`` ends
+    an attempt whose result is no longer wanted."""
+    if hedger is None and deadline_s is None:
+        return await attempt()
+    loop = asyncio.get_running_loop()
+    t0 = loop.time()
+    end = t0 + deadline_s if deadline_s is not None else None
+    delay = hedger.delay_s() if hedger is not None else None
+    started: dict[asyncio.Task, float] = {}
+
+    def launch() -> asyncio.Task:
+        task = asyncio.ensure_future(attempt())
+        started[task] = loop.time()
+        return task
+
+    first = launch()
+    pending = {first}
+    hedged = False
+    error: BaseException | None = None
+    if hedger is not None:
+        hedger.calls += 1
+    try:
+        while pending:
+            wake = [end] if end is not None else []
+            if delay is not None and not hedged:
+                wake.append(t0 + delay)
+            timeout = max(0.0, min(wake) - loop.time()) if wake else None
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if hedger is not None:
+                        hedger.record(loop.time() - started[task])
+                        if task is not first:
+                            hedger.hedge_wins += 1
+                    return task.result()
+                error = error or task.exception()
+            if end is not None and loop.time() >= end:
+                if hedger is not None:
+                    hedger.deadline_exceeded += 1
+                raise DeadlineExceeded(f"deadline of {deadline_s * 1000:.0f} ms exceeded")
+            if pending and delay is not None and not hedged and loop.time() >= t0 + delay:
+                hedged = True
+                hedger.hedged += 1
+                pending.add(launch())
+        raise error
+    finally:
+        for task in pending:
+            if hedger is not None:
+                hedger.stopped += 1
+            task.add_done_callback(_consume)
+            await stop(task)
+
+
+class SessionCalls:
+    """Attempts and stopping for one MCP or ACP ``ClientSession``."""
+
+    def __init__(self, session) -> None:
+        self.session = session
+        self._types = importlib.import_module(type(session).__module__.split(".", 1)[0] + ".types")
+        self._request_ids: dict[asyncio.Task, int] = {}
+
+    def call_tool(self, name: str, arguments: dict) -> Callable[[], Awaitable]:
+        from servers import tracing
+
+        async def attempt():
+            task = asyncio.current_task()
+            # send_request takes the session's next id before it first awaits
+            self._request_ids[task] = self.session._request_id  # noqa: SLF001
+            try:
+                return await tracing.call_tool(self.session, name, arguments)
+            finally:
+                self._request_ids.pop(task, None)
+
+        return attempt
+
+    async def stop(self, task: asyncio.Task) -> None:
+        request_id = self._request_ids.get(task)
+        if request_id is None:
+            return
+        t = self._types
+        await self.session.send_notification(
+            t.ClientNotification(
+                t.CancelledNotification(
+                    method="notifications/cancelled",
+                    params=t.CancelledNotificationParams(requestId=request_id, reason="superseded"),
+                )
+            )
+        )
+
+    async def drain(self, timeout_s: float = 1.0) -> None:
+        """Wait for abandoned attempts, e.g. before closing the session. They
+        were told to stop, so a live server answers them quickly; any still
+        waiting after ``timeout_s`` lost the stream (ACP's fork never fails
+        them) and are cancelled."""
+        if not self._request_ids:
+            return
+        _, pending = await asyncio.wait(list(self._request_ids), timeout=timeout_s)
+        for task in pending:
+            await cancel_task(task)
@@ -0,0 +1,67 @@
+"""In-process transport (``--transport inproc``).
+
+The benchmark servers run inside the harness process: A2A and ANP requests
+go through httpx's ASGI transport straight into the apps, and MCP/ACP
+sessions talk to the SDK ``Server`` objects over in-memory streams. No
+socket, HTTP parser or process boundary is involved, so the difference to
+``--transport http`` is what those cost; what remains is SDK framing,
+serialization and the handlers.
+
+Apps are created once per process and wrapped by
+:func:`servers.runtime.instrument` like the spawned servers, so BENCH_*
+settings the harness exported (admission, compression, server work) apply.
+Their lifespan (ANP's startup creates its keys and DID documents) is run on
+first use and ended by :func:`close`. MCP/ACP over SSE cannot go through an
+ASGI transport: httpx buffers the whole response, and an SSE stream never
+ends.
+"""
+import contextlib
+import importlib
+
+import anyio
+import httpx
+
+_apps: dict[str, object] = {}
+_lifespans = contextlib.AsyncExitStack()
+
+
+def _create_app(proto: str):
+    if proto == "a2a":
+        from servers.a2a_sdk_server import create_app
+
+        return create_app()
+    if proto == "anp":
+        from servers.anp_sdk_server import app
+
+        return app
+    raise ValueError(f"no in-process HTTP app for {proto}")
+
+
+async def http_transport(proto: str) -> httpx.ASGITransport:
+    """ASGI transport into ``proto``'s app, started on first use."""
+    if proto not in _apps:
+        from servers import runtime
+
+        app = _create_app(proto)
+        await _lifespans.enter_async_context(app.router.lifespan_context(app))
+        _apps[proto] = runtime.instrument(app)
+    return httpx.ASGITransport(app=_apps[proto])
+
+
+async def memory_streams(stack: contextlib.AsyncExitStack, server):
+    """Run the SDK ``server`` (MCP ``Server`` or the ACP fork's) on ``stack``
+    and return the client end of the in-memory streams to it."""
+    memory = importlib.import_module(type(server).__module__.split(".", 1)[0] + ".shared.memory")
+    client_streams, server_streams = await stack.enter_async_context(memory.create_client_server_memory_streams())
+    tg = await stack.enter_async_context(anyio.create_task_group())
+    tg.start_soon(server.run, *server_streams, server.create_initialization_options())
+    # Unwinds before the task group exits, which would otherwise wait for
+    # the server forever
+    stack.callback(tg.cancel_scope.cancel)
+    return client_streams
+
+
+async def close() -> None:
+    """End the lifespans of the apps started so far."""
+    await _lifespans.aclose()
+    _apps.clear()
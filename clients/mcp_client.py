@@ -1,11 +1,14 @@
-import anyio, time, json, argparse
+import anyio, asyncio, time, json, argparse
+from servers import runtime, tracing
+from clients import hedging
 from mcp import ClientSession
-from mcp.client.stdio import stdio_client, StdioServerParameters
+from mcp.client.stdio import stdio_client, StdioServerParameters, get_default_environment
+from mcp.types import ListToolsResult
 from contextlib import AsyncExitStack
 
 async def once_echo(message: str) -> tuple[float, str]:
     try:
-        server_params = StdioServerParameters(command="python", args=["-m","servers.mcp_echo_server"])
+        server_params = StdioServerParameters(command="python", args=["-m","servers.mcp_echo_server"], env=runtime.stdio_server_env(get_default_environment()))
         async with stdio_client(server_params) as streams:
             async with ClientSession(*streams) as session:
                 await session.initialize()
@@ -23,7 +26,7 @@ async def once_echo(message: str) -> tuple[float, str]:
         return 0.0, ""
 
 async def once_add(a: int, b: int) -> int:
-    server_params = StdioServerParameters(command="python", args=["-m","servers.mcp_echo_server"])
+    server_params = StdioServerParameters(command="python", args=["-m","servers.mcp_echo_server"], env=runtime.stdio_server_env(get_default_environment()))
     async with stdio_client(server_params) as streams:
         async with ClientSession(*streams) as session:
             await session.initialize()
@@ -42,36 +45,93 @@ if __name__ == "__main__":
 
 
 class MCPStdioPersistent:
-    """Persistent MCP stdio client for reuse mode."""
+    """Persistent MCP stdio client for reuse mode.
 
-    def __init__(self) -> None:
+    ``tap`` optionally wraps the session's streams (``tap.wrap(streams)``),
+    e.g. to count bytes on the pipe. ``hedger`` and ``deadline_s`` apply to
+    echo and add (see :mod:`clients.hedging`).
+    """
+
+    def __init__(self, tap=None, hedger: hedging.Hedger | None = None, deadline_s: float | None = None) -> None:
+        self._tap = tap
         self._stack: AsyncExitStack | None = None
         self._session: ClientSession | None = None
+        self._calls: hedging.SessionCalls | None = None
+        self._hedger = hedger
+        self._deadline_s = deadline_s
 
     async def start(self) -> None:
         self._stack = AsyncExitStack()
         await self._stack.__aenter__()
         server_params = StdioServerParameters(
-            command="python", args=["-m", "servers.mcp_echo_server"]
+            command="python", args=["-m", "servers.mcp_echo_server"], env=runtime.stdio_server_env(get_default_environment())
         )
         streams = await self._stack.enter_async_context(stdio_client(server_params))
+        if self._tap is not None:
+            streams = self._tap.wrap(streams)
         session = ClientSession(*streams)
         await self._stack.enter_async_context(session)
         await session.initialize()
         # Eager tool discovery to exclude from per-call timing
         await session.list_tools()
         self._session = session
+        self._calls = hedging.SessionCalls(session)
+
+    async def _call(self, name: str, arguments: dict):
+        # Idempotent calls only: hedged duplicates may both run
+        return await hedging.run(self._calls.call_tool(name, arguments), self._hedger, self._deadline_s, self._calls.stop)
 
     async def echo(self, message: str) -> tuple[float, str]:
         if not self._session:
             raise RuntimeError("client not started")
         start = time.perf_counter()
-        res = await self._session.call_tool("echo", {"message": message})
+        res = await self._call("echo", {"message": message})
         latency = (time.perf_counter() - start) * 1000
         return latency, res.content[0].text if res.content else ""
 
+    async def add(self, a: int, b: int) -> tuple[float, int]:
+        if not self._session:
+            raise RuntimeError("client not started")
+        start = time.perf_counter()
+        res = await self._call("add", {"a": a, "b": b})
+        latency = (time.perf_counter() - start) * 1000
+        return latency, int(res.content[0].text) if res.content else 0
+
+    async def list_tools(self) -> tuple[float, ListToolsResult]:
+        if not self._session:
+            raise RuntimeError("client not started")
+        start = time.perf_counter()
+        res = await self._session.list_tools()
+        return (time.perf_counter() - start) * 1000, res
+
+    async def call_tool(self, name: str, arguments: dict) -> tuple[float, str]:
+        if not self._session:
+            raise RuntimeError("client not started")
+        start = time.perf_counter()
+        res = await tracing.call_tool(self._session, name, arguments)
+        return (time.perf_counter() - start) * 1000, res.content[0].text if res.content else ""
+
+    async def echo_batch(self, messages: list[str]) -> tuple[float, list[str]]:
+        """Pipeline all calls on this session without awaiting each; returns (batch_ms, echoes)."""
+        if not self._session:
+            raise RuntimeError("client not started")
+        start = time.perf_counter()
+        results = await asyncio.gather(*(self._session.call_tool("echo", {"message": m}) for m in messages))
+        latency = (time.perf_counter() - start) * 1000
+        return latency, [res.content[0].text if res.content else "" for res in results]
+
+    async def ping(self) -> float:
+        if not self._session:
+            raise RuntimeError("client not started")
+        t0 = time.perf_counter()
+        await self._session.send_ping()
+        return (time.perf_counter() - t0) * 1000
+
     async def close(self) -> None:
+        if self._calls:
+            await self._calls.drain()
         if self._stack:
             await self._stack.aclose()
             self._stack = None
             self._session = None
+            self._calls = None
@@ -1,42 +1,128 @@
+import asyncio
 import time
 import json
 import argparse
+from servers import compression, tracing
+from clients import hedging
+from clients.reconnect import Link
 from contextlib import AsyncExitStack
 from mcp import ClientSession
 from mcp.client.sse import sse_client
+from mcp.shared._httpx_utils import create_mcp_http_client
+from mcp.types import ListToolsResult
+
+
+def _http_client(headers=None, timeout=None, auth=None):
+    # The SDK's defaults plus request-body compression when enabled
+    client = create_mcp_http_client(headers, timeout, auth)
+    client.event_hooks = compression.httpx_event_hooks(client.event_hooks)
+    return client
 
 
 class MCPHttpPersistent:
-    def __init__(self, base_url: str) -> None:
-        self._stack: AsyncExitStack | None = None
-        self._session: ClientSession | None = None
+    def __init__(self, base_url: str, hedger: hedging.Hedger | None = None, deadline_s: float | None = None) -> None:
+        self._link: Link | None = None
         self._base_url = base_url.rstrip("/")
+        self._hedger = hedger
+        self._deadline_s = deadline_s
+        # Calls sent again on a new session after the stream dropped under them
+        self.calls_retried = 0
 
-    async def start(self) -> None:
-        self._stack = AsyncExitStack()
-        await self._stack.__aenter__()
-        streams = await self._stack.enter_async_context(
-            sse_client(f"{self._base_url}/mcp/sse")
+    async def _transport(self, stack: AsyncExitStack):
+        return await stack.enter_async_context(
+            sse_client(f"{self._base_url}/mcp/sse", httpx_client_factory=_http_client)
         )
-        session = ClientSession(*streams)
-        await self._stack.enter_async_context(session)
+
+    async def _open(self, stack: AsyncExitStack, wrap) -> ClientSession:
+        streams = await self._transport(stack)
+        session = await stack.enter_async_context(ClientSession(*wrap(streams)))
         await session.initialize()
         await session.list_tools()
-        self._session = session
+        return session
 
-    async def echo(self, message: str) -> tuple[float, float, str]:
-        if not self._session:
+    async def start(self) -> None:
+        self._link = Link(self._open)
+        await self._link.start()
+
+    async def _session(self) -> ClientSession:
+        if not self._link:
             raise RuntimeError("client not started")
+        return await self._link.ensure()
+
+    async def _call(self, name: str, arguments: dict):
+        # Idempotent calls only: hedged duplicates may both run, and a call
+        # cut off by a dropped stream is sent again on the new session
+        if not self._link:
+            raise RuntimeError("client not started")
+        calls = await self._link.session_calls()
+        try:
+            return await hedging.run(calls.call_tool(name, arguments), self._hedger, self._deadline_s, calls.stop)
+        except Exception:
+            if self._link.live(calls.session):
+                raise
+        self.calls_retried += 1
+        calls = await self._link.session_calls()
+        return await hedging.run(calls.call_tool(name, arguments), self._hedger, self._deadline_s, calls.stop)
+
+    async def echo(self, message: str) -> tuple[float, float, str]:
         t_rpc0 = time.perf_counter()
-        res = await self._session.call_tool("echo", {"message": message})
+        res = await self._call("echo", {"message": message})
         t_rpc1 = time.perf_counter()
         return (t_rpc1 - t_rpc0) * 1000, (t_rpc1 - t_rpc0) * 1000, res.content[0].text if res.content else ""
 
+    async def add(self, a: int, b: int) -> tuple[float, int]:
+        t_rpc0 = time.perf_counter()
+        res = await self._call("add", {"a": a, "b": b})
+        t_rpc1 = time.perf_counter()
+        return (t_rpc1 - t_rpc0) * 1000, int(res.content[0].text) if res.content else 0
+
+    async def list_tools(self) -> tuple[float, ListToolsResult]:
+        session = await self._session()
+        t_rpc0 = time.perf_counter()
+        res = await session.list_tools()
+        return (time.perf_counter() - t_rpc0) * 1000, res
+
+    async def call_tool(self, name: str, arguments: dict) -> tuple[float, str]:
+        session = await self._session()
+        t_rpc0 = time.perf_counter()
+        res = await tracing.call_tool(session, name, arguments)
+        return (time.perf_counter() - t_rpc0) * 1000, res.content[0].text if res.content else ""
+
+    async def echo_batch(self, messages: list[str]) -> tuple[float, list[str]]:
+        """Pipeline all calls on this session without awaiting each; returns (batch_ms, echoes)."""
+        session = await self._session()
+        t_rpc0 = time.perf_counter()
+        results = await asyncio.gather(*(session.call_tool("echo", {"message": m}) for m in messages))
+        t_rpc1 = time.perf_counter()
+        return (t_rpc1 - t_rpc0) * 1000, [res.content[0].text if res.content else "" for res in results]
+
+    async def ping(self) -> float:
+        session = await self._session()
+        t0 = time.perf_counter()
+        await session.send_ping()
+        return (time.perf_counter() - t0) * 1000
+
     async def close(self) -> None:
-        if self._stack:
-            await self._stack.aclose()
-            self._stack = None
-            self._session = None
+        if self._link:
+            await self._link.close()
+            self._link = None
+
+    def reconnect_stats(self) -> dict:
+        return {**self._link.stats(), "calls_retried": self.calls_retried} if self._link else {}
+
+
+class MCPInprocPersistent(MCPHttpPersistent):
+    """The same session over in-memory streams to the SSE server's SDK
+    ``Server``, run in this process (``--transport inproc``)."""
+
+    def __init__(self, hedger: hedging.Hedger | None = None, deadline_s: float | None = None) -> None:
+        super().__init__("inproc://mcp", hedger, deadline_s)
+
+    async def _transport(self, stack: AsyncExitStack):
+        from clients import inproc
+        from servers.mcp_sse_server import srv
+
+        return await inproc.memory_streams(stack, srv)
 
 
 async def once_echo(base_url: str, message: str) -> tuple[float, float, str]:
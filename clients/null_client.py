@@ -0,0 +1,126 @@
+"""Clients of the "null" protocol, used to measure the harness floor.
+
+:class:`NullTCPPersistent` echoes over one raw TCP connection to
+``servers.null_echo_server``; :class:`NullPersistent` does no I/O at all.
+Both present the persistent-client interface, so ``run_client`` drives them
+along exactly the path it drives the real protocols; :func:`once_echo` and
+:func:`once_echo_noio` are the matching per-call clients of
+``--connection-mode cold``.
+"""
+import asyncio
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+from clients import hedging
+from servers.null_echo_server import LINE_LIMIT
+
+
+class NullTCPPersistent:
+    """Newline-framed echo on one connection. Calls are pipelined: each is
+    written at once, and a reader task resolves them in order, as the
+    server answers them in order."""
+
+    def __init__(self, base_url: str, hedger: hedging.Hedger | None = None, deadline_s: float | None = None) -> None:
+        parts = urlsplit(base_url)
+        self._host, self._port = parts.hostname, parts.port
+        self._hedger = hedger
+        self._deadline_s = deadline_s
+        self._writer: asyncio.StreamWriter | None = None
+        self._reader_task: asyncio.Task | None = None
+        self._waiting: deque[asyncio.Future] = deque()
+
+    async def start(self) -> None:
+        reader, self._writer = await asyncio.open_connection(self._host, self._port, limit=LINE_LIMIT)
+        self._reader_task = asyncio.create_task(self._read_replies(reader))
+
+    async def _read_replies(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while line := await reader.readline():
+                waiter = self._waiting.popleft()
+                # A call stopped by its deadline no longer waits
+                if not waiter.done():
+                    waiter.set_result(line[:-1].decode())
+            error: BaseException = ConnectionError("connection closed")
+        except Exception as e:
+            error = e
+        while self._waiting:
+            waiter = self._waiting.popleft()
+            if not waiter.done():
+                waiter.set_exception(error)
+
+    async def _send(self, message: str) -> str:
+        if self._reader_task is None or self._reader_task.done():
+            raise ConnectionError("connection closed")
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiting.append(waiter)
+        self._writer.write(message.encode() + b"\n")
+        return await waiter
+
+    async def echo(self, message: str) -> tuple[float, float, str]:
+        if not self._writer:
+            raise RuntimeError("client not started")
+        t_rpc0 = time.perf_counter()
+        out = await hedging.run(lambda: self._send(message), self._hedger, self._deadline_s)
+        t_rpc1 = time.perf_counter()
+        return (t_rpc1 - t_rpc0) * 1000, (t_rpc1 - t_rpc0) * 1000, out
+
+    async def close(self) -> None:
+        if self._writer:
+            self._writer.close()
+            await hedging.cancel_task(self._reader_task)
+            self._writer = None
+            self._reader_task = None
+
+
+class NullPersistent:
+    """No I/O: echo yields to the loop once, as every real call does at
+    least once, and returns its input."""
+
+    def __init__(self, hedger: hedging.Hedger | None = None, deadline_s: float | None = None) -> None:
+        self._hedger = hedger
+        self._deadline_s = deadline_s
+        self._started = False
+
+    async def start(self) -> None:
+        self._started = True
+
+    async def _send(self, message: str) -> str:
+        await asyncio.sleep(0)
+        return message
+
+    async def echo(self, message: str) -> tuple[float, float, str]:
+        if not self._started:
+            raise RuntimeError("client not started")
+        t_rpc0 = time.perf_counter()
+        out = await hedging.run(lambda: self._send(message), self._hedger, self._deadline_s)
+        t_rpc1 = time.perf_counter()
+        return (t_rpc1 - t_rpc0) * 1000, (t_rpc1 - t_rpc0) * 1000, out
+
+    async def close(self) -> None:
+        self._started = False
+
+
+async def once_echo(base_url: str, message: str) -> tuple[float, float, str]:
+    """One echo on a new connection, closed afterwards. Total includes the
+    TCP connect, rpc only the round trip."""
+    parts = urlsplit(base_url)
+    t0 = time.perf_counter()
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port, limit=LINE_LIMIT)
+    try:
+        t_rpc0 = time.perf_counter()
+        writer.write(message.encode() + b"\n")
+        line = await reader.readline()
+        t1 = time.perf_counter()
+    finally:
+        writer.close()
+    return (t1 - t0) * 1000, (t1 - t_rpc0) * 1000, line[:-1].decode()
+
+
+async def once_echo_noio(message: str) -> tuple[float, float, str]:
+    """The cold counterpart of :class:`NullPersistent`: there is nothing to
+    set up, so it is the same single loop turn."""
+    t0 = time.perf_counter()
+    await asyncio.sleep(0)
+    t1 = time.perf_counter()
+    return (t1 - t0) * 1000, (t1 - t0) * 1000, message
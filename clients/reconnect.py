@@ -0,0 +1,262 @@
+"""Automatic reconnect for the SSE session clients (MCP and ACP).
+
+An SSE session lives only as long as its GET stream and the task posting
+its messages. When a load balancer or the server cuts the stream, the SDK
+session is dead, although POSTs to its endpoint may still be accepted for
+a while. :class:`Link` wraps the session's streams to see the transport
+end, and then rebuilds it at once (SSE connect, ``initialize``,
+``tools/list``), before the next call needs the session. Each connection is
+held by a task of its own, so that it can be torn down from whichever task
+notices, as anyio requires, and a failing transport cancels only that task.
+A reconnect that fails, e.g. because the server is down, is retried when
+the next call asks for the session.
+
+Requests still waiting for a response are failed as soon as the stream
+ends. The MCP SDK would do this itself unless the teardown cancels it
+first; the ACP fork leaves them waiting forever.
+"""
+import asyncio
+import contextlib
+import importlib
+import time
+from contextlib import AsyncExitStack
+from typing import Any, Awaitable, Callable
+
+from clients import hedging
+
+# JSON-RPC error code the MCP SDK uses for requests cut off by a closed stream
+CONNECTION_CLOSED = -32000
+# Longest a connect may take: an initialize whose POST was lost (both SDKs
+# only log a failed POST) is never answered
+CONNECT_TIMEOUT_S = 10.0
+
+
+class _WatchedReceiveStream:
+    """Calls ``on_end`` when the transport's read stream ends. Transport
+    errors sent in-band are dropped: ``sse_client`` has logged them and
+    ends the stream after a fatal one, and the ACP fork's session would
+    block forever passing one on to a reader it never starts."""
+
+    def __init__(self, inner, on_end: Callable[[], None]) -> None:
+        self._inner = inner
+        self._on_end = on_end
+
+    async def receive(self):
+        try:
+            while isinstance(item := await self._inner.receive(), Exception):
+                pass
+        except Exception:
+            self._on_end()
+            raise
+        return item
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            while isinstance(item := await self._inner.__anext__(), Exception):
+                pass
+        except StopAsyncIteration:
+            self._on_end()
+            raise
+        return item
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+    def close(self) -> None:
+        self._inner.close()
+
+    async def __aenter__(self):
+        await self._inner.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc):
+        return await self._inner.__aexit__(*exc)
+
+
+class _WatchedSendStream:
+    """Calls ``on_end`` when a send fails: ``sse_client`` closes the write
+    stream once a POST fails, and never reopens it."""
+
+    def __init__(self, inner, on_end: Callable[[], None]) -> None:
+        self._inner = inner
+        self._on_end = on_end
+
+    async def send(self, item) -> None:
+        try:
+            await self._inner.send(item)
+        except Exception:
+            self._on_end()
+            raise
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+    def close(self) -> None:
+        self._inner.close()
+
+    async def __aenter__(self):
+        await self._inner.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc):
+        return await self._inner.__aexit__(*exc)
+
+
+class Link:
+    """A session that reconnects itself. ``connect(stack, wrap)`` opens the
+    transport and session on ``stack``, passing the transport's streams
+    through ``wrap`` before handing them to ``ClientSession``, and returns
+    the initialized session."""
+
+    def __init__(self, connect: Callable[[AsyncExitStack, Callable], Awaitable[Any]]) -> None:
+        self._connect = connect
+        self.session = None
+        # Attempts and stopping for the live session (see clients.hedging)
+        self.calls: hedging.SessionCalls | None = None
+        self._lost = False
+        self._closing = False
+        self._wake = asyncio.Event()
+        self._pending: asyncio.Future | None = None
+        self._task: asyncio.Task | None = None
+        # Reconnects after the first connect: duration (ms) of each success
+        self.reconnect_ms: list[float] = []
+        self.failed_reconnects = 0
+        self.streams_lost = 0
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._own())
+        await self.ensure()
+
+    def live(self, session) -> bool:
+        """Whether ``session`` is still the current one with its stream up."""
+        return session is not None and session is self.session and not self._lost
+
+    async def ensure(self):
+        """The live session, after reconnecting if its stream is gone."""
+        if self.live(self.session):
+            return self.session
+        if self._task is None or self._closing:
+            raise RuntimeError("client not started")
+        if self._pending is None:
+            self._pending = asyncio.get_running_loop().create_future()
+            self._wake.set()
+        return await asyncio.shield(self._pending)
+
+    async def session_calls(self) -> hedging.SessionCalls:
+        """Attempts on the live session, after reconnecting if needed."""
+        while True:
+            session = await self.ensure()
+            # The session can drop again before this task resumes
+            if self.live(session):
+                return self.calls
+
+    def _stream_ended(self, session_ref: list) -> None:
+        if session_ref[0] is None or session_ref[0] is not self.session or self._lost:
+            return
+        self._lost = True
+        self.streams_lost += 1
+        self._fail_waiting(self.session)
+        self._wake.set()
+
+    def _fail_waiting(self, session) -> None:
+        types = importlib.import_module(type(session).__module__.split(".", 1)[0] + ".types")
+        streams = session._response_streams  # noqa: SLF001
+        for request_id, stream in list(streams.items()):
+            error = types.ErrorData(code=CONNECTION_CLOSED, message="Connection closed")
+            with contextlib.suppress(Exception):
+                stream.send_nowait(types.JSONRPCError(jsonrpc="2.0", id=request_id, error=error))
+        streams.clear()
+
+    def _watch(self, streams, session_ref: list):
+        def ended() -> None:
+            self._stream_ended(session_ref)
+
+        return _WatchedReceiveStream(streams[0], ended), _WatchedSendStream(streams[1], ended)
+
+    async def _hold(self, ready: asyncio.Future, release: asyncio.Event) -> None:
+        """Holds one connection's stack in a task of its own: when the
+        transport fails, its task group cancels this task, not the owner."""
+        session_ref: list = [None]
+        try:
+            async with AsyncExitStack() as stack:
+                session = await self._connect(stack, lambda streams: self._watch(streams, session_ref))
+                session_ref[0] = self.session = session
+                self.calls = hedging.SessionCalls(session)
+                self._lost = False
+                ready.set_result(session)
+                await release.wait()
+        finally:
+            # The transport may also go down without ending the read stream
+            self._stream_ended(session_ref)
+
+    async def _own(self) -> None:
+        loop = asyncio.get_running_loop()
+        holder: asyncio.Task | None = None
+        release = asyncio.Event()
+        first = True
+        while True:
+            await self._wake.wait()
+            if holder is not None:
+                # Stream lost, or closing: tear the old session down first
+                if self.calls is not None and not self._lost:
+                    await self.calls.drain()
+                if self.session is not None:
+                    self._fail_waiting(self.session)
+                self.session = self.calls = None
+                release.set()
+                await asyncio.gather(holder, return_exceptions=True)
+                holder = None
+            # Calls that found the session gone while it was torn down
+            self._wake.clear()
+            if self._closing:
+                break
+            if self._pending is None:
+                # Reconnect before any call is waiting for it
+                self._pending = loop.create_future()
+            pending = self._pending
+            # Nobody may be waiting to see a failure
+            pending.add_done_callback(lambda f: f.cancelled() or f.exception())
+            t0 = time.perf_counter()
+            ready = loop.create_future()
+            release = asyncio.Event()
+            holder = asyncio.create_task(self._hold(ready, release))
+            done, _ = await asyncio.wait({ready, holder}, timeout=CONNECT_TIMEOUT_S, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                await hedging.cancel_task(holder)
+            if not ready.done():
+                if not done:
+                    error = TimeoutError(f"no session within {CONNECT_TIMEOUT_S:g} s")
+                else:
+                    error = None if holder.cancelled() else holder.exception()
+                holder = None
+                if not first:
+                    self.failed_reconnects += 1
+                self._pending = None
+                pending.set_exception(error or ConnectionError("transport closed while connecting"))
+                continue
+            if not first:
+                self.reconnect_ms.append((time.perf_counter() - t0) * 1000)
+            first = False
+            self._pending = None
+            pending.set_result(self.session)
+        if self._pending is not None and not self._pending.done():
+            self._pending.set_exception(RuntimeError("client closed"))
+
+    async def close(self) -> None:
+        if self._task is None:
+            return
+        self._closing = True
+        self._wake.set()
+        await self._task
+        self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "streams_lost": self.streams_lost,
+            "reconnects": len(self.reconnect_ms),
+            "failed_reconnects": self.failed_reconnects,
+            "reconnect_ms": list(self.reconnect_ms),
+        }
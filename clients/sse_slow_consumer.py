@@ -0,0 +1,81 @@
+"""Deliberately throttled SSE consumers for the slow-consumer benchmark.
+
+Each consumer opens a real SSE stream, makes the server produce a large
+volume of events, then reads them back slowly so the server has to queue.
+They run until cancelled; progress is kept on the instance.
+"""
+import asyncio
+from urllib.parse import urljoin
+import httpx
+from httpx_sse import aconnect_sse
+from mcp.types import LATEST_PROTOCOL_VERSION
+
+
+class MCPSlowConsumer:
+    """Floods an MCP SSE session with echo calls and reads responses slowly.
+
+    Speaks raw JSON-RPC over the SSE transport because the SDK session reads
+    its stream eagerly and cannot be throttled.
+    """
+
+    def __init__(self, base_url: str, calls: int, payload_bytes: int, read_delay_ms: float) -> None:
+        self._base_url = base_url.rstrip("/")
+        self._calls = calls
+        self._payload_bytes = payload_bytes
+        self._read_delay = read_delay_ms / 1000
+        self.calls_posted = 0
+        self.events_read = 0
+
+    async def run(self) -> None:
+        async with httpx.AsyncClient(timeout=None) as client:
+            async with aconnect_sse(client, "GET", f"{self._base_url}/mcp/sse") as source:
+                events = source.aiter_sse()
+                endpoint = await anext(events)
+                post_url = urljoin(f"{self._base_url}/", endpoint.data)
+                await client.post(post_url, json={
+                    "jsonrpc": "2.0",
+                    "id": 0,
+                    "method": "initialize",
+                    "params": {
+                        "protocolVersion": LATEST_PROTOCOL_VERSION,
+                        "capabilities": {},
+                        "clientInfo": {"name": "bench-slow-consumer", "version": "0.0.0"},
+                    },
+                })
+                await anext(events)
+                await client.post(post_url, json={"jsonrpc": "2.0", "method": "notifications/initialized"})
+                message = "x" * self._payload_bytes
+                for i in range(self._calls):
+                    await client.post(post_url, json={
+                        "jsonrpc": "2.0",
+                        "id": i + 1,
+                        "method": "tools/call",
+                        "params": {"name": "echo", "arguments": {"message": message}},
+                    })
+                    self.calls_posted += 1
+                async for _ in events:
+                    self.events_read += 1
+                    await asyncio.sleep(self._read_delay)
+
+
+class A2ASlowConsumer:
+    """Requests a long A2A SSE echo stream and reads it slowly."""
+
+    def __init__(self, base_url: str, message_bytes: int, repeat: int, read_delay_ms: float, token: str | None = None) -> None:
+        self._base_url = base_url.rstrip("/")
+        self._message_bytes = message_bytes
+        self._repeat = repeat
+        self._read_delay = read_delay_ms / 1000
+        self._token = token
+        self.events_read = 0
+
+    async def run(self) -> None:
+        headers = {"Accept": "text/event-stream"}
+        if self._token:
+            headers["Authorization"] = f"Bearer {self._token}"
+        params = {"message": "x" * self._message_bytes, "chunks": 4, "delay_ms": 0, "repeat": self._repeat}
+        async with httpx.AsyncClient(timeout=None) as client:
+            async with aconnect_sse(client, "GET", f"{self._base_url}/a2a/sse/echo", params=params, headers=headers) as source:
+                async for _ in source.aiter_sse():
+                    self.events_read += 1
+                    await asyncio.sleep(self._read_delay)
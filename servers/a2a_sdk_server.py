@@ -1,7 +1,9 @@
 from fastapi import FastAPI, Request, Header, HTTPException
-import uvicorn
+from fastapi.responses import JSONResponse
 from a2a.server.apps import A2AFastAPIApplication
+from a2a.server.apps.jsonrpc.fastapi_app import A2AFastAPI
 from a2a.server.request_handlers.request_handler import RequestHandler
+from a2a.server.request_handlers.jsonrpc_handler import JSONRPCHandler
 from a2a.server.context import ServerCallContext
 from a2a.types import (
     AgentCapabilities,
@@ -13,6 +15,7 @@ from a2a.types import (
     Message,
     MessageSendParams,
     Role,
+    SendMessageRequest,
     Part,
     TextPart,
     Task,
@@ -25,8 +28,11 @@ from collections.abc import AsyncGenerator as ABCAsyncGenerator
 from datetime import datetime, timezone
 import uuid
 import os
+import time
 import asyncio
 from sse_starlette.sse import EventSourceResponse
+from servers import runtime, sse_stats, work
+from servers.discovery import CachedDocument
 
 
 class EchoRequestHandler(RequestHandler):
@@ -50,6 +56,7 @@ class EchoRequestHandler(RequestHandler):
                 if isinstance(p.root, TextPart):
                     text = p.root.text or ""
                     break
+        await work.simulate()
         result = text
         # Support simple add: "ADD a b"
         if text.upper().startswith("ADD "):
@@ -145,53 +152,111 @@ def build_agent_card(base_url: str) -> AgentCard:
 
 
 def create_app() -> FastAPI:
-    base_url = "http://127.0.0.1:8201"
+    base_url = f"{runtime.scheme()}://127.0.0.1:8201"
     card = build_agent_card(base_url)
     handler = EchoRequestHandler()
     app_builder = A2AFastAPIApplication(agent_card=card, http_handler=handler)
-    app = app_builder.build(agent_card_url="/a2a/agent-card", rpc_url="/a2a/jsonrpc")
+    app = A2AFastAPI()
+
+    # The card is static, so serve it pre-encoded with an ETag. These routes are
+    # registered before the SDK's, which would re-render the card per request
+    card_doc = CachedDocument(card.model_dump(mode="json", exclude_none=True, by_alias=True))
+
+    @app.get("/a2a/agent-card")
+    @app.get("/.well-known/agent-card.json")
+    async def a2a_agent_card(request: Request):
+        return card_doc.response(request)
+
+    app_builder.add_routes_to_app(app, agent_card_url="/a2a/agent-card", rpc_url="/a2a/jsonrpc")
 
     # Optional bearer token auth (enabled when A2A_BEARER_TOKEN is set)
     token_env = os.environ.get("A2A_BEARER_TOKEN")
 
     @app.middleware("http")
     async def bearer_auth_middleware(request: Request, call_next):
-        if token_env and request.url.path.startswith("/a2a/") and request.url.path.endswith("/jsonrpc"):
+        if token_env and request.url.path.startswith("/a2a/") and request.url.path.endswith(("/jsonrpc", "/jsonrpc/batch")):
             auth = request.headers.get("authorization") or request.headers.get("Authorization")
             if not auth or not auth.lower().startswith("bearer ") or auth.split(" ", 1)[1] != token_env:
                 raise HTTPException(status_code=401, detail="Unauthorized")
         return await call_next(request)
 
+    # JSON-RPC batch endpoint: the SDK route only accepts single requests, so
+    # batches get their own path and the single-call path stays untouched
+    jsonrpc_handler = JSONRPCHandler(agent_card=card, request_handler=handler)
+
+    @app.post("/a2a/jsonrpc/batch")
+    async def a2a_jsonrpc_batch(request: Request):
+        body = await request.json()
+        if not isinstance(body, list) or not body:
+            return JSONResponse({
+                "jsonrpc": "2.0",
+                "id": None,
+                "error": {"code": -32600, "message": "Invalid Request: expected a non-empty batch"},
+            })
+
+        async def dispatch(item) -> dict:
+            req_id = item.get("id") if isinstance(item, dict) else None
+            if not isinstance(item, dict) or item.get("method") != "message/send":
+                return {"jsonrpc": "2.0", "id": req_id, "error": {"code": -32601, "message": "Method not found"}}
+            try:
+                req = SendMessageRequest.model_validate(item)
+            except Exception as e:
+                return {"jsonrpc": "2.0", "id": req_id, "error": {"code": -32602, "message": str(e)}}
+            resp = await jsonrpc_handler.on_message_send(req, ServerCallContext())
+            return resp.root.model_dump(mode="json", exclude_none=True, by_alias=True)
+
+        return JSONResponse(list(await asyncio.gather(*(dispatch(item) for item in body))))
+
+    track_sse = sse_stats.enabled()
+
     # Simple SSE echo for streaming tests
     @app.get("/a2a/sse/echo")
-    async def a2a_sse_echo(request: Request, message: str = "hello", chunks: int = 3, delay_ms: int = 5, authorization: str | None = Header(default=None)):
+    async def a2a_sse_echo(request: Request, message: str = "hello", chunks: int = 3, delay_ms: int = 5, repeat: int = 1, authorization: str | None = Header(default=None)):
         if token_env:
             if not authorization or not authorization.lower().startswith("bearer ") or authorization.split(" ", 1)[1] != token_env:
                 raise HTTPException(status_code=401, detail="Unauthorized")
 
         async def event_generator():
-            # Stream message in N chunks to simulate streaming
+            # Stream message in N chunks to simulate streaming; repeat > 1 replays
+            # the chunks to generate volume for slow-consumer tests
             part_len = max(1, len(message) // max(1, chunks))
-            for i in range(chunks):
-                if await request.is_disconnected():
-                    break
-                start = i * part_len
-                data = message[start : start + part_len] if i < chunks - 1 else message[start:]
-                yield {"event": "message", "data": data}
-                await asyncio.sleep(max(0, delay_ms) / 1000)
-        return EventSourceResponse(event_generator())
+            for _ in range(max(1, repeat)):
+                for i in range(chunks):
+                    if await request.is_disconnected():
+                        return
+                    start = i * part_len
+                    data = message[start : start + part_len] if i < chunks - 1 else message[start:]
+                    yield {"event": "message", "data": data}
+                    await asyncio.sleep(max(0, delay_ms) / 1000)
+
+        async def tracked_event_generator():
+            # The generator resumes only after the previous event was sent, so
+            # the gap between yield and resume is time blocked on the consumer
+            sse_stats.STATS.stream_opened()
+            try:
+                async for event in event_generator():
+                    sse_stats.STATS.event_queued()
+                    t0 = time.perf_counter()
+                    try:
+                        yield event
+                    finally:
+                        sse_stats.STATS.event_sent((time.perf_counter() - t0) * 1000)
+            finally:
+                sse_stats.STATS.stream_closed()
+
+        return EventSourceResponse(tracked_event_generator() if track_sse else event_generator())
+
+    if track_sse:
+        @app.get("/a2a/debug/sse-stats")
+        async def a2a_sse_stats():
+            return sse_stats.STATS.snapshot()
 
     return app
 
 
 async def main():
-    app = create_app()
-    config = uvicorn.Config(app=app, host="127.0.0.1", port=8201, log_level="error")
-    server = uvicorn.Server(config)
-    await server.serve()
+    await runtime.serve(create_app(), host="127.0.0.1", port=8201)
 
 
 if __name__ == "__main__":
-    import asyncio
-
-    asyncio.run(main())
+    runtime.run(main)
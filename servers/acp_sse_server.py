@@ -1,11 +1,11 @@
 from starlette.applications import Starlette
 from starlette.routing import Route, Mount
 from starlette.responses import Response
-import uvicorn
-import anyio
 from acp.server.lowlevel import Server, NotificationOptions
 from acp.server.sse import SseServerTransport
 import acp.types as types
+from servers import tracing
+from servers import admission, cancellation, runtime, work
 
 
 srv = Server("acp-echo-sse")
@@ -40,14 +40,20 @@ async def list_tools() -> list[types.Tool]:
 
 @srv.call_tool()
 async def call_tool(name: str, arguments: dict) -> list[types.TextContent]:
-    if name == "echo":
-        msg = arguments.get("message", "")
-        return [types.TextContent(type="text", text=str(msg))]
-    if name == "add":
-        a = int(arguments.get("a", 0))
-        b = int(arguments.get("b", 0))
-        return [types.TextContent(type="text", text=str(a + b))]
-    raise ValueError(f"Unknown tool: {name}")
+    with tracing.span(f"tools/call {name}", "server", tracing.meta_traceparent(srv.request_context.meta)):
+        await work.simulate()
+        if name == "echo":
+            msg = arguments.get("message", "")
+            return [types.TextContent(type="text", text=str(msg))]
+        if name == "add":
+            a = int(arguments.get("a", 0))
+            b = int(arguments.get("b", 0))
+            return [types.TextContent(type="text", text=str(a + b))]
+        raise ValueError(f"Unknown tool: {name}")
+
+
+admission.install(srv)
+cancellation.install(srv)
 
 
 def create_app() -> Starlette:
@@ -70,12 +76,9 @@ def create_app() -> Starlette:
 
 
 async def main():
-    app = create_app()
-    config = uvicorn.Config(app=app, host="127.0.0.1", port=8101, log_level="error")
-    server = uvicorn.Server(config)
-    await server.serve()
+    await runtime.serve(create_app(), host="127.0.0.1", port=8101)
 
 
 if __name__ == "__main__":
-    anyio.run(main)
+    runtime.run(main)
 
@@ -1,7 +1,8 @@
 from acp.server.lowlevel import Server, NotificationOptions
 from acp.server.stdio import stdio_server
-import anyio
 import acp.types as types
+from servers import tracing
+from servers import admission, cancellation, runtime, work
 
 
 srv = Server("acp-echo")
@@ -36,14 +37,20 @@ async def list_tools() -> list[types.Tool]:
 
 @srv.call_tool()
 async def call_tool(name: str, arguments: dict) -> list[types.TextContent]:
-    if name == "echo":
-        msg = arguments.get("message", "")
-        return [types.TextContent(type="text", text=str(msg))]
-    if name == "add":
-        a = int(arguments.get("a", 0))
-        b = int(arguments.get("b", 0))
-        return [types.TextContent(type="text", text=str(a + b))]
-    raise ValueError(f"Unknown tool: {name}")
+    with tracing.span(f"tools/call {name}", "server", tracing.meta_traceparent(srv.request_context.meta)):
+        await work.simulate()
+        if name == "echo":
+            msg = arguments.get("message", "")
+            return [types.TextContent(type="text", text=str(msg))]
+        if name == "add":
+            a = int(arguments.get("a", 0))
+            b = int(arguments.get("b", 0))
+            return [types.TextContent(type="text", text=str(a + b))]
+        raise ValueError(f"Unknown tool: {name}")
+
+
+admission.install(srv)
+cancellation.install(srv)
 
 
 async def main():
@@ -56,5 +63,5 @@ async def main():
 
 
 if __name__ == "__main__":
-    anyio.run(main)
+    runtime.run(main)
 
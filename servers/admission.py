@@ -0,0 +1,240 @@
+"""Per-server admission control (load shedding).
+
+``BENCH_MAX_INFLIGHT=N`` caps the requests a server works on at once.
+``BENCH_MAX_QUEUE=M`` lets up to M more wait for a slot (default 0:
+reject at once), each for at most ``BENCH_QUEUE_TIMEOUT_MS`` (default:
+no limit). Everything beyond that is rejected without doing any work:
+
+- A2A/ANP: :class:`AdmissionApp` gates every HTTP request and answers
+  503 with ``Retry-After`` and a JSON body, a JSON-RPC error on JSON-RPC
+  paths
+- MCP/ACP: :func:`install` gates the ``tools/call`` handler and rejects
+  with JSON-RPC error :data:`OVERLOADED` on the session stream, because
+  the HTTP POST carrying a request is acknowledged (202) before it runs
+
+Unset ``BENCH_MAX_INFLIGHT`` installs nothing. With it set,
+``GET /_bench/admission`` returns :meth:`Gate.snapshot` and
+``POST /_bench/admission/reset`` clears the counters.
+"""
+import asyncio
+import contextlib
+import importlib
+import json
+import os
+import time
+from collections import deque
+
+# JSON-RPC "server error" range; the message says why
+OVERLOADED = -32000
+
+
+class Overloaded(Exception):
+    pass
+
+
+class Gate:
+    """A concurrency limit with a bounded FIFO queue in front of it."""
+
+    def __init__(self, limit: int, queue: int = 0, queue_timeout_s: float | None = None) -> None:
+        if limit < 1:
+            raise ValueError("BENCH_MAX_INFLIGHT must be at least 1")
+        self.limit = limit
+        self.queue = queue
+        self.queue_timeout_s = queue_timeout_s
+        # "http" gates whole requests (AdmissionApp); "tools/call" is set by
+        # install() when the handler is gated instead
+        self.scope = "http"
+        self.inflight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self.reset()
+
+    def reset(self) -> None:
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.max_inflight = self.inflight
+        self.max_waiting = len(self._waiters)
+        self._waits_ms: list[float] = []
+
+    @contextlib.asynccontextmanager
+    async def admit(self):
+        """Hold a slot for the block; yields a function that gives the slot
+        back early (at most once)."""
+        t0 = time.perf_counter()
+        if self.inflight < self.limit and not self._waiters:
+            self.inflight += 1
+            self.max_inflight = max(self.max_inflight, self.inflight)
+        else:
+            if len(self._waiters) >= self.queue:
+                self.rejected += 1
+                raise Overloaded(f"overloaded: {self.inflight} in flight, {len(self._waiters)} queued")
+            await self._wait_for_slot()
+        self.admitted += 1
+        self._waits_ms.append((time.perf_counter() - t0) * 1000)
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                self._release()
+
+        try:
+            yield release
+        finally:
+            release()
+
+    async def _wait_for_slot(self) -> None:
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        self.queued += 1
+        self.max_waiting = max(self.max_waiting, len(self._waiters))
+        try:
+            await asyncio.wait_for(fut, self.queue_timeout_s)
+        except BaseException as e:
+            if fut.done() and not fut.cancelled():
+                # A slot was handed over as this waiter gave up: pass it on
+                self._release()
+            else:
+                with contextlib.suppress(ValueError):
+                    self._waiters.remove(fut)
+            if isinstance(e, asyncio.TimeoutError):
+                self.rejected += 1
+                self.timed_out += 1
+                raise Overloaded(f"overloaded: queued for more than {self.queue_timeout_s * 1000:.0f} ms") from None
+            raise
+
+    def _release(self) -> None:
+        # The slot goes straight to the oldest live waiter, so inflight only
+        # drops when nobody is queued
+        while self._waiters:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                fut.set_result(None)
+                return
+        self.inflight -= 1
+
+    def snapshot(self) -> dict:
+        waits = sorted(self._waits_ms)
+
+        def pct(p: float) -> float | None:
+            return waits[min(len(waits) - 1, int(len(waits) * p))] if waits else None
+
+        return {
+            "scope": self.scope,
+            "limit": self.limit,
+            "queue": self.queue,
+            "queue_timeout_ms": self.queue_timeout_s * 1000 if self.queue_timeout_s is not None else None,
+            "inflight": self.inflight,
+            "waiting": len(self._waiters),
+            "max_inflight": self.max_inflight,
+            "max_waiting": self.max_waiting,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "queue_wait_ms": {
+                "avg": sum(waits) / len(waits) if waits else None,
+                "p50": pct(0.5),
+                "p99": pct(0.99),
+                "max": waits[-1] if waits else None,
+            },
+        }
+
+
+def from_env() -> Gate | None:
+    limit = os.environ.get("BENCH_MAX_INFLIGHT")
+    if not limit:
+        return None
+    timeout_ms = os.environ.get("BENCH_QUEUE_TIMEOUT_MS")
+    return Gate(
+        int(limit),
+        int(os.environ.get("BENCH_MAX_QUEUE", "0")),
+        float(timeout_ms) / 1000 if timeout_ms else None,
+    )
+
+
+GATE = from_env()
+
+
+def install(srv) -> None:
+    """Gate ``srv``'s ``tools/call`` handler (MCP or ACP lowlevel server);
+    call after the handler is registered."""
+    if GATE is None:
+        return
+    sdk = type(srv).__module__.split(".", 1)[0]
+    types = importlib.import_module(f"{sdk}.types")
+    exceptions = importlib.import_module(f"{sdk}.shared.exceptions")
+    handler = srv.request_handlers[types.CallToolRequest]
+
+    async def admitted(req):
+        try:
+            async with GATE.admit():
+                return await handler(req)
+        except Overloaded as e:
+            # McpError reaches the session as a JSON-RPC error; the SDK's
+            # call_tool wrapper would turn anything else into a tool result
+            raise exceptions.McpError(types.ErrorData(code=OVERLOADED, message=str(e))) from None
+
+    srv.request_handlers[types.CallToolRequest] = admitted
+    GATE.scope = "tools/call"
+
+
+class AdmissionApp:
+    """ASGI wrapper applying :data:`GATE` to HTTP requests and serving its
+    counters under /_bench/admission."""
+
+    def __init__(self, app, gate: Gate) -> None:
+        self._app = app
+        self._gate = gate
+
+    async def __call__(self, scope, receive, send) -> None:
+        from servers.runtime import send_json
+
+        if scope["type"] != "http":
+            await self._app(scope, receive, send)
+            return
+        path = scope["path"]
+        if path == "/_bench/admission":
+            await send_json(send, self._gate.snapshot())
+            return
+        if path == "/_bench/admission/reset" and scope["method"] == "POST":
+            self._gate.reset()
+            await send_json(send, self._gate.snapshot())
+            return
+        if self._gate.scope != "http" or path.startswith("/_bench/"):
+            await self._app(scope, receive, send)
+            return
+        try:
+            async with self._gate.admit() as release:
+
+                async def released_send(message) -> None:
+                    # The client has its response with the last body chunk
+                    # and may send the next request on the same connection
+                    # before this app returns: free the slot first
+                    if message["type"] == "http.response.body" and not message.get("more_body", False):
+                        release()
+                    await send(message)
+
+                await self._app(scope, receive, released_send)
+        except Overloaded as e:
+            await self._reject(path, str(e), send)
+
+    @staticmethod
+    async def _reject(path: str, message: str, send) -> None:
+        if "jsonrpc" in path:
+            payload = {"jsonrpc": "2.0", "id": None, "error": {"code": OVERLOADED, "message": message}}
+        else:
+            payload = {"error": message}
+        body = json.dumps(payload).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", b"1"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
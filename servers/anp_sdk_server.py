@@ -1,5 +1,4 @@
-from fastapi import FastAPI, Header, HTTPException, Request
-import uvicorn
+from fastapi import FastAPI, Header, HTTPException, Request, Response
 from typing import Optional, Dict, Any
 from datetime import datetime, timezone
 import uuid
@@ -13,6 +12,8 @@ from cryptography.hazmat.primitives import serialization
 from agent_connect.authentication import DidWbaVerifier, DidWbaVerifierConfig
 import agent_connect.authentication.did_wba_verifier as did_wba_verifier
 import agent_connect.authentication.did_wba as did_wba
+from servers import runtime, work
+from servers.discovery import CachedDocument
 
 
 app = FastAPI(title="ANP SDK Server (DID-WBA)")
@@ -78,7 +79,8 @@ async def startup():
     priv, pub = create_jwt_keys()
     app.state.verifier = DidWbaVerifier(
         DidWbaVerifierConfig(
-            jwt_private_key=priv, jwt_public_key=pub, jwt_algorithm="RS256"
+            jwt_private_key=priv, jwt_public_key=pub, jwt_algorithm="RS256",
+            access_token_expire_minutes=float(os.environ.get("ANP_TOKEN_TTL_S", "3600")) / 60,
         )
     )
     # Prepare server DID doc for discovery
@@ -99,28 +101,27 @@ async def startup():
             {
                 "id": f"{server_domain}#agent-service",
                 "type": "AgentService",
-                "serviceEndpoint": "http://127.0.0.1:8301/anp",
+                "serviceEndpoint": f"{runtime.scheme()}://127.0.0.1:8301/anp",
             }
         ],
         "created": datetime.now(timezone.utc).isoformat(),
         "updated": datetime.now(timezone.utc).isoformat(),
     }
+    # Discovery documents are fixed for the server's lifetime: encode once
+    app.state.did_document = CachedDocument(app.state.server_did, media_type="application/did+json")
+    app.state.agent_description = CachedDocument(build_agent_description(app.state.server_did["id"]), media_type="application/ld+json")
 
 
-@app.get("/.well-known/did.json")
-async def get_did():
-    return app.state.server_did
-
-
-@app.get("/anp/agent-description")
-async def agent_description():
+def build_agent_description(server_id: str) -> dict:
+    # Dates reflect when this server instance started publishing the description
+    started = datetime.now(timezone.utc).isoformat()
     return {
         "@context": [
             "https://schema.org/",
             "https://agentnetworkprotocol.com/context/v1",
         ],
         "@type": "anp:Agent",
-        "@id": app.state.server_did["id"],
+        "@id": server_id,
         "schema:name": "ANP Echo Agent (SDK)",
         "schema:description": "Echo and add with DID-WBA verification",
         "anp:version": "1.0.0",
@@ -131,14 +132,41 @@ async def agent_description():
         "anp:supportedProtocols": ["anp:json-ld"],
         "anp:endpoints": {"messages": "/anp/messages"},
         "anp:didDocument": "/.well-known/did.json",
-        "schema:dateCreated": datetime.now(timezone.utc).isoformat(),
-        "schema:dateModified": datetime.now(timezone.utc).isoformat(),
+        "schema:dateCreated": started,
+        "schema:dateModified": started,
     }
 
 
+@app.get("/.well-known/did.json")
+async def get_did(request: Request):
+    return app.state.did_document.response(request)
+
+
+@app.get("/anp/agent-description")
+async def agent_description(request: Request):
+    return app.state.agent_description.response(request)
+
+
+# Anyone who can reach it could revoke every token, so the fault endpoint
+# exists only when the harness asks for it (BENCH_FAULTS, exported for
+# --test-error-handling)
+if os.environ.get("BENCH_FAULTS", "false").lower() in ("1", "true", "yes"):
+
+    @app.post("/_bench/auth/rotate")
+    async def rotate_token_keys():
+        # New JWT signing keys: every access token issued so far stops verifying,
+        # as if all had expired at once. DID authentication is unaffected
+        config = app.state.verifier.config
+        config.jwt_private_key, config.jwt_public_key = create_jwt_keys()
+        return {"rotated": True}
+
+
 @app.post("/anp/messages")
 async def anp_messages(
-    message: Dict[str, Any], authorization: Optional[str] = Header(None), request: Request = None
+    message: Dict[str, Any],
+    authorization: Optional[str] = Header(None),
+    request: Request = None,
+    response: Response = None,
 ):
     # Optional auth disable for symmetric baseline
     disable_auth = os.environ.get("ANP_DISABLE_AUTH", "false").lower() in ("1", "true", "yes")
@@ -149,10 +177,15 @@ async def anp_messages(
         try:
             # Use the request hostname (no port) as domain to match client header
             domain = request.url.hostname if request and request.url else "localhost"
-            _ = await app.state.verifier.verify_auth_header(authorization, domain=domain)
+            verified = await app.state.verifier.verify_auth_header(authorization, domain=domain)
         except Exception as e:
             raise HTTPException(status_code=getattr(e, "status_code", 401), detail=str(e))
+        # A DID-authenticated request is answered with an access token
+        # (ANP_TOKEN_TTL_S, default 1 h) for the client to send as Bearer next
+        if "access_token" in verified:
+            response.headers["Authorization"] = f"Bearer {verified['access_token']}"
 
+    await work.simulate()
     content = message.get("schema:text", {})
     response_content: Dict[str, Any]
     if isinstance(content, dict) and content.get("@type") == "anp:EchoRequest":
@@ -189,19 +222,14 @@ async def main():
     ssl_cert = os.environ.get("ANP_SSL_CERT")
     ssl_key = os.environ.get("ANP_SSL_KEY")
     use_ssl = bool(ssl_cert and ssl_key)
-    config = uvicorn.Config(
-        app=app,
+    await runtime.serve(
+        app,
         host=os.environ.get("ANP_HOST", "127.0.0.1"),
         port=int(os.environ.get("ANP_PORT", "8301")),
-        log_level="error",
         ssl_certfile=ssl_cert if use_ssl else None,
         ssl_keyfile=ssl_key if use_ssl else None,
     )
-    server = uvicorn.Server(config)
-    await server.serve()
 
 
 if __name__ == "__main__":
-    import asyncio
-
-    asyncio.run(main())
+    runtime.run(main)
@@ -0,0 +1,39 @@
+"""Safe ``notifications/cancelled`` handling for MCP and ACP servers.
+
+Both SDKs cancel a request by cancelling its scope and answering "Request
+cancelled" at once. They only survive that while the handler is awaiting:
+
+- a cancel that lands after the handler's last await resolved, but before
+  it resumes, lets the handler return normally, and the SDK then asserts
+  on the second response
+- a cancel that lands while the result is being sent raises out of the
+  request's scope, which the SDK does not suppress
+
+Either way the whole session ends. Hedged and deadline-bound clients
+(``clients.hedging``) cancel often enough to hit both.
+
+:func:`install` wraps the ``tools/call`` handler so a request stops being
+cancellable once it has its result, and delivers a cancel that arrived
+before that instead of returning.
+"""
+import importlib
+
+import anyio.lowlevel
+
+
+def install(srv) -> None:
+    """Guard ``srv``'s ``tools/call`` handler (MCP or ACP lowlevel server);
+    call after the handler and any other wrappers are registered."""
+    types = importlib.import_module(type(srv).__module__.split(".", 1)[0] + ".types")
+    handler = srv.request_handlers[types.CallToolRequest]
+
+    async def guarded(req):
+        result = await handler(req)
+        ctx = srv.request_context
+        # Too late to cancel: a later notifications/cancelled finds nothing
+        ctx.session._in_flight.pop(ctx.request_id, None)  # noqa: SLF001
+        # Raises if a cancel got in before that; otherwise returns at once
+        await anyio.lowlevel.checkpoint_if_cancelled()
+        return result
+
+    srv.request_handlers[types.CallToolRequest] = guarded
@@ -0,0 +1,342 @@
+"""HTTP body compression for the benchmark servers and clients.
+
+Servers (``servers.runtime.instrument``) install :class:`CompressionApp`
+when ``BENCH_COMPRESSION`` lists encodings in preference order, e.g.
+``gzip`` or ``zstd,br,gzip`` (``identity`` only decodes requests). Then:
+
+- responses at least ``BENCH_COMPRESSION_MIN_BYTES`` long (default 1024)
+  are compressed with the first listed encoding the client accepts, at
+  ``BENCH_COMPRESSION_LEVEL``; streamed responses (SSE) are compressed
+  chunk by chunk with a sync flush so every event is delivered at once
+- requests with a ``Content-Encoding`` body are decoded before the app
+  sees them
+- ``POST /_bench/compression?encodings=gzip&level=6&min_bytes=1024``
+  changes the settings at runtime (used by ``--test-compression``)
+
+Clients compress request bodies when ``BENCH_REQUEST_COMPRESSION`` names an
+encoding (see :func:`httpx_event_hooks`); httpx decodes responses itself.
+gzip uses zlib; ``br`` needs ``brotli`` and ``zstd`` needs ``zstandard``,
+the same packages httpx needs to decode them.
+"""
+import os
+import random
+import zlib
+from urllib.parse import parse_qs
+
+DEFAULT_LEVELS = {"gzip": 6, "br": 4, "zstd": 3}
+
+
+class Codec:
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def compress(self, data: bytes, level: int | None = None) -> bytes:
+        stream = self.stream(level)
+        return stream.compress(data) + stream.finish()
+
+    def stream(self, level: int | None = None) -> "_Stream":
+        level = DEFAULT_LEVELS[self.name] if level is None else level
+        if self.name == "gzip":
+            return _ZlibStream(level)
+        if self.name == "br":
+            return _BrotliStream(level)
+        return _ZstdStream(level)
+
+    def decompress(self, data: bytes) -> bytes:
+        if self.name == "gzip":
+            return zlib.decompress(data, 47)
+        if self.name == "br":
+            import brotli
+
+            return brotli.decompress(data)
+        import zstandard
+
+        # decompressobj handles frames written without a content size
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+
+
+class _Stream:
+    def compress(self, data: bytes) -> bytes:
+        raise NotImplementedError
+
+    def flush(self) -> bytes:
+        """Emit everything compressed so far without ending the stream."""
+        raise NotImplementedError
+
+    def finish(self) -> bytes:
+        raise NotImplementedError
+
+
+class _ZlibStream(_Stream):
+    def __init__(self, level: int) -> None:
+        # wbits 31: gzip container
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+class _BrotliStream(_Stream):
+    def __init__(self, level: int) -> None:
+        import brotli
+
+        self._obj = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.process(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush()
+
+    def finish(self) -> bytes:
+        return self._obj.finish()
+
+
+class _ZstdStream(_Stream):
+    def __init__(self, level: int) -> None:
+        import zstandard
+
+        self._flush_block = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush(self._flush_block)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+def available() -> list[str]:
+    names = ["gzip"]
+    for name, module in (("br", "brotli"), ("zstd", "zstandard")):
+        try:
+            __import__(module)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def codec(name: str) -> Codec:
+    if name not in DEFAULT_LEVELS:
+        raise ValueError(f"unknown encoding {name!r} (expected one of {', '.join(DEFAULT_LEVELS)})")
+    if name not in available():
+        package = "brotli" if name == "br" else "zstandard"
+        raise RuntimeError(f"{name} compression requires the {package} package")
+    return Codec(name)
+
+
+def parse_encodings(spec: str | None) -> list[str]:
+    """``gzip,br`` -> ``["gzip", "br"]``; ``identity``/empty -> ``[]``."""
+    names = [n.strip() for n in (spec or "").split(",") if n.strip() and n.strip() != "identity"]
+    for name in names:
+        codec(name)
+    return names
+
+
+def _accepted(accept_encoding: str) -> set[str]:
+    accepted = set()
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(name.strip().lower())
+    return accepted
+
+
+def _header(scope, name: bytes) -> str | None:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+class CompressionApp:
+    """ASGI wrapper that compresses responses and decodes compressed requests."""
+
+    def __init__(self, app, encodings: list[str], level: int | None = None, min_bytes: int = 1024) -> None:
+        self._app = app
+        self.configure(encodings, level, min_bytes)
+
+    @classmethod
+    def from_env(cls, app) -> "CompressionApp":
+        level = os.environ.get("BENCH_COMPRESSION_LEVEL")
+        return cls(
+            app,
+            parse_encodings(os.environ.get("BENCH_COMPRESSION")),
+            int(level) if level else None,
+            int(os.environ.get("BENCH_COMPRESSION_MIN_BYTES", "1024")),
+        )
+
+    def configure(self, encodings: list[str], level: int | None, min_bytes: int) -> None:
+        self.encodings = encodings
+        self.level = level
+        self.min_bytes = min_bytes
+        self._codecs = {name: codec(name) for name in encodings}
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self._app(scope, receive, send)
+            return
+        if scope["path"] == "/_bench/compression" and scope["method"] == "POST":
+            await self._handle_configure(scope, send)
+            return
+        request_encoding = _header(scope, b"content-encoding")
+        if request_encoding and request_encoding.lower() in DEFAULT_LEVELS:
+            scope, receive = await self._decoded_request(scope, receive, request_encoding.lower())
+        chosen = None
+        if self.encodings:
+            accepted = _accepted(_header(scope, b"accept-encoding") or "")
+            chosen = next((name for name in self.encodings if name in accepted), None)
+        if chosen is None:
+            await self._app(scope, receive, send)
+            return
+        await self._app(scope, receive, _CompressingSend(send, self._codecs[chosen], self.level, self.min_bytes).send)
+
+    async def _handle_configure(self, scope, send) -> None:
+        from servers.runtime import send_json
+
+        query = {k: v[0] for k, v in parse_qs(scope.get("query_string", b"").decode()).items()}
+        try:
+            self.configure(
+                parse_encodings(query.get("encodings")),
+                int(query["level"]) if query.get("level") else None,
+                int(query.get("min_bytes", self.min_bytes)),
+            )
+        except (ValueError, RuntimeError) as e:
+            await send_json(send, {"error": str(e)}, status=400)
+            return
+        await send_json(send, {"encodings": self.encodings, "level": self.level, "min_bytes": self.min_bytes})
+
+    async def _decoded_request(self, scope, receive, encoding: str):
+        body = bytearray()
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                break
+            body += message.get("body", b"")
+            if not message.get("more_body", False):
+                break
+        data = codec(encoding).decompress(bytes(body))
+        headers = [(k, v) for k, v in scope["headers"] if k not in (b"content-encoding", b"content-length")]
+        headers.append((b"content-length", str(len(data)).encode()))
+        sent = False
+
+        async def decoded_receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": data, "more_body": False}
+            return await receive()
+
+        return {**scope, "headers": headers}, decoded_receive
+
+
+class _CompressingSend:
+    def __init__(self, send, codec: Codec, level: int | None, min_bytes: int) -> None:
+        self._send = send
+        self._codec = codec
+        self._level = level
+        self._min_bytes = min_bytes
+        self._start: dict | None = None
+        self._stream: _Stream | None = None
+        self._passthrough = False
+
+    def _headers(self, compressed_length: int | None) -> list:
+        headers = [
+            (k, v) for k, v in self._start.get("headers", [])
+            if k.lower() not in (b"content-length", b"content-encoding")
+        ]
+        headers.append((b"content-encoding", self._codec.name.encode()))
+        headers.append((b"vary", b"Accept-Encoding"))
+        if compressed_length is not None:
+            headers.append((b"content-length", str(compressed_length).encode()))
+        return headers
+
+    async def send(self, message) -> None:
+        if message["type"] == "http.response.start":
+            if any(k.lower() == b"content-encoding" for k, _ in message.get("headers", [])):
+                self._passthrough = True
+                await self._send(message)
+            else:
+                # Held until the first body chunk shows whether it streams
+                self._start = message
+            return
+        if message["type"] != "http.response.body" or self._passthrough:
+            await self._send(message)
+            return
+        body = message.get("body", b"")
+        more = message.get("more_body", False)
+        if self._start is not None:
+            start, self._start = self._start, None
+            if not more and len(body) < self._min_bytes:
+                await self._send(start)
+                await self._send(message)
+                self._passthrough = True
+                return
+            self._start = start
+            if not more:
+                data = self._codec.compress(body, self._level)
+                await self._send({**start, "headers": self._headers(len(data))})
+                await self._send({"type": "http.response.body", "body": data})
+                self._start = None
+                return
+            self._stream = self._codec.stream(self._level)
+            await self._send({**start, "headers": self._headers(None)})
+            self._start = None
+        data = self._stream.compress(body) + (self._stream.flush() if more else self._stream.finish())
+        await self._send({"type": "http.response.body", "body": data, "more_body": more})
+
+
+async def _compress_request(request) -> None:
+    if "content-encoding" in request.headers:
+        return
+    encoding = os.environ.get("BENCH_REQUEST_COMPRESSION")
+    body = await request.aread()
+    if not encoding or len(body) < int(os.environ.get("BENCH_COMPRESSION_MIN_BYTES", "1024")):
+        return
+    import httpx
+
+    level = os.environ.get("BENCH_COMPRESSION_LEVEL")
+    data = codec(encoding).compress(body, int(level) if level else None)
+    request.headers["Content-Encoding"] = encoding
+    request.headers["Content-Length"] = str(len(data))
+    request.stream = httpx.ByteStream(data)
+
+
+def httpx_event_hooks(hooks: dict | None = None) -> dict:
+    """``hooks`` plus request-body compression when ``BENCH_REQUEST_COMPRESSION``
+    is set at client creation."""
+    hooks = {k: list(v) for k, v in (hooks or {}).items()}
+    if os.environ.get("BENCH_REQUEST_COMPRESSION"):
+        hooks.setdefault("request", []).append(_compress_request)
+    return hooks
+
+
+_WORDS = (
+    "agent tool call result context message task state artifact schema "
+    "request response stream event session token value error status input "
+    "output model user system content text data json protocol server client"
+).split()
+
+
+def sample_text(size: int, seed: int | str = 0) -> str:
+    """Word salad of ``size`` bytes: compresses like prose or JSON text,
+    unlike a run of one character."""
+    rng = random.Random(seed)
+    out: list[str] = []
+    length = 0
+    while length < size:
+        word = rng.choice(_WORDS) if rng.random() > 0.1 else str(rng.randint(0, 99999))
+        out.append(word)
+        length += len(word) + 1
+    return " ".join(out)[:size]
@@ -0,0 +1,30 @@
+"""Pre-encoded discovery documents served with strong ETags.
+
+Agent cards, DID documents and agent descriptions do not change while a
+server runs, so they are encoded once at startup and answered from bytes,
+with ``If-None-Match`` revalidation returning 304.
+"""
+import hashlib
+import json
+from starlette.requests import Request
+from starlette.responses import Response
+
+
+class CachedDocument:
+    def __init__(self, payload: dict, media_type: str = "application/json", max_age: int = 300) -> None:
+        self.body = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode()
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+        self.media_type = media_type
+        self.headers = {"ETag": self.etag, "Cache-Control": f"public, max-age={max_age}"}
+
+    def matches(self, if_none_match: str | None) -> bool:
+        if not if_none_match:
+            return False
+        # If-None-Match uses weak comparison, so W/"x" matches "x"
+        tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+        return "*" in tags or self.etag in tags
+
+    def response(self, request: Request) -> Response:
+        if self.matches(request.headers.get("if-none-match")):
+            return Response(status_code=304, headers=self.headers)
+        return Response(content=self.body, media_type=self.media_type, headers=self.headers)
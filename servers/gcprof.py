@@ -0,0 +1,184 @@
+"""GC pause and allocation profiling shared by the harness and the servers.
+
+Timestamps are ``time.perf_counter()`` seconds. On the platforms the harness
+supports that clock is system-wide monotonic, so GC pauses recorded inside a
+server process can be lined up with call windows recorded by the client.
+"""
+import bisect
+import gc
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+
+class GcMonitor:
+    """Records every collection as (start, end, generation, collected) via gc.callbacks."""
+
+    def __init__(self, max_pauses: int = 200_000) -> None:
+        self.pauses: list[tuple[float, float, int, int]] = []
+        self._max_pauses = max_pauses
+        self._t0 = 0.0
+
+    def _callback(self, phase: str, info: dict) -> None:
+        if phase == "start":
+            self._t0 = time.perf_counter()
+        elif len(self.pauses) < self._max_pauses:
+            self.pauses.append((self._t0, time.perf_counter(), info.get("generation", -1), info.get("collected", 0)))
+
+    def start(self) -> "GcMonitor":
+        if self._callback not in gc.callbacks:
+            gc.callbacks.append(self._callback)
+        return self
+
+    def stop(self) -> None:
+        if self._callback in gc.callbacks:
+            gc.callbacks.remove(self._callback)
+
+    def pauses_between(self, t_start: float, t_end: float) -> list[tuple[float, float, int, int]]:
+        return [p for p in self.pauses if p[1] >= t_start and p[0] <= t_end]
+
+
+def summarize_pauses(pauses) -> dict:
+    if not pauses:
+        return {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "p99_ms": 0.0, "by_generation": {}}
+    durations = np.array([(e - s) * 1000 for s, e, _, _ in pauses])
+    by_gen: dict[str, dict] = {}
+    for (s, e, g, collected) in pauses:
+        entry = by_gen.setdefault(str(g), {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "collected": 0})
+        entry["count"] += 1
+        entry["total_ms"] += (e - s) * 1000
+        entry["max_ms"] = max(entry["max_ms"], (e - s) * 1000)
+        entry["collected"] += collected
+    return {
+        "count": int(durations.size),
+        "total_ms": float(durations.sum()),
+        "max_ms": float(durations.max()),
+        "p99_ms": float(np.percentile(durations, 99)),
+        "by_generation": by_gen,
+    }
+
+
+def correlate(pauses, calls, outlier_percentile: float = 99.0) -> dict:
+    """Share of latency outliers whose call window overlaps a GC pause.
+
+    ``calls`` are (start, end) perf_counter pairs. Outliers are calls at or
+    above ``outlier_percentile`` of call duration; the same overlap rate for
+    the remaining calls is the baseline to compare against.
+    """
+    if not calls:
+        return {}
+    durations = np.array([(e - s) * 1000 for s, e in calls])
+    threshold = float(np.percentile(durations, outlier_percentile))
+    ordered = sorted(pauses)
+    starts = [p[0] for p in ordered]
+
+    def gc_ms_during(s: float, e: float) -> float:
+        # Pauses are short and sorted, so only those starting before the call
+        # ends (and shortly before it starts) can overlap
+        hi = bisect.bisect_right(starts, e)
+        total = 0.0
+        for p in ordered[max(0, bisect.bisect_left(starts, s) - 1):hi]:
+            overlap = min(e, p[1]) - max(s, p[0])
+            if overlap > 0:
+                total += overlap * 1000
+        return total
+
+    outliers = normal = outliers_gc = normal_gc = 0
+    outlier_gc_ms = 0.0
+    for (s, e), d in zip(calls, durations):
+        gc_ms = gc_ms_during(s, e)
+        if d >= threshold:
+            outliers += 1
+            outliers_gc += gc_ms > 0
+            outlier_gc_ms += gc_ms
+        else:
+            normal += 1
+            normal_gc += gc_ms > 0
+    return {
+        "outlier_threshold_ms": threshold,
+        "outliers": outliers,
+        "outliers_overlapping_gc": outliers_gc,
+        "outlier_gc_overlap_rate": outliers_gc / outliers if outliers else 0.0,
+        "baseline_gc_overlap_rate": normal_gc / normal if normal else 0.0,
+        "avg_gc_ms_in_outliers": outlier_gc_ms / outliers if outliers else 0.0,
+    }
+
+
+def _top_sites(snapshot, divisor: int, top: int) -> list[dict]:
+    return [
+        {
+            "site": str(stat.traceback[0]),
+            "bytes_per_call": stat.size / divisor,
+            "blocks_per_call": stat.count / divisor,
+        }
+        for stat in snapshot.statistics("filename")[:top]
+    ]
+
+
+async def sample_call_allocations(call, samples: int, top: int = 10) -> dict:
+    """Run ``call`` sequentially under tracemalloc and report per-call allocation.
+
+    ``peak_bytes`` is the transient high-water mark of one call; ``net_bytes``
+    and the top sites are what the calls left allocated. tracemalloc slows
+    every allocation down, so this runs as its own pass, never during timing.
+    """
+    peaks: list[float] = []
+    nets: list[float] = []
+    tracemalloc.start()
+    try:
+        for _ in range(samples):
+            cur0, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            await call()
+            cur1, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - cur0)
+            nets.append(cur1 - cur0)
+        snapshot = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    return {
+        "samples": samples,
+        "peak_bytes_per_call": {"avg": float(np.mean(peaks)), "p50": float(np.median(peaks)), "max": float(np.max(peaks))},
+        "net_bytes_per_call": {"avg": float(np.mean(nets)), "max": float(np.max(nets))},
+        "top_sites": _top_sites(snapshot, samples, top),
+    }
+
+
+class AllocWindow:
+    """Server-side tracemalloc window opened and closed by the harness."""
+
+    def __init__(self) -> None:
+        self._t0 = 0.0
+        self._blocks0 = 0
+
+    def start(self) -> None:
+        tracemalloc.start()
+        self._t0 = time.perf_counter()
+        self._blocks0 = sys.getallocatedblocks()
+
+    def stop(self, calls: int, top: int = 10) -> dict:
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        calls = max(1, calls)
+        return {
+            "window_s": time.perf_counter() - self._t0,
+            "calls": calls,
+            "peak_bytes": peak,
+            "net_bytes_per_call": current / calls,
+            "net_blocks_per_call": (sys.getallocatedblocks() - self._blocks0) / calls,
+            "top_sites": _top_sites(snapshot, calls, top),
+        }
+
+
+MONITOR: GcMonitor | None = None
+
+
+def install() -> GcMonitor:
+    """Start the process-wide GC monitor (idempotent)."""
+    global MONITOR
+    if MONITOR is None:
+        MONITOR = GcMonitor().start()
+    return MONITOR
@@ -2,9 +2,12 @@
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.types import Tool, TextContent
-import anyio
+from servers import tracing
+from servers import admission, cancellation, runtime, work
+from servers.tool_catalog import ToolCatalog
 
 srv = Server("mcp-echo")
+catalog = ToolCatalog()
 
 @srv.list_tools()
 async def list_tools() -> list[Tool]:
@@ -32,24 +35,35 @@ async def list_tools() -> list[Tool]:
                 "required": ["a", "b"]
             }
         )
-    ]
+    ] + catalog.synthetic_tools()
 
-@srv.call_tool()
+catalog.install(srv, list_tools)
+
+@srv.call_tool(validate_input=not catalog.cached)
 async def call_tool(name: str, arguments: dict) -> list[TextContent]:
-    if name == "echo":
-        result = arguments.get("message", "")
-        return [TextContent(type="text", text=result)]
-    elif name == "add":
-        a = arguments.get("a", 0)
-        b = arguments.get("b", 0)
-        result = str(a + b)
-        return [TextContent(type="text", text=result)]
-    else:
-        raise ValueError(f"Unknown tool: {name}")
+    with tracing.span(f"tools/call {name}", "server", tracing.meta_traceparent(srv.request_context.meta)):
+        await work.simulate()
+        if catalog.cached:
+            catalog.validate(name, arguments)
+        if name == "echo":
+            result = arguments.get("message", "")
+            return [TextContent(type="text", text=result)]
+        elif name == "add":
+            a = arguments.get("a", 0)
+            b = arguments.get("b", 0)
+            result = str(a + b)
+            return [TextContent(type="text", text=result)]
+        elif catalog.is_synthetic(name):
+            return [TextContent(type="text", text=str(arguments.get("field_0", "")))]
+        else:
+            raise ValueError(f"Unknown tool: {name}")
+
+admission.install(srv)
+cancellation.install(srv)
 
 async def main():
     async with stdio_server() as (read, write):
         await srv.run(read, write, srv.create_initialization_options())
 
 if __name__ == "__main__":
-    anyio.run(main)
+    runtime.run(main)
@@ -1,14 +1,17 @@
+import os
 from starlette.applications import Starlette
 from starlette.routing import Route, Mount
-from starlette.responses import Response
-import uvicorn
-import anyio
+from starlette.responses import Response, JSONResponse
 from mcp.server import Server
 from mcp.server.sse import SseServerTransport
 from mcp.types import Tool, TextContent
+from servers import tracing
+from servers import admission, cancellation, runtime, sse_stats, work
+from servers.tool_catalog import ToolCatalog
 
 
 srv = Server("mcp-echo-sse")
+catalog = ToolCatalog()
 
 
 @srv.list_tools()
@@ -35,43 +38,68 @@ async def list_tools() -> list[Tool]:
                 "required": ["a", "b"],
             },
         ),
-    ]
+    ] + catalog.synthetic_tools()
+
+
+catalog.install(srv, list_tools)
 
 
-@srv.call_tool()
+@srv.call_tool(validate_input=not catalog.cached)
 async def call_tool(name: str, arguments: dict) -> list[TextContent]:
-    if name == "echo":
-        msg = arguments.get("message", "")
-        return [TextContent(type="text", text=str(msg))]
-    if name == "add":
-        a = int(arguments.get("a", 0))
-        b = int(arguments.get("b", 0))
-        return [TextContent(type="text", text=str(a + b))]
-    raise ValueError(f"Unknown tool: {name}")
+    with tracing.span(f"tools/call {name}", "server", tracing.meta_traceparent(srv.request_context.meta)):
+        await work.simulate()
+        if catalog.cached:
+            catalog.validate(name, arguments)
+        if name == "echo":
+            msg = arguments.get("message", "")
+            return [TextContent(type="text", text=str(msg))]
+        if name == "add":
+            a = int(arguments.get("a", 0))
+            b = int(arguments.get("b", 0))
+            return [TextContent(type="text", text=str(a + b))]
+        if catalog.is_synthetic(name):
+            return [TextContent(type="text", text=str(arguments.get("field_0", "")))]
+        raise ValueError(f"Unknown tool: {name}")
+
+
+admission.install(srv)
+cancellation.install(srv)
 
 
 def create_app() -> Starlette:
     sse = SseServerTransport("/mcp/messages/")
+    track_sse = sse_stats.enabled()
 
     async def handle_sse(request):  # type: ignore[override]
         async with sse.connect_sse(request.scope, request.receive, request._send) as streams:  # noqa: SLF001
-            await srv.run(streams[0], streams[1], srv.create_initialization_options())
+            write_stream = streams[1]
+            if track_sse:
+                # Count responses blocked behind a consumer that is not reading
+                write_stream = sse_stats.CountingSendStream(write_stream, sse_stats.STATS)
+                sse_stats.STATS.stream_opened()
+            try:
+                await srv.run(streams[0], write_stream, srv.create_initialization_options())
+            finally:
+                if track_sse:
+                    sse_stats.STATS.stream_closed()
         return Response()
 
+    async def handle_sse_stats(request):  # type: ignore[override]
+        return JSONResponse(sse_stats.STATS.snapshot())
+
     routes = [
         Route("/mcp/sse", endpoint=handle_sse, methods=["GET"]),
         Mount("/mcp/messages/", app=sse.handle_post_message),
     ]
+    if track_sse:
+        routes.append(Route("/mcp/debug/sse-stats", endpoint=handle_sse_stats, methods=["GET"]))
     return Starlette(routes=routes)
 
 
 async def main():
-    app = create_app()
-    config = uvicorn.Config(app=app, host="127.0.0.1", port=8001, log_level="error")
-    server = uvicorn.Server(config)
-    await server.serve()
+    await runtime.serve(create_app(), host="127.0.0.1", port=int(os.environ.get("MCP_PORT", "8001")))
 
 
 if __name__ == "__main__":
-    anyio.run(main)
+    runtime.run(main)
 
@@ -0,0 +1,152 @@
+"""Live metrics in Prometheus text format for the harness and the servers.
+
+The harness records every call into ``REGISTRY`` (when ``--metrics-port`` is
+set) and serves it at ``http://127.0.0.1:<port>/metrics``; HTTP servers do
+the same for incoming requests at ``/_bench/metrics`` with BENCH_METRICS.
+Histograms are cumulative, as Prometheus expects; the ``*_latency_seconds``
+summaries are quantiles over a rolling window so p99 drift is visible with
+plain ``curl``. No client library is needed.
+"""
+import asyncio
+import bisect
+import collections
+import threading
+import time
+
+# Seconds; spans sub-millisecond local calls up to multi-second stalls
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+def _labels(names: tuple[str, ...], values: tuple, **extra) -> str:
+    pairs = list(zip(names, values)) + list(extra.items())
+    return "{" + ",".join(f'{n}="{v}"' for n, v in pairs) + "}" if pairs else ""
+
+
+class _Series:
+    def __init__(self) -> None:
+        self.bucket_counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.window: collections.deque[tuple[float, float]] = collections.deque()
+
+    def trim(self, cutoff: float) -> None:
+        while self.window and self.window[0][0] < cutoff:
+            self.window.popleft()
+
+
+class Registry:
+    """Counters, cumulative histograms and rolling-window quantiles keyed by
+    a fixed label set. Thread-safe, since servers may observe from pool
+    threads."""
+
+    def __init__(self, prefix: str, labels: tuple[str, ...], window_s: float = 60.0) -> None:
+        self.prefix = prefix
+        self.labels = labels
+        self.window_s = window_s
+        self._series: dict[tuple, _Series] = {}
+        self._outcomes: collections.Counter[tuple] = collections.Counter()
+        self._lock = threading.Lock()
+        self._started = time.time()
+
+    def observe(self, label_values: tuple, seconds: float, outcome: str = "ok") -> None:
+        now = time.monotonic()
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = _Series()
+            idx = bisect.bisect_left(BUCKETS, seconds)
+            if idx < len(BUCKETS):
+                series.bucket_counts[idx] += 1
+            series.count += 1
+            series.sum += seconds
+            series.window.append((now, seconds))
+            # Trimmed here too, so an unscraped registry holds one window
+            series.trim(now - self.window_s)
+            self._outcomes[label_values + (outcome,)] += 1
+
+    def render(self) -> str:
+        now = time.monotonic()
+        p = self.prefix
+        lines = [
+            f"# HELP {p}_total Completed operations by outcome.",
+            f"# TYPE {p}_total counter",
+        ]
+        with self._lock:
+            for key, count in sorted(self._outcomes.items()):
+                lines.append(f"{p}_total{_labels(self.labels + ('outcome',), key)} {count}")
+            lines += [
+                f"# HELP {p}_duration_seconds Operation duration since start.",
+                f"# TYPE {p}_duration_seconds histogram",
+            ]
+            for key, s in sorted(self._series.items()):
+                cumulative = 0
+                for bound, n in zip(BUCKETS, s.bucket_counts):
+                    cumulative += n
+                    lines.append(f"{p}_duration_seconds_bucket{_labels(self.labels, key, le=bound)} {cumulative}")
+                lines.append(f"{p}_duration_seconds_bucket{_labels(self.labels, key, le='+Inf')} {s.count}")
+                lines.append(f"{p}_duration_seconds_sum{_labels(self.labels, key)} {s.sum}")
+                lines.append(f"{p}_duration_seconds_count{_labels(self.labels, key)} {s.count}")
+            lines += [
+                f"# HELP {p}_latency_seconds Operation duration quantiles over the last {self.window_s:g} s.",
+                f"# TYPE {p}_latency_seconds summary",
+            ]
+            for key, s in sorted(self._series.items()):
+                s.trim(now - self.window_s)
+                values = sorted(v for _, v in s.window)
+                for q in QUANTILES:
+                    value = values[min(len(values) - 1, int(q * len(values)))] if values else float("nan")
+                    lines.append(f"{p}_latency_seconds{_labels(self.labels, key, quantile=q)} {value}")
+                lines.append(f"{p}_latency_seconds_count{_labels(self.labels, key)} {len(values)}")
+        lines += [
+            f"# HELP {p}_start_time_seconds Unix time the registry was created.",
+            f"# TYPE {p}_start_time_seconds gauge",
+            f"{p}_start_time_seconds {self._started}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+REGISTRY: Registry | None = None
+
+
+def install(window_s: float = 60.0) -> Registry:
+    """Create the harness registry (idempotent)."""
+    global REGISTRY
+    if REGISTRY is None:
+        REGISTRY = Registry("bench_client_calls", ("protocol", "operation"), window_s)
+    return REGISTRY
+
+
+def observe(protocol: str, operation: str, ms: float, ok: bool) -> None:
+    """Record one harness call; a no-op unless :func:`install` was called."""
+    if REGISTRY is not None:
+        REGISTRY.observe((protocol, operation), ms / 1000, "ok" if ok else "error")
+
+
+async def start_server(registry: Registry, host: str = "127.0.0.1", port: int = 9464) -> asyncio.base_events.Server:
+    """Serve ``GET /metrics`` on a bare asyncio server (no web framework in
+    the load generator's loop)."""
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            path = request_line.split()[1].decode() if len(request_line.split()) > 1 else "/"
+            if path.split("?", 1)[0] == "/metrics":
+                status, content_type, body = "200 OK", CONTENT_TYPE, registry.render().encode()
+            else:
+                status, content_type, body = "404 Not Found", "text/plain", b"not found\n"
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\nContent-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except (OSError, IndexError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
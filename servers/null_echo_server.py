@@ -0,0 +1,35 @@
+"""Raw TCP echo server for the harness floor (the "null" protocol).
+
+Every newline-terminated line received is written back unchanged: no HTTP,
+no JSON, no SDK. A call against it costs the harness, one loopback round
+trip and the event-loop wakeups on both ends, which is the least any
+networked protocol can cost.
+"""
+import asyncio
+import os
+
+from servers import runtime
+
+# Lines are whole payloads; allow up to the largest --payload-bytes in use
+LINE_LIMIT = 64 * 1024 * 1024
+
+
+async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        while line := await reader.readline():
+            writer.write(line)
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def main():
+    server = await asyncio.start_server(handle, "127.0.0.1", int(os.environ.get("NULL_PORT", "8401")), limit=LINE_LIMIT)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    runtime.run(main)
@@ -0,0 +1,283 @@
+"""Process entry helpers shared by the benchmark servers and the harness.
+
+Settings are read from BENCH_* environment variables so the harness can
+configure every server it spawns, including stdio servers started by the
+SDK clients, without per-server command-line flags.
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+from urllib.parse import parse_qs
+
+LOOPS = ("asyncio", "uvloop")
+
+
+def _env_flag(name: str) -> bool:
+    return os.environ.get(name, "false").lower() in ("1", "true", "yes")
+
+
+def selected_loop() -> str:
+    loop = os.environ.get("BENCH_LOOP", "asyncio").lower()
+    if loop not in LOOPS:
+        raise ValueError(f"BENCH_LOOP must be one of {LOOPS}, got {loop!r}")
+    return loop
+
+
+def scheme() -> str:
+    """URL scheme the HTTP servers listen with (https when BENCH_TLS_CERT is set)."""
+    return "https" if os.environ.get("BENCH_TLS_CERT") else "http"
+
+
+def stdio_server_env(default_env: dict[str, str]) -> dict[str, str]:
+    """Environment for a stdio server spawned by an SDK client: the SDK's
+    minimal ``default_env`` plus the harness's BENCH_* settings, so stdio
+    servers match the harness-spawned HTTP servers.
+
+    BENCH_PROFILE is left out: stdio servers have no control endpoint and
+    are profiled for their lifetime instead (see :func:`run`).
+    """
+    env = dict(default_env)
+    env.update({k: v for k, v in os.environ.items() if k.startswith("BENCH_") and k != "BENCH_PROFILE"})
+    return env
+
+
+def run(main) -> None:
+    """Run the coroutine function ``main`` on the loop selected by BENCH_LOOP."""
+    if _env_flag("BENCH_GC_PROFILE"):
+        from servers import gcprof
+
+        gcprof.install()
+    # Processes without a control endpoint (stdio servers) are profiled for
+    # their whole lifetime when BENCH_PROFILE_DIR is set. HTTP servers get
+    # BENCH_PROFILE and sample per window through /_bench/profile instead:
+    # a second sampler would share SIGPROF with it, and its stop() resets
+    # the handler under the lifetime one
+    lifetime_sampler = None
+    profile_dir = os.environ.get("BENCH_PROFILE_DIR")
+    if profile_dir and not _env_flag("BENCH_PROFILE"):
+        from servers import sampler
+
+        if sampler.available():
+            lifetime_sampler = sampler.StackSampler(float(os.environ.get("BENCH_PROFILE_INTERVAL_S", "0.005"))).start()
+    try:
+        if selected_loop() == "uvloop":
+            try:
+                import uvloop
+            except ImportError as e:
+                raise RuntimeError("BENCH_LOOP=uvloop requires the uvloop package") from e
+            uvloop.run(main())
+        else:
+            asyncio.run(main())
+    finally:
+        if lifetime_sampler is not None:
+            lifetime_sampler.stop()
+            name = getattr(sys.modules["__main__"].__spec__, "name", "server").rsplit(".", 1)[-1]
+            lifetime_sampler.write(os.path.join(profile_dir, f"{name}_{os.getpid()}"), name)
+
+
+async def send_json(send, payload, status: int = 200) -> None:
+    body = json.dumps(payload).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class BenchControlApp:
+    """ASGI wrapper exposing harness control endpoints under /_bench/.
+
+    With BENCH_GC_PROFILE:
+    - ``GET /_bench/gc?since=T&until=T`` returns pauses recorded in the window
+    - ``POST /_bench/alloc/start`` opens a tracemalloc window
+    - ``POST /_bench/alloc/stop?calls=N`` closes it and reports per-call figures
+
+    With BENCH_PROFILE:
+    - ``POST /_bench/profile/start`` starts the sampling profiler
+    - ``POST /_bench/profile/stop?stem=PATH&name=NAME`` stops it and writes
+      ``PATH.collapsed`` and ``PATH.speedscope.json``
+
+    With BENCH_METRICS:
+    - every other request is counted and timed by method, path and status
+    - ``GET /_bench/metrics`` returns them in Prometheus text format. Streams
+      (SSE) are timed until they close, so they land in the top buckets.
+
+    Other /_bench/ paths are passed to the wrapped app.
+    """
+
+    def __init__(self, app, gc_profile: bool = False, profile: bool = False, metrics: bool = False) -> None:
+        self._app = app
+        self._gc_profile = gc_profile
+        self._profile = profile
+        self._window = None
+        self._sampler = None
+        self._metrics = None
+        if metrics:
+            from servers.metrics import Registry
+
+            self._metrics = Registry(
+                "bench_server_requests",
+                ("method", "path", "status"),
+                float(os.environ.get("BENCH_METRICS_WINDOW_S", "60")),
+            )
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith("/_bench/"):
+            if self._metrics is not None and scope["type"] == "http":
+                await self._timed(scope, receive, send)
+            else:
+                await self._app(scope, receive, send)
+            return
+        query = {k: v[0] for k, v in parse_qs(scope.get("query_string", b"").decode()).items()}
+        path = scope["path"]
+        if self._metrics is not None and path == "/_bench/metrics":
+            await self._handle_metrics(send)
+        elif self._gc_profile and path.startswith(("/_bench/gc", "/_bench/alloc/")):
+            await self._handle_gc(path, query, send)
+        elif self._profile and path.startswith("/_bench/profile/"):
+            await self._handle_profile(path, query, send)
+        else:
+            await self._app(scope, receive, send)
+
+    async def _timed(self, scope, receive, send) -> None:
+        status = 500
+
+        async def send_with_status(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        t0 = time.perf_counter()
+        try:
+            await self._app(scope, receive, send_with_status)
+        finally:
+            self._metrics.observe(
+                (scope["method"], scope["path"], status),
+                time.perf_counter() - t0,
+                "ok" if status < 500 else "error",
+            )
+
+    async def _handle_metrics(self, send) -> None:
+        from servers.metrics import CONTENT_TYPE
+
+        body = self._metrics.render().encode()
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", CONTENT_TYPE.encode()), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def _handle_gc(self, path: str, query: dict, send) -> None:
+        from servers import gcprof
+
+        if path == "/_bench/gc":
+            since = float(query.get("since", "0"))
+            until = float(query.get("until", "inf"))
+            await send_json(send, {"pauses": gcprof.install().pauses_between(since, until)})
+        elif path == "/_bench/alloc/start":
+            self._window = gcprof.AllocWindow()
+            self._window.start()
+            await send_json(send, {"ok": True})
+        elif path == "/_bench/alloc/stop" and self._window is not None:
+            report = self._window.stop(int(query.get("calls", "1")))
+            self._window = None
+            await send_json(send, report)
+        else:
+            await send_json(send, {"error": "not found"}, status=404)
+
+    async def _handle_profile(self, path: str, query: dict, send) -> None:
+        from servers import sampler
+
+        if path == "/_bench/profile/start":
+            if self._sampler is not None:
+                self._sampler.stop()
+            self._sampler = sampler.StackSampler(float(os.environ.get("BENCH_PROFILE_INTERVAL_S", "0.005"))).start()
+            await send_json(send, {"ok": True})
+        elif path == "/_bench/profile/stop" and self._sampler is not None:
+            self._sampler.stop()
+            report = self._sampler.write(query["stem"], query.get("name", "server"))
+            self._sampler = None
+            await send_json(send, report)
+        else:
+            await send_json(send, {"error": "not found"}, status=404)
+
+
+class TraceApp:
+    """ASGI wrapper recording a server span for HTTP requests that carry a
+    sampled ``traceparent`` header (BENCH_TRACE_DIR). Handlers awaited in
+    the request task see it as their current span."""
+
+    def __init__(self, app) -> None:
+        from servers import tracing
+
+        self._app = app
+        self._tracing = tracing
+
+    async def __call__(self, scope, receive, send) -> None:
+        traceparent = None
+        if scope["type"] == "http":
+            for name, value in scope["headers"]:
+                if name == b"traceparent":
+                    traceparent = value.decode("latin-1")
+                    break
+        if traceparent is None:
+            await self._app(scope, receive, send)
+            return
+        with self._tracing.span(
+            f"{scope['method']} {scope['path']}", "server", traceparent, **{"http.method": scope["method"]}
+        ) as span:
+
+            async def send_with_status(message) -> None:
+                if span is not None and message["type"] == "http.response.start":
+                    span.attributes["http.status_code"] = message["status"]
+                await send(message)
+
+            await self._app(scope, receive, send_with_status)
+
+
+def instrument(app):
+    """Wrap an ASGI app with the optional BENCH_* instrumentation layers."""
+    gc_profile = _env_flag("BENCH_GC_PROFILE")
+    profile = _env_flag("BENCH_PROFILE")
+    metrics = _env_flag("BENCH_METRICS")
+    if os.environ.get("BENCH_COMPRESSION"):
+        from servers.compression import CompressionApp
+
+        # Innermost, so server timings and spans include the codec
+        app = CompressionApp.from_env(app)
+    from servers import admission
+
+    if admission.GATE is not None:
+        # Outside the codec so rejections stay cheap; inside tracing and
+        # metrics so they are counted
+        app = admission.AdmissionApp(app, admission.GATE)
+    if os.environ.get("BENCH_TRACE_DIR"):
+        app = TraceApp(app)
+    if gc_profile or profile or metrics:
+        app = BenchControlApp(app, gc_profile=gc_profile, profile=profile, metrics=metrics)
+    return app
+
+
+async def serve(app, host: str = "127.0.0.1", port: int = 8000, **config) -> None:
+    """Serve ``app`` with uvicorn after applying :func:`instrument`.
+
+    ``BENCH_KEEPALIVE_S`` overrides the idle keep-alive timeout;
+    ``BENCH_TLS_CERT``/``BENCH_TLS_KEY`` serve over TLS unless the caller
+    passed its own certificate.
+    """
+    import uvicorn
+
+    config.setdefault("log_level", "error")
+    if os.environ.get("BENCH_KEEPALIVE_S"):
+        # uvicorn closes idle keep-alive connections after 5 s by default
+        config.setdefault("timeout_keep_alive", int(os.environ["BENCH_KEEPALIVE_S"]))
+    if os.environ.get("BENCH_TLS_CERT") and not config.get("ssl_certfile"):
+        config["ssl_certfile"] = os.environ["BENCH_TLS_CERT"]
+        config["ssl_keyfile"] = os.environ["BENCH_TLS_KEY"]
+    server = uvicorn.Server(uvicorn.Config(app=instrument(app), host=host, port=port, **config))
+    await server.serve()
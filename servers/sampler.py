@@ -0,0 +1,92 @@
+"""Signal-based sampling CPU profiler writing collapsed stacks and speedscope files.
+
+``ITIMER_PROF`` fires on process CPU time, so idle waits in the event loop
+are not sampled and the overhead scales with how busy the process is. The
+handler runs on the main thread, which is where every asyncio client and
+server in this repo does its work. POSIX only; ``available()`` is False on
+Windows.
+"""
+import collections
+import json
+import os
+import signal
+
+
+def available() -> bool:
+    return hasattr(signal, "setitimer") and hasattr(signal, "SIGPROF")
+
+
+def _frame_name(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    def __init__(self, interval_s: float = 0.005) -> None:
+        self._interval = interval_s
+        self.counts: collections.Counter[str] = collections.Counter()
+        self._running = False
+
+    def _handler(self, signum, frame) -> None:
+        stack = []
+        while frame is not None:
+            stack.append(_frame_name(frame.f_code))
+            frame = frame.f_back
+        self.counts[";".join(reversed(stack))] += 1
+
+    def start(self) -> "StackSampler":
+        if not available():
+            raise RuntimeError("signal-based sampling needs setitimer/SIGPROF (POSIX)")
+        self.counts.clear()
+        signal.signal(signal.SIGPROF, self._handler)
+        signal.setitimer(signal.ITIMER_PROF, self._interval, self._interval)
+        self._running = True
+        return self
+
+    def stop(self) -> None:
+        if self._running:
+            signal.setitimer(signal.ITIMER_PROF, 0, 0)
+            signal.signal(signal.SIGPROF, signal.SIG_DFL)
+            self._running = False
+
+    def write(self, path_stem: str, name: str) -> dict:
+        """Write ``<stem>.collapsed`` and ``<stem>.speedscope.json``; returns their paths."""
+        os.makedirs(os.path.dirname(path_stem) or ".", exist_ok=True)
+        collapsed = f"{path_stem}.collapsed"
+        with open(collapsed, "w") as f:
+            for stack, count in self.counts.most_common():
+                f.write(f"{stack} {count}\n")
+        speedscope = f"{path_stem}.speedscope.json"
+        with open(speedscope, "w") as f:
+            json.dump(to_speedscope(self.counts, name), f)
+        return {"samples": sum(self.counts.values()), "collapsed": collapsed, "speedscope": speedscope}
+
+
+def to_speedscope(counts, name: str) -> dict:
+    frames: list[dict] = []
+    index: dict[str, int] = {}
+    samples: list[list[int]] = []
+    weights: list[int] = []
+    for stack, count in counts.items():
+        ids = []
+        for frame in stack.split(";"):
+            if frame not in index:
+                index[frame] = len(frames)
+                frames.append({"name": frame})
+            ids.append(index[frame])
+        samples.append(ids)
+        weights.append(count)
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "agent-protocol-bench",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": name,
+            "unit": "none",
+            "startValue": 0,
+            "endValue": sum(weights),
+            "samples": samples,
+            "weights": weights,
+        }],
+    }
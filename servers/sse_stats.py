@@ -0,0 +1,85 @@
+"""SSE stream accounting used by the slow-consumer benchmark.
+
+Enabled with BENCH_SSE_STATS=1 so default runs keep the plain send path.
+Counts open streams and events that a server has produced but not yet
+handed to the transport because the consumer is not reading.
+"""
+import os
+import time
+
+
+def enabled() -> bool:
+    return os.environ.get("BENCH_SSE_STATS", "false").lower() in ("1", "true", "yes")
+
+
+class SseStats:
+    def __init__(self) -> None:
+        self.active_streams = 0
+        self.total_streams = 0
+        self.pending_events = 0
+        self.max_pending_events = 0
+        self.sent_events = 0
+        self.max_send_wait_ms = 0.0
+
+    def stream_opened(self) -> None:
+        self.active_streams += 1
+        self.total_streams += 1
+
+    def stream_closed(self) -> None:
+        self.active_streams -= 1
+
+    def event_queued(self) -> None:
+        self.pending_events += 1
+        if self.pending_events > self.max_pending_events:
+            self.max_pending_events = self.pending_events
+
+    def event_sent(self, wait_ms: float) -> None:
+        self.pending_events -= 1
+        self.sent_events += 1
+        if wait_ms > self.max_send_wait_ms:
+            self.max_send_wait_ms = wait_ms
+
+    def snapshot(self) -> dict:
+        return {
+            "active_streams": self.active_streams,
+            "total_streams": self.total_streams,
+            "pending_events": self.pending_events,
+            "max_pending_events": self.max_pending_events,
+            "sent_events": self.sent_events,
+            "max_send_wait_ms": self.max_send_wait_ms,
+        }
+
+
+class CountingSendStream:
+    """Wraps an anyio send stream and counts sends blocked on the consumer."""
+
+    def __init__(self, inner, stats: SseStats) -> None:
+        self._inner = inner
+        self._stats = stats
+
+    async def send(self, item) -> None:
+        self._stats.event_queued()
+        t0 = time.perf_counter()
+        try:
+            await self._inner.send(item)
+        finally:
+            self._stats.event_sent((time.perf_counter() - t0) * 1000)
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+    def close(self) -> None:
+        self._inner.close()
+
+    async def __aenter__(self):
+        await self._inner.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        return await self._inner.__aexit__(*exc)
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+
+STATS = SseStats()
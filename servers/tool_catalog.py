@@ -0,0 +1,102 @@
+"""Synthetic MCP tool catalogs for the tool-discovery scaling benchmark.
+
+Configured through environment variables so the stdio servers spawned by
+the SDK clients pick them up as well:
+
+- ``BENCH_MCP_SYNTH_TOOLS``: number of synthetic tools added next to
+  ``echo``/``add`` (default 0)
+- ``BENCH_MCP_TOOL_SCHEMA_BYTES``: approximate JSON size of each synthetic
+  tool's input schema (default 1024)
+- ``BENCH_MCP_TOOL_LIST_CACHE``: build the ``tools/list`` result and the
+  input validators once instead of per request
+
+Synthetic tools echo their ``field_0`` argument.
+"""
+import json
+import os
+import jsonschema
+from mcp import types
+from mcp.server import Server
+
+SYNTH_PREFIX = "synth_"
+
+
+def _env_flag(name: str) -> bool:
+    return os.environ.get(name, "false").lower() in ("1", "true", "yes")
+
+
+def _schema_properties(schema_bytes: int) -> dict:
+    properties: dict = {}
+    size = 2
+    i = 0
+    while size < schema_bytes or not properties:
+        spec = {
+            "type": "string",
+            "description": f"Synthetic parameter {i}; free text that pads the schema to a realistic size",
+        }
+        properties[f"field_{i}"] = spec
+        size += len(json.dumps({f"field_{i}": spec})) - 1
+        i += 1
+    return properties
+
+
+class ToolCatalog:
+    def __init__(self) -> None:
+        self.synthetic_count = int(os.environ.get("BENCH_MCP_SYNTH_TOOLS", "0"))
+        self.schema_bytes = int(os.environ.get("BENCH_MCP_TOOL_SCHEMA_BYTES", "1024"))
+        self.cached = _env_flag("BENCH_MCP_TOOL_LIST_CACHE")
+        self._properties = _schema_properties(self.schema_bytes) if self.synthetic_count else {}
+        self._validators: dict[str, jsonschema.protocols.Validator] = {}
+
+    def synthetic_tools(self) -> list[types.Tool]:
+        """Build the synthetic tools; called per request unless cached."""
+        return [
+            types.Tool(
+                name=f"{SYNTH_PREFIX}{i:05d}",
+                description=f"Synthetic tool {i} for catalog scaling measurements",
+                inputSchema={"type": "object", "properties": self._properties, "required": ["field_0"]},
+            )
+            for i in range(self.synthetic_count)
+        ]
+
+    @staticmethod
+    def is_synthetic(name: str) -> bool:
+        return name.startswith(SYNTH_PREFIX)
+
+    def install(self, srv: Server, list_tools) -> None:
+        """With caching on, answer ``tools/list`` from a result built on the
+        first request and keep one compiled validator per tool.
+
+        ``list_tools`` is the server's decorated list function. The SDK still
+        serializes the cached result for every response.
+        """
+        if not self.cached:
+            return
+        result: types.ServerResult | None = None
+
+        async def handler(_):
+            nonlocal result
+            if result is None:
+                tools = await list_tools()
+                # Keep the SDK's name -> Tool map populated, as its own
+                # list handler does, for call_tool's definition lookup
+                srv._tool_cache = {t.name: t for t in tools}  # noqa: SLF001
+                self._validators = {
+                    t.name: jsonschema.validators.validator_for(t.inputSchema)(t.inputSchema) for t in tools
+                }
+                result = types.ServerResult(types.ListToolsResult(tools=tools))
+            return result
+
+        srv.request_handlers[types.ListToolsRequest] = handler
+
+    def validate(self, name: str, arguments: dict) -> None:
+        """Validate with the cached validator (servers register call_tool with
+        ``validate_input=not catalog.cached``, so this replaces the SDK's
+        per-call ``jsonschema.validate``)."""
+        validator = self._validators.get(name)
+        if validator is None:
+            return
+        try:
+            validator.validate(arguments)
+        except jsonschema.ValidationError as e:
+            raise ValueError(f"Input validation error: {e.message}") from e
@@ -0,0 +1,190 @@
+"""Minimal W3C trace-context propagation with a local JSON-lines span exporter.
+
+Spans follow the OpenTelemetry data model (trace/span/parent ids, kind,
+start/end in Unix nanoseconds, attributes) without depending on the
+OpenTelemetry SDK. Context travels as a ``traceparent`` header for HTTP
+(A2A, ANP) and as ``params._meta.traceparent`` for MCP/ACP JSON-RPC.
+
+Servers export spans when ``BENCH_TRACE_DIR`` is set; the harness calls
+:func:`install`. Each process appends to ``<dir>/<service>_<pid>.jsonl``
+with one line-buffered write per span, like a synchronous (simple) span
+processor. A server only records a span when the request carries a sampled
+``traceparent``, so untraced calls cost a header or ``_meta`` lookup.
+"""
+import contextlib
+import contextvars
+import importlib
+import json
+import os
+import pathlib
+import secrets
+import sys
+import time
+from dataclasses import dataclass, field
+
+_CURRENT: contextvars.ContextVar["Span | None"] = contextvars.ContextVar("bench_span", default=None)
+
+
+def format_traceparent(trace_id: str, span_id: str, sampled: bool = True) -> str:
+    return f"00-{trace_id}-{span_id}-{'01' if sampled else '00'}"
+
+
+def parse_traceparent(value: str | None) -> tuple[str, str] | None:
+    """``(trace_id, parent_span_id)`` for a valid, sampled header, else None."""
+    if not value:
+        return None
+    parts = value.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16 or len(parts[3]) != 2:
+        return None
+    try:
+        sampled = int(parts[3], 16) & 1
+    except ValueError:
+        return None
+    if not sampled or parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    return parts[1], parts[2]
+
+
+@dataclass
+class Span:
+    name: str
+    kind: str
+    trace_id: str
+    parent_id: str | None
+    span_id: str = field(default_factory=lambda: secrets.token_hex(8))
+    start_ns: int = field(default_factory=time.time_ns)
+    attributes: dict = field(default_factory=dict)
+
+    def traceparent(self) -> str:
+        return format_traceparent(self.trace_id, self.span_id)
+
+
+class FileExporter:
+    def __init__(self, directory: str | os.PathLike, service: str) -> None:
+        self.service = service
+        self.path = pathlib.Path(directory) / f"{service}_{os.getpid()}.jsonl"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", buffering=1)
+        self.exported = 0
+
+    def export(self, span: Span, end_ns: int, error: str | None) -> None:
+        record = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "parentSpanId": span.parent_id,
+            "name": span.name,
+            "kind": span.kind,
+            "service": self.service,
+            "startTimeUnixNano": span.start_ns,
+            "endTimeUnixNano": end_ns,
+            "attributes": span.attributes,
+        }
+        if error:
+            record["status"] = {"code": "ERROR", "message": error}
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self.exported += 1
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def _service_name() -> str:
+    spec = getattr(sys.modules["__main__"], "__spec__", None)
+    return getattr(spec, "name", "process").rsplit(".", 1)[-1]
+
+
+EXPORTER: FileExporter | None = (
+    FileExporter(os.environ["BENCH_TRACE_DIR"], _service_name()) if os.environ.get("BENCH_TRACE_DIR") else None
+)
+
+
+def install(directory: str | os.PathLike, service: str = "harness") -> FileExporter:
+    """Start exporting this process's spans (idempotent)."""
+    global EXPORTER
+    if EXPORTER is None:
+        EXPORTER = FileExporter(directory, service)
+    return EXPORTER
+
+
+@contextlib.contextmanager
+def span(name: str, kind: str = "internal", traceparent: str | None = None, **attributes):
+    """Record a span around the block and make it current.
+
+    The parent is the remote ``traceparent`` when given, else the current
+    span. Client and internal spans without a parent start a new trace;
+    server spans without a sampled parent are not recorded. Yields the
+    :class:`Span` or None.
+    """
+    if EXPORTER is None:
+        yield None
+        return
+    remote = parse_traceparent(traceparent)
+    current = _CURRENT.get()
+    if remote is not None:
+        trace_id, parent_id = remote
+    elif current is not None:
+        trace_id, parent_id = current.trace_id, current.span_id
+    elif kind == "server":
+        yield None
+        return
+    else:
+        trace_id, parent_id = secrets.token_hex(16), None
+    s = Span(name, kind, trace_id, parent_id, attributes=attributes)
+    token = _CURRENT.set(s)
+    error = None
+    try:
+        yield s
+    except BaseException as e:
+        error = repr(e)
+        raise
+    finally:
+        _CURRENT.reset(token)
+        EXPORTER.export(s, time.time_ns(), error)
+
+
+def current_traceparent() -> str | None:
+    s = _CURRENT.get()
+    return s.traceparent() if s is not None else None
+
+
+async def _inject_httpx(request) -> None:
+    traceparent = current_traceparent()
+    if traceparent is not None:
+        request.headers["traceparent"] = traceparent
+
+
+def httpx_event_hooks() -> dict:
+    """``event_hooks`` for an ``httpx.AsyncClient`` that adds ``traceparent``
+    to requests sent inside a span."""
+    return {"request": [_inject_httpx]}
+
+
+def meta_traceparent(meta) -> str | None:
+    """``traceparent`` from an MCP request's ``_meta`` (extra fields allowed)."""
+    return getattr(meta, "traceparent", None) if meta is not None else None
+
+
+async def call_tool(session, name: str, arguments: dict):
+    """``session.call_tool`` that carries the current span in ``_meta``.
+
+    ``ClientSession.call_tool`` has no ``_meta`` parameter in the pinned MCP
+    and ACP SDKs, so traced calls send the request directly, built from the
+    session's own SDK types.
+    """
+    traceparent = current_traceparent()
+    if traceparent is None:
+        return await session.call_tool(name, arguments)
+    types = importlib.import_module(type(session).__module__.split(".", 1)[0] + ".types")
+    params = types.CallToolRequestParams(name=name, arguments=arguments, _meta={"traceparent": traceparent})
+    return await session.send_request(
+        types.ClientRequest(types.CallToolRequest(method="tools/call", params=params)),
+        types.CallToolResult,
+    )
+
+
+def load_spans(directory: str | os.PathLike) -> list[dict]:
+    spans = []
+    for path in sorted(pathlib.Path(directory).glob("*.jsonl")):
+        with open(path) as f:
+            spans.extend(json.loads(line) for line in f if line.strip())
+    return spans
@@ -0,0 +1,131 @@
+"""Simulated handler work for the echo/add handlers of every server.
+
+``BENCH_WORK`` is ``<mode>:<distribution>`` in milliseconds, e.g.
+``sleep:200``, ``cpu:exp:20``, ``cpu_thread:uniform:5:50``,
+``cpu_process:lognormal:20:0.5``. Modes:
+
+- ``sleep``: ``asyncio.sleep`` (I/O-bound handler)
+- ``cpu``: burn CPU on the event loop thread (blocking handler)
+- ``cpu_thread``: burn CPU in a thread pool (still contends for the GIL)
+- ``cpu_process``: burn CPU in a process pool
+
+``BENCH_WORK_WORKERS`` sizes the pools (default 4). Unset or ``none`` adds
+no work and costs one attribute check per call.
+"""
+import asyncio
+import math
+import os
+import random
+import time
+
+MODES = ("sleep", "cpu", "cpu_thread", "cpu_process")
+
+
+def parse_distribution(text: str) -> dict:
+    """``200`` | ``exp:MEAN`` | ``uniform:MIN:MAX`` | ``lognormal:MEDIAN:SIGMA``."""
+    parts = text.split(":")
+    try:
+        if len(parts) == 1:
+            return {"dist": "fixed", "value": float(parts[0])}
+        kind, values = parts[0], [float(v) for v in parts[1:]]
+    except ValueError:
+        raise ValueError(f"invalid work distribution {text!r}")
+    if kind == "exp" and len(values) == 1:
+        return {"dist": "exponential", "mean": values[0]}
+    if kind == "uniform" and len(values) == 2:
+        return {"dist": "uniform", "min": values[0], "max": values[1]}
+    if kind == "lognormal" and len(values) == 2:
+        return {"dist": "lognormal", "median": values[0], "sigma": values[1]}
+    raise ValueError(f"invalid work distribution {text!r}")
+
+
+def sample(spec: dict | None, rng: random.Random) -> float:
+    """Draw one value from a distribution spec (None means 0)."""
+    if not spec:
+        return 0.0
+    dist = spec.get("dist", "fixed")
+    if dist == "fixed":
+        value = float(spec["value"])
+    elif dist == "uniform":
+        value = rng.uniform(float(spec["min"]), float(spec["max"]))
+    elif dist == "lognormal":
+        value = rng.lognormvariate(math.log(float(spec["median"])), float(spec.get("sigma", 1.0)))
+    elif dist == "exponential":
+        mean = float(spec["mean"])
+        value = rng.expovariate(1.0 / mean) if mean > 0 else 0.0
+    elif dist == "choice":
+        value = float(rng.choices(spec["values"], weights=spec.get("weights"))[0])
+    else:
+        raise ValueError(f"unknown distribution {dist!r}")
+    if "max" in spec:
+        value = min(value, float(spec["max"]))
+    return max(0.0, value)
+
+
+def burn(ms: float) -> None:
+    """Spin for ``ms`` of this thread's CPU time."""
+    end = time.thread_time() + ms / 1000
+    while time.thread_time() < end:
+        pass
+
+
+class Work:
+    def __init__(self, mode: str, distribution: dict, workers: int = 4, seed: int | None = None) -> None:
+        if mode not in MODES:
+            raise ValueError(f"work mode must be one of {MODES}, got {mode!r}")
+        self.mode = mode
+        self.distribution = distribution
+        self._workers = workers
+        self._rng = random.Random(seed)
+        self._executor = None
+
+    def draw_ms(self) -> float:
+        return sample(self.distribution, self._rng)
+
+    def mean_ms(self, samples: int = 10_000) -> float:
+        """Mean of the distribution, estimated with a fixed seed."""
+        rng = random.Random(0)
+        return sum(sample(self.distribution, rng) for _ in range(samples)) / samples
+
+    def _pool(self):
+        if self._executor is None:
+            import concurrent.futures
+
+            if self.mode == "cpu_thread":
+                self._executor = concurrent.futures.ThreadPoolExecutor(self._workers)
+            else:
+                import multiprocessing
+
+                self._executor = concurrent.futures.ProcessPoolExecutor(
+                    self._workers, mp_context=multiprocessing.get_context("spawn")
+                )
+        return self._executor
+
+    async def run(self) -> None:
+        ms = self.draw_ms()
+        if ms <= 0:
+            return
+        if self.mode == "sleep":
+            await asyncio.sleep(ms / 1000)
+        elif self.mode == "cpu":
+            burn(ms)
+        else:
+            await asyncio.get_running_loop().run_in_executor(self._pool(), burn, ms)
+
+
+def parse(spec: str | None, workers: int = 4) -> Work | None:
+    """Parse a ``BENCH_WORK`` spec; None when no work is configured."""
+    if not spec or spec == "none":
+        return None
+    mode, _, distribution = spec.partition(":")
+    if not distribution:
+        raise ValueError(f"work spec needs <mode>:<distribution>, got {spec!r}")
+    return Work(mode, parse_distribution(distribution), workers)
+
+
+WORK = parse(os.environ.get("BENCH_WORK"), int(os.environ.get("BENCH_WORK_WORKERS", "4")))
+
+
+async def simulate() -> None:
+    if WORK is not None:
+        await WORK.run()